@@ -0,0 +1,85 @@
+import argparse
+import random
+import statistics
+import time
+
+from minegame.minegame import Map, BaseBlock, MineBlock
+
+
+def legacy_create(row: int, col: int, total_mine_count: int):
+    # 1.0.1 버전의 Map.create: 전체 좌표 리스트에서 샘플링하고 지뢰마다 주변 블록을 하나씩 증가
+    dx = [1, -1, 0, 0]
+    dy = [0, 0, 1, -1]
+
+    current_board = [[BaseBlock() for j in range(col)] for i in range(row)]
+
+    mine_pos = random.sample([(i, j) for i in range(row) for j in range(col)], total_mine_count)
+
+    for x, y in mine_pos:
+        current_board[x][y] = MineBlock()
+
+        for k in range(4):
+            nx = x + dx[k]
+            ny = y + dy[k]
+
+            if nx < 0 or ny < 0 or nx >= row or ny >= col:
+                continue
+
+            if isinstance(current_board[nx][ny], BaseBlock):
+                current_board[nx][ny].increase_near_mine_count()
+
+    return current_board
+
+
+def measure(func, repeat: int):
+    timings = []
+
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    return min(timings), statistics.median(timings)
+
+
+def report(row: int, col: int, density: float, repeat: int, legacy: bool):
+    mine_count = int(row * col * density)
+
+    print(f"board {row}x{col}, {mine_count} mines")
+
+    vectorized, median = measure(lambda: Map.create(row, col, mine_count), repeat)
+    print(f"  vectorized  best {vectorized * 1000:9.1f} ms  median {median * 1000:9.1f} ms")
+
+    if not legacy:
+        return
+
+    best, median = measure(lambda: legacy_create(row, col, mine_count), repeat)
+    print(f"  legacy      best {best * 1000:9.1f} ms  median {median * 1000:9.1f} ms  "
+          f"({best / vectorized:.1f}x slower)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare legacy and vectorized board generation.")
+    parser.add_argument("--row", type=int, default=4000)
+    parser.add_argument("--col", type=int, default=4000)
+    parser.add_argument("--density", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--legacy-max-cells", type=int, default=4_000_000,
+                        help="skip the legacy generator above this many cells")
+    parser.add_argument("--reference-size", type=int, default=1000,
+                        help="compare both generators on a square board of this size when the board is too large "
+                             "for the legacy generator")
+    args = parser.parse_args()
+
+    legacy = args.row * args.col <= args.legacy_max_cells
+    report(args.row, args.col, args.density, args.repeat, legacy)
+
+    # 기본 크기는 이전 생성기로 재기에 너무 크므로 비교는 기준 크기에서 따로 한다
+    if not legacy:
+        print(f"  legacy      skipped (more than {args.legacy_max_cells} cells)")
+        reference = args.reference_size
+        report(reference, reference, args.density, args.repeat, reference * reference <= args.legacy_max_cells)
+
+
+if __name__ == "__main__":
+    main()
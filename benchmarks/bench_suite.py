@@ -0,0 +1,275 @@
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import *
+
+from minegame.minegame import Difficulty, Game, GameController, Map
+from minegame.topology import SQUARE4, TOPOLOGIES, Topology, get_topology
+
+
+# 프리셋 외에 기본으로 재는 큰 보드
+DEFAULT_LARGE_SIZES = "200x200,1000x1000"
+DEFAULT_DENSITY = 0.15
+
+# 동작 하나가 너무 짧은 경우 한 번의 측정에서 반복하는 횟수
+COVER_BATCH = 1000
+
+SEED = 1234
+
+
+class Case(NamedTuple):
+    name: str
+    params: Dict[str, Any]
+    setup: Callable[[], Any]  # 측정하지 않는 준비, 반환값이 run 의 인자가 된다
+    run: Callable[[Any], Any]
+    teardown: Optional[Callable[[Any], None]] = None
+
+
+def board_sizes(large_sizes: str, density: float):
+    sizes = [(difficulty.name.lower(), difficulty.row_size, difficulty.col_size, difficulty.total_mine_count)
+             for difficulty in Difficulty]
+
+    for size in filter(None, large_sizes.split(",")):
+        row, col = (int(value) for value in size.lower().split("x"))
+        sizes.append((f"{row}x{col}", row, col, int(row * col * density)))
+
+    return sizes
+
+
+def cascade_map(row: int, col: int, topology: 'Topology' = SQUARE4):
+    # 지뢰를 거의 두지 않아 한 번의 드러내기가 보드 대부분을 여는 최악의 연쇄
+    current_map = Map.create(row, col, max(1, row * col // 2000), random.Random(SEED), topology)
+    start = current_map.board.near_mine_counts.find(b"\x00")
+
+    while current_map.board.mines[start]:
+        start = current_map.board.near_mine_counts.find(b"\x00", start + 1)
+
+    return current_map, divmod(start, col)
+
+
+def cover_cells(row: int, col: int):
+    rng = random.Random(SEED)
+    return [(rng.randrange(row), rng.randrange(col)) for _ in range(COVER_BATCH)]
+
+
+def engine_cases(sizes, topology: 'Topology' = SQUARE4):
+    cases = []
+
+    for label, row, col, mine_count in sizes:
+        params = {"board": label, "row": row, "col": col, "mines": mine_count, "topology": topology.name}
+
+        cases.append(Case(f"map.create/{label}", params,
+                          lambda: None,
+                          lambda _, row=row, col=col, mine_count=mine_count:
+                          Map.create(row, col, mine_count, random.Random(SEED), topology)))
+
+        # 이웃 표는 크기가 제한된 보드에서만 만든다
+        if row * col <= Map.NEIGHBOUR_TABLE_MAX_CELLS:
+            cases.append(Case(f"topology.neighbour_table/{label}", params,
+                              lambda: None,
+                              lambda _, row=row, col=col: topology.neighbour_table(row, col)))
+
+        def reveal_setup(row=row, col=col):
+            return cascade_map(row, col, topology)
+
+        def reveal_run(state):
+            current_map, (x, y) = state
+            current_map.reveal(x, y)
+
+        cases.append(Case(f"map.reveal_cascade/{label}", params, reveal_setup, reveal_run))
+
+        def cover_setup(row=row, col=col, mine_count=mine_count):
+            return Map.create(row, col, mine_count, random.Random(SEED), topology), cover_cells(row, col)
+
+        def cover_run(state):
+            current_map, cells = state
+
+            for x, y in cells:
+                current_map.cover(x, y)
+
+        cases.append(Case(f"map.cover_x{COVER_BATCH}/{label}", params, cover_setup, cover_run))
+
+        # 지뢰를 첫 드러내기 때 놓는 게임은 생성 비용이 첫 클릭으로 옮겨 간다
+        def deferred_setup(row=row, col=col, mine_count=mine_count):
+            return Game.create(row, col, mine_count, random.Random(SEED), topology, deferred=True)
+
+        cases.append(Case(f"game.first_reveal_deferred/{label}", params, deferred_setup,
+                          lambda game, row=row, col=col: game.reveal(row // 2, col // 2)))
+
+        cases.append(Case(f"game.set_game_over/{label}", params,
+                          lambda row=row, col=col, mine_count=mine_count:
+                          Game.create(row, col, mine_count, random.Random(SEED), topology),
+                          lambda game: game.set_game_over()))
+
+    return cases
+
+
+def ui_cases():
+    # 화면 없이 Qt 를 띄운다
+    os.environ.setdefault("QT_QPA_PLATFORM", "offscreen")
+
+    from PyQt5.QtWidgets import QApplication
+    from minegame.minegame_ui import GameUI
+
+    application = QApplication.instance() or QApplication(sys.argv[:1])
+    cases = []
+
+    def close(window):
+        window.close()
+        window.deleteLater()
+        application.processEvents()
+
+    for difficulty in Difficulty:
+        label = difficulty.name.lower()
+        row, col = difficulty.row_size, difficulty.col_size
+        params = {"board": label, "row": row, "col": col, "mines": difficulty.total_mine_count}
+
+        def new_game(difficulty=difficulty):
+            return GameController.create_with_difficulty(difficulty, random.Random(SEED))
+
+        cases.append(Case(f"ui.init_ui/{label}", params, new_game,
+                          lambda game, row=row, col=col: GameUI(game, row, col), close))
+
+        def update_setup(difficulty=difficulty, row=row, col=col):
+            game = new_game(difficulty)
+            window = GameUI(game, row, col)
+
+            # 가장 큰 0 영역을 여는 칸을 드러내 두고 다시 그리는 시간만 잰다
+            board = game.game.map.board
+            start = board.near_mine_counts.find(b"\x00")
+
+            while board.mines[start]:
+                start = board.near_mine_counts.find(b"\x00", start + 1)
+
+            game.reveal(*divmod(start, col))
+            return window
+
+        cases.append(Case(f"ui.update_ui/{label}", params, update_setup,
+                          lambda window: window.update_ui(), close))
+
+    return cases
+
+
+def time_case(case: 'Case', warmup: int, repeat: int):
+    timings = []
+
+    for iteration in range(warmup + repeat):
+        state = case.setup()
+        start = time.perf_counter()
+        result = case.run(state)
+        elapsed = time.perf_counter() - start
+
+        if case.teardown is not None:
+            case.teardown(result if result is not None else state)
+
+        if iteration >= warmup:
+            timings.append(elapsed)
+
+    return {
+        "min_ms": min(timings) * 1000,
+        "median_ms": statistics.median(timings) * 1000,
+        "mean_ms": statistics.mean(timings) * 1000,
+        "stdev_ms": statistics.stdev(timings) * 1000 if len(timings) > 1 else 0.0,
+        "max_ms": max(timings) * 1000,
+        "repeat": repeat,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results: List[Dict[str, Any]], baseline_path: str, threshold: float):
+    # 기준 결과보다 중앙값이 threshold 비율 이상 느려진 항목
+    with open(baseline_path) as file:
+        baseline = {result["name"]: result for result in json.load(file)["results"]}
+
+    regressions = []
+
+    for result in results:
+        base = baseline.get(result["name"])
+
+        if base is None:
+            continue
+
+        ratio = result["median_ms"] / base["median_ms"] if base["median_ms"] else 1.0
+
+        if ratio > 1 + threshold:
+            regressions.append((result["name"], base["median_ms"], result["median_ms"], ratio))
+
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.bench_suite",
+                                     description="Time the engine and UI hot paths and optionally compare to a baseline.")
+    parser.add_argument("--sizes", default=DEFAULT_LARGE_SIZES, help="extra board sizes as ROWxCOL[,ROWxCOL...]")
+    parser.add_argument("--density", type=float, default=DEFAULT_DENSITY, help="mine density for the extra sizes")
+    parser.add_argument("--warmup", type=int, default=1)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--filter", help="only run cases whose name contains this text")
+    parser.add_argument("--topology", choices=list(TOPOLOGIES), default="square4",
+                        help="board neighbourhood for the engine cases")
+    parser.add_argument("--no-ui", action="store_true", help="skip the Qt cases")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", help="baseline JSON file written by --output")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="fail when a median is this fraction slower than the baseline")
+    args = parser.parse_args(argv)
+
+    sizes = board_sizes(args.sizes, args.density)
+
+    cases = engine_cases(sizes, get_topology(args.topology))
+
+    if not args.no_ui:
+        cases += ui_cases()
+
+    if args.filter:
+        cases = [case for case in cases if args.filter in case.name]
+
+    results = []
+
+    for case in cases:
+        stats = time_case(case, args.warmup, args.repeat)
+        results.append({"name": case.name, "params": case.params, **stats})
+        print(f"{case.name:40} median {stats['median_ms']:10.3f} ms  min {stats['min_ms']:10.3f} ms  "
+              f"stdev {stats['stdev_ms']:8.3f} ms", flush=True)
+
+    if args.output:
+        report = {
+            "commit": git_commit(),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "warmup": args.warmup,
+            "repeat": args.repeat,
+            "results": results,
+        }
+
+        with open(args.output, "w") as file:
+            json.dump(report, file, indent=2)
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+
+        for name, before, after, ratio in regressions:
+            print(f"REGRESSION {name}: {before:.3f} ms -> {after:.3f} ms ({(ratio - 1) * 100:+.1f}%)")
+
+        if regressions:
+            sys.exit(1)
+
+        print(f"no regressions above {args.threshold * 100:.0f}%")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
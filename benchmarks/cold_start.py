@@ -0,0 +1,121 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+from typing import *
+
+
+# (이름, 새 인터프리터에서 실행할 코드, 예산 검사 대상인지)
+# 예산은 Qt 없이 시작하는 경로(엔진만 쓰는 headless, 터미널 화면)에만 적용한다
+TARGETS = [
+    ("interpreter", "pass", False),
+    ("headless", "import minegame.minegame", True),
+    ("terminal", "import minegame.terminal", True),
+    ("simulate", "import minegame.simulate", False),
+    ("server", "import minegame.server", False),
+    ("qt_main_window", "import minegame.mainApplication", False),
+    ("qt_game_window", "import minegame.mainApplication, minegame.minegame_ui", False),
+]
+
+QT_CHECK = "import sys, {module}; print(any(name.split('.')[0] == 'PyQt5' for name in sys.modules))"
+
+
+def measure(code: str, repeat: int, cwd: str):
+    timings = []
+
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], cwd=cwd, check=True)
+        timings.append(time.perf_counter() - started)
+
+    return statistics.median(timings) * 1000
+
+
+def import_error(code: str, cwd: str):
+    # 대상을 한 번 실행해 바이트코드 캐시를 만들고, 실패하면(PyQt5 가 없는 환경의 Qt 대상 등) 오류의 마지막 줄을 돌려준다
+    completed = subprocess.run([sys.executable, "-c", code], cwd=cwd, capture_output=True, text=True)
+
+    if completed.returncode == 0:
+        return None
+
+    lines = completed.stderr.strip().splitlines()
+    return lines[-1] if lines else f"exit code {completed.returncode}"
+
+
+def loads_qt(module: str, cwd: str):
+    output = subprocess.run([sys.executable, "-c", QT_CHECK.format(module=module)], cwd=cwd, check=True,
+                            capture_output=True, text=True).stdout
+    return output.strip() == "True"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.cold_start",
+                                     description="Measure interpreter-to-import time of each entry point.")
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--budget-ms", type=float, default=100.0,
+                        help="fail when a Qt-free entry point takes longer than this (interpreter included)")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args(argv)
+
+    cwd = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+    results = []
+
+    # 바이트코드 캐시를 만들어 두고 잰다, import 할 수 없는 대상은 재지 않고 사용할 수 없다고 알린다
+    for name, code, budgeted in TARGETS:
+        error = import_error(code, cwd)
+
+        if error is not None:
+            results.append({"name": name, "median_ms": None, "budgeted": budgeted, "unavailable": error})
+            continue
+
+        elapsed = measure(code, args.repeat, cwd)
+        results.append({"name": name, "median_ms": elapsed, "budgeted": budgeted})
+
+    baseline = results[0]["median_ms"]
+    failures = []
+
+    for result in results:
+
+        # Qt 없이 시작해야 하는 대상을 import 할 수 없으면 실패로 센다
+        if "unavailable" in result:
+
+            if result["budgeted"]:
+                failures.append(result["name"])
+
+            continue
+
+        result["over_interpreter_ms"] = result["median_ms"] - baseline
+
+        if result["budgeted"]:
+            module = dict((name, code) for name, code, _ in TARGETS)[result["name"]].split()[-1]
+            result["loads_qt"] = loads_qt(module, cwd)
+
+            if result["loads_qt"] or result["median_ms"] > args.budget_ms:
+                failures.append(result["name"])
+
+    if args.json:
+        print(json.dumps({"results": results, "failures": failures}))
+
+    else:
+        for result in results:
+
+            if "unavailable" in result:
+                print(f"{result['name']:16} unavailable: {result['unavailable']}")
+                continue
+
+            qt = "  (imports Qt!)" if result.get("loads_qt") else ""
+            print(f"{result['name']:16} {result['median_ms']:7.1f} ms  (+{result['over_interpreter_ms']:5.1f} ms){qt}")
+
+        if failures:
+            print(f"over budget ({args.budget_ms:g} ms), importing Qt or failing to import: {', '.join(failures)}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
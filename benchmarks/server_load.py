@@ -0,0 +1,257 @@
+import argparse
+import asyncio
+import itertools
+import json
+import random
+import subprocess
+import sys
+import time
+
+from typing import *
+
+from minegame.minegame import Difficulty, GameState
+from minegame.server import DEFAULT_HOST, DEFAULT_PORT, FLAGGED, HIDDEN
+from minegame.histogram import LatencyHistogram
+
+
+class Connection:
+    # 한 연결에 여러 클라이언트의 요청을 겹쳐 보내고, 응답은 id 로 찾아 돌려준다
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+        self.ids = itertools.count()
+        self.pending: Dict[int, asyncio.Future] = {}
+        self.receiver = asyncio.ensure_future(self.receive())
+
+    @classmethod
+    async def open(cls, host: str, port: int):
+        # 큰 보드의 연쇄 드러내기 응답은 한 줄이 수십 MB 일 수 있다
+        reader, writer = await asyncio.open_connection(host, port, limit=1 << 26)
+        return cls(reader, writer)
+
+    async def receive(self):
+        try:
+            while True:
+                line = await self.reader.readline()
+
+                if not line:
+                    break
+
+                response = json.loads(line)
+                future = self.pending.pop(response["id"], None)
+
+                if future is not None and not future.done():
+                    future.set_result(response)
+
+        finally:
+            for future in self.pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("Server closed the connection."))
+
+    async def request(self, message: Dict[str, Any]):
+        request_id = next(self.ids)
+        future = asyncio.get_running_loop().create_future()
+        self.pending[request_id] = future
+
+        message["id"] = request_id
+        self.writer.write(json.dumps(message, separators=(",", ":")).encode() + b"\n")
+        return await future
+
+    async def close(self):
+        self.writer.close()
+        self.receiver.cancel()
+
+
+class LoadReport:
+
+    def __init__(self):
+        self.actions = 0
+        self.games = 0
+        self.wins = 0
+        self.losses = 0
+        self.errors = 0
+        self.elapsed = 0.0
+        self.histogram = LatencyHistogram()
+        self.new_game_histogram = LatencyHistogram()
+        self.server_stats: Dict[str, Any] = {}
+
+    def to_dict(self, clients: int, connections: int):
+        return {
+            "clients": clients,
+            "connections": connections,
+            "elapsed_sec": self.elapsed,
+            "actions": self.actions,
+            "actions_per_sec": self.actions / self.elapsed if self.elapsed else 0.0,
+            "games": self.games,
+            "wins": self.wins,
+            "losses": self.losses,
+            "errors": self.errors,
+            "action_latency_ms": {
+                f"p{percent:g}": self.histogram.percentile(percent) / 1e6 for percent in (50, 90, 99, 99.9)
+            },
+            "new_game_latency_ms": {
+                f"p{percent:g}": self.new_game_histogram.percentile(percent) / 1e6 for percent in (50, 99)
+            },
+            "server": self.server_stats,
+        }
+
+
+async def play_client(connection: 'Connection', board: Tuple[int, int, int], rng: random.Random, deadline: float,
+                      report: 'LoadReport'):
+    # 보드의 숨은 칸을 무작위로 드러내는 클라이언트, 게임이 끝나면 닫고 새 게임을 연다
+    row, col, total_mine_count = board
+
+    while time.perf_counter() < deadline:
+        started = time.perf_counter_ns()
+        response = await connection.request({"op": "new", "row": row, "col": col, "mines": total_mine_count,
+                                             "seed": rng.getrandbits(32)})
+        report.new_game_histogram.record(time.perf_counter_ns() - started)
+
+        if "error" in response:
+            report.errors += 1
+            return
+
+        game_id = response["game"]
+        hidden = set(range(row * col))
+        apply_cells(hidden, response["cells"], col)
+        state = response["state"]
+
+        while state in (GameState.START, GameState.PLAYING) and hidden and time.perf_counter() < deadline:
+            # 숨은 칸이 많을 때는 보드 전체에서 고른다 (이미 드러난 칸이면 아무 일도 일어나지 않는다)
+            x, y = divmod(rng.choice(tuple(hidden)) if len(hidden) < 64 else rng.randrange(row * col), col)
+
+            started = time.perf_counter_ns()
+            response = await connection.request({"op": "reveal", "game": game_id, "x": x, "y": y})
+
+            report.histogram.record(time.perf_counter_ns() - started)
+            report.actions += 1
+
+            if "error" in response:
+                report.errors += 1
+                break
+
+            apply_cells(hidden, response["cells"], col)
+            state = response["state"]
+
+        report.games += 1
+        report.wins += state == GameState.WIN
+        report.losses += state == GameState.LOSE
+        await connection.request({"op": "close", "game": game_id})
+
+
+def apply_cells(hidden: Set[int], cells: List[int], col: int):
+
+    for i in range(0, len(cells), 3):
+        if cells[i + 2] not in (HIDDEN, FLAGGED):
+            hidden.discard(cells[i] * col + cells[i + 1])
+
+
+async def run_load(host: str, port: int, clients: int, connections: int, duration: float,
+                   board: Tuple[int, int, int], seed: int):
+    report = LoadReport()
+    pool = [await Connection.open(host, port) for _ in range(connections)]
+    rng = random.Random(seed)
+
+    started = time.perf_counter()
+    deadline = started + duration
+
+    try:
+        await asyncio.gather(*(play_client(pool[i % connections], board, random.Random(rng.getrandbits(64)),
+                                           deadline, report)
+                               for i in range(clients)))
+
+        report.elapsed = time.perf_counter() - started
+        report.server_stats = await pool[0].request({"op": "stats"})
+        report.server_stats.pop("id", None)
+
+    finally:
+        report.elapsed = report.elapsed or time.perf_counter() - started
+
+        for connection in pool:
+            await connection.close()
+
+    return report
+
+
+def spawn_server(port: int, max_size: int, memory_budget: Optional[str] = None):
+    # 서버를 별도 프로세스로 띄워 부하 도구와 이벤트 루프/GIL 을 나눠 쓰지 않게 한다
+    command = [sys.executable, "-m", "minegame.server", "--port", str(port), "--max-size", str(max_size)]
+
+    if memory_budget is not None:
+        command += ["--memory-budget", memory_budget]
+
+    process = subprocess.Popen(command, stdout=subprocess.PIPE, text=True)
+    line = process.stdout.readline()
+
+    if not line.startswith("serving on"):
+        process.kill()
+        raise RuntimeError(f"Server failed to start: {line!r}")
+
+    return process
+
+
+def parse_board(args):
+
+    if args.board:
+        size, mines = args.board.lower().split(":")
+        row, col = (int(value) for value in size.split("x"))
+        return row, col, int(mines)
+
+    difficulty = Difficulty[args.difficulty]
+    return difficulty.row_size, difficulty.col_size, difficulty.total_mine_count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m benchmarks.server_load",
+                                     description="Drive a game server with many simulated clients and report "
+                                                 "sustained actions/sec and latency percentiles.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--spawn", action="store_true", help="start a server process on --port for the run")
+    parser.add_argument("--memory-budget", help="memory budget for the spawned server (e.g. 64M)")
+    parser.add_argument("--clients", type=int, default=2000)
+    parser.add_argument("--connections", type=int, default=50, help="TCP connections shared by the clients")
+    parser.add_argument("--duration", type=float, default=10.0, help="seconds to run")
+    parser.add_argument("--difficulty", choices=[difficulty.name for difficulty in Difficulty], default="EASY")
+    parser.add_argument("--board", help="custom board as ROWxCOL:MINES (overrides --difficulty)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--json", action="store_true", help="print the report as JSON")
+    args = parser.parse_args(argv)
+
+    board = parse_board(args)
+    process = spawn_server(args.port, max(board[0], board[1]), args.memory_budget) if args.spawn else None
+
+    try:
+        report = asyncio.run(run_load(args.host, args.port, args.clients, min(args.connections, args.clients),
+                                      args.duration, board, args.seed))
+
+    finally:
+        if process is not None:
+            process.terminate()
+            process.wait()
+
+    summary = report.to_dict(args.clients, min(args.connections, args.clients))
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+
+    latency = summary["action_latency_ms"]
+    print(f"{summary['clients']} clients over {summary['connections']} connections, "
+          f"{summary['elapsed_sec']:.1f} s")
+    print(f"actions {summary['actions']}  ({summary['actions_per_sec']:.0f} actions/sec), "
+          f"games {summary['games']} (won {summary['wins']}, lost {summary['losses']}), errors {summary['errors']}")
+    print("action latency  " + "  ".join(f"{name} {value:.2f} ms" for name, value in latency.items()))
+
+    server = summary["server"]
+
+    if "resident_sessions" in server:
+        print(f"server sessions {server['sessions']} (resident {server['resident_sessions']}, "
+              f"spilled {server['spilled_sessions']}), {server['bytes_per_resident_session']:.0f} bytes/resident, "
+              f"{server['bytes_per_spilled_session']:.0f} bytes/spilled, "
+              f"spills {server['spills_per_sec']:.0f}/s, reloads {server['reloads_per_sec']:.0f}/s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
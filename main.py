@@ -1,6 +1,12 @@
-from minegame.mainApplication import MainApplication
+import sys
 
 if __name__ == "__main__":
-    MainApplication.run()
 
+    # 터미널 화면은 Qt 를 전혀 불러오지 않는다
+    if sys.argv[1:2] == ["--terminal"]:
+        from minegame.terminal import main
+        main(sys.argv[2:])
 
+    else:
+        from minegame.mainApplication import MainApplication
+        MainApplication.run()
@@ -0,0 +1,152 @@
+import mmap
+import os
+import struct
+
+from typing import *
+
+from minegame.minegame import BoardStorage, Game, GameState, Map, ZeroRegionIndex
+from minegame.topology import TOPOLOGY_CODES
+
+
+# 파일 구조
+#   헤더 (첫 페이지): 매직, 버전, 이웃 관계(Topology.code), 크기, 지뢰 수, Game 카운터, 드러난 안전 칸 수
+#   평면: mines, near_mine_counts, states, 연쇄 드러내기 색인(아직 드러나지 않은 0 칸) 순서로
+#   각 평면은 칸당 1바이트이고 mmap 할당 단위에 맞춘 위치에서 시작한다
+# 평면을 엔진의 BoardStorage 배치 그대로 두므로 드러내기/커버는 매핑된 페이지에 바로 쓰이고,
+# 저장은 헤더의 카운터를 쓰고 더러워진 페이지를 flush 하는 것으로 끝난다
+MAGIC = b"MGBD"
+VERSION = 2
+
+HEADER = struct.Struct("<4sHHQQQqqBBQ")
+PLANE_COUNT = 4
+
+GAME_STATES = (GameState.START, GameState.PLAYING, GameState.WIN, GameState.LOSE)
+
+
+def _align(offset: int):
+    granularity = mmap.ALLOCATIONGRANULARITY
+    return (offset + granularity - 1) // granularity * granularity
+
+
+def plane_offset(size: int, plane: int):
+    return _align(HEADER.size) + plane * _align(size)
+
+
+class BoardFile:
+
+    def __init__(self, path: str, file: BinaryIO, row: int, col: int, total_mine_count: int, topology_code: int = 0):
+        self.path = path
+        self.file = file
+        self.row = row
+        self.col = col
+        self.total_mine_count = total_mine_count
+        self.topology = TOPOLOGY_CODES[topology_code]
+
+        size = row * col
+        fileno = file.fileno()
+
+        self.header = mmap.mmap(fileno, HEADER.size)
+        self.planes = [mmap.mmap(fileno, size, offset=plane_offset(size, plane)) for plane in range(PLANE_COUNT)]
+        self.storage = BoardStorage(row, col, *self.planes[:3])
+
+        self.game: Optional['Game'] = None
+
+    @classmethod
+    def open(cls, path: str):
+        # 헤더만 읽고 평면은 매핑만 하므로 칸을 건드리기 전까지는 보드 크기와 무관하다
+        file = open(path, "r+b")
+
+        magic, version, topology_code, row, col, total_mine_count, _, _, _, _, _ = HEADER.unpack(file.read(HEADER.size))
+
+        if magic != MAGIC:
+            file.close()
+            raise ValueError(f"{path} is not a board file.")
+
+        if version != VERSION:
+            file.close()
+            raise ValueError(f"Unsupported board file version {version}.")
+
+        if topology_code not in TOPOLOGY_CODES:
+            file.close()
+            raise ValueError(f"Unknown board topology {topology_code}.")
+
+        return cls(path, file, row, col, total_mine_count, topology_code)
+
+    @classmethod
+    def create(cls, path: str, game: 'Game'):
+        # 메모리에 있는 게임을 새 파일로 한 번 써 두고, 이후에는 매핑된 파일 위에서 이어서 둔다
+        current_map = game.map
+        storage = current_map.board
+        size = current_map.row * current_map.col
+
+        # 파일에는 지뢰 배치 설정을 두지 않으므로 지뢰가 놓인 뒤에만 저장할 수 있다
+        if not current_map.mines_placed:
+            raise ValueError("Mines are not placed yet, reveal a cell before saving the board.")
+
+        zero_regions = current_map.zero_regions or ZeroRegionIndex(storage, topology=current_map.topology)
+        planes = (storage.mines, storage.near_mine_counts, storage.states, zero_regions.pending)
+
+        with open(path, "wb") as file:
+            file.write(cls.pack_header(current_map.row, current_map.col, game))
+
+            for plane, data in enumerate(planes):
+                file.seek(plane_offset(size, plane))
+                file.write(data)
+
+            file.truncate(plane_offset(size, PLANE_COUNT))
+
+        board_file = cls.open(path)
+        board_file.load_game()
+        return board_file
+
+    @staticmethod
+    def pack_header(row: int, col: int, game: 'Game'):
+        return HEADER.pack(MAGIC, VERSION, game.map.topology.code, row, col, game.total_mine_count, game.find_mine_count,
+                           game.covered_block_count, game.is_game_end, GAME_STATES.index(game.game_state),
+                           game.map.revealed_safe_count)
+
+    def load_game(self):
+        _, _, _, _, _, _, find_mine_count, covered_block_count, is_game_end, game_state, revealed_safe_count = \
+            HEADER.unpack(self.header[:HEADER.size])
+
+        current_map = Map(self.row, self.col, self.total_mine_count, self.storage, revealed_safe_count, self.topology)
+        current_map.zero_regions = ZeroRegionIndex(self.storage, self.planes[3], self.topology)
+
+        game = Game.create_with_map(self.total_mine_count, current_map)
+        game.find_mine_count = find_mine_count
+        game.covered_block_count = covered_block_count
+        game.is_game_end = bool(is_game_end)
+        game.game_state = GAME_STATES[game_state]
+
+        self.game = game
+        return game
+
+    def save(self):
+        # 칸은 이미 매핑된 페이지에 쓰여 있으므로 카운터만 헤더에 쓰고 flush 한다
+        if self.game is not None:
+            self.header[:HEADER.size] = self.pack_header(self.row, self.col, self.game)
+
+        self.header.flush()
+
+        for plane in self.planes:
+            plane.flush()
+
+    def close(self):
+        self.save()
+
+        if self.game is not None:
+            solver = self.game.solver
+
+            if solver is not None:
+                solver.close()
+
+            self.game = None
+
+        for plane in self.planes:
+            plane.close()
+
+        self.header.close()
+        self.file.close()
+
+    def nbytes(self):
+        return os.path.getsize(self.path)
@@ -0,0 +1,425 @@
+import math
+import random
+
+from collections import OrderedDict, deque
+from typing import *
+
+from minegame.minegame import BoardStorage, BaseBlockInfo, ClickEventResult, Game, GameController, MineBlockInfo, \
+    cell_codes, count_near_mines, sample_mine_bitmap
+from minegame.topology import SQUARE4
+
+
+# 다 풀린 청크를 다시 만들 때 지뢰가 아닌 칸(0)은 REVEALED, 지뢰 칸(1)은 0 으로 바꾸는 변환 테이블
+_RESOLVED_STATE_TABLE = bytes([BoardStorage.REVEALED]) + bytes(255)
+
+
+class Chunk:
+    # 청크 하나의 평면, 인덱스는 로컬 좌표 (lx * size + ly)
+    __slots__ = ("cx", "cy", "mines", "near_mine_counts", "states", "touched", "hidden_safe_count")
+
+    def __init__(self, cx: int, cy: int, mines: bytearray, near_mine_counts: bytearray, states: bytearray,
+                 hidden_safe_count: int):
+        self.cx = cx
+        self.cy = cy
+        self.mines = mines
+        self.near_mine_counts = near_mine_counts
+        self.states = states
+        self.touched = False  # 플레이어가 상태를 바꾼 적이 있는지
+        self.hidden_safe_count = hidden_safe_count  # 아직 드러나지 않은 지뢰가 아닌 칸 수
+
+    def is_resolved(self):
+        return self.hidden_safe_count == 0
+
+    def nbytes(self):
+        return len(self.mines) + len(self.near_mine_counts) + len(self.states)
+
+
+class EndlessMap:
+    # 끝이 없는 맵. 보드를 CHUNK_SIZE x CHUNK_SIZE 청크로 나누고, 청크의 지뢰는 전역 시드와 청크 좌표로 정해진다
+    # 플레이어가 건드렸고 아직 다 풀리지 않은 청크만 메모리에 고정하고, 나머지(건드리지 않았거나 다 풀린 청크)는
+    # 메모리 예산을 넘으면 오래 쓰지 않은 순서로 내보냈다가 필요할 때 같은 시드로 다시 만든다.
+    # 다 풀린 청크는 커버된 칸 목록만 남겨 두고 다시 만들 때 지뢰가 아닌 칸을 모두 드러낸다.
+
+    DEFAULT_CHUNK_SIZE = 64
+    DEFAULT_DENSITY = 0.15
+    DEFAULT_MEMORY_BUDGET = 64 * 1024 * 1024
+
+    # 연쇄 드러내기 한 번에 드러내는 칸의 상한 (밀도가 낮으면 0 영역이 끝없이 이어질 수 있다)
+    # 상한에 닿으면 남은 탐색 경계를 보관하고, continue_cascade 로 이어서 드러낸다
+    MAX_CASCADE_CELLS = 1_000_000
+
+    # 청크 경계의 숫자와 너비 우선 연쇄는 상하좌우 이웃만 다룬다
+    topology = SQUARE4
+
+    # 청크의 지뢰는 시드로 정해지므로 첫 클릭에 맞춰 놓지 않는다
+    mines_placed = True
+
+    def __init__(self, seed: int, density: float = DEFAULT_DENSITY, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 memory_budget: int = DEFAULT_MEMORY_BUDGET):
+
+        if not (0 < density < 1):
+            raise ValueError(f"Mine density ({density}) must be between 0 and 1.")
+
+        if chunk_size < 2:
+            raise ValueError(f"Chunk size ({chunk_size}) must be at least 2.")
+
+        self.seed = seed
+        self.density = density
+        self.chunk_size = chunk_size
+        self.chunk_mine_count = max(1, min(chunk_size * chunk_size - 1, round(density * chunk_size * chunk_size)))
+        self.memory_budget = memory_budget
+
+        # Game 과 함께 쓸 때 지뢰 수는 무한하다
+        self.total_mine_count = math.inf
+
+        self.chunks: 'OrderedDict[Tuple[int, int], Chunk]' = OrderedDict()
+        self.resident_bytes = 0
+        self.resolved_chunks: Dict[Tuple[int, int], FrozenSet[int]] = {}  # 청크 좌표 -> 커버된 로컬 인덱스
+        self.mine_cache: 'OrderedDict[Tuple[int, int], bytearray]' = OrderedDict()  # 이웃 청크 경계 계산용
+
+        self.changed_cells: Set[Tuple[int, int]] = set()
+        self.is_game_over = False
+
+        # 상한에 닿아 멈춘 연쇄 드러내기의 남은 칸과 이미 큐에 넣은 칸
+        self.cascade_frontier: Deque[Tuple[int, int]] = deque()
+        self.cascade_seen: Set[Tuple[int, int]] = set()
+
+        self.generated_chunks = 0
+        self.evicted_chunks = 0
+
+    # ---- 청크 생성 / 적재 ----
+
+    def chunk_rng(self, cx: int, cy: int):
+        # 문자열 시드는 해시 무작위화와 무관하게 같은 난수열을 만든다
+        return random.Random(f"{self.seed}:{cx}:{cy}")
+
+    def chunk_mines(self, cx: int, cy: int):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+
+        if chunk is not None:
+            return chunk.mines
+
+        mines = self.mine_cache.get(key)
+
+        if mines is None:
+            mines = sample_mine_bitmap(self.chunk_size * self.chunk_size, self.chunk_mine_count,
+                                       self.chunk_rng(cx, cy))
+            self.mine_cache[key] = mines
+
+            # 경계 계산용 지뢰 평면은 적재된 청크 주변만 있으면 되므로 작은 고정 크기로 유지
+            if len(self.mine_cache) > 64:
+                self.mine_cache.popitem(last=False)
+
+        else:
+            self.mine_cache.move_to_end(key)
+
+        return mines
+
+    def generate_chunk(self, cx: int, cy: int):
+        size = self.chunk_size
+        padded_size = size + 2
+        mines = self.chunk_mines(cx, cy)
+
+        # 위아래 좌우 이웃 청크의 맞닿은 한 줄을 붙인 (size + 2) x (size + 2) 평면에서 주변 지뢰 수를 센다
+        padded = bytearray(padded_size * padded_size)
+        up = self.chunk_mines(cx - 1, cy)
+        down = self.chunk_mines(cx + 1, cy)
+        left = self.chunk_mines(cx, cy - 1)
+        right = self.chunk_mines(cx, cy + 1)
+
+        padded[1:1 + size] = up[(size - 1) * size:]
+        padded[(size + 1) * padded_size + 1:(size + 1) * padded_size + 1 + size] = down[:size]
+
+        for lx in range(size):
+            row_start = (lx + 1) * padded_size
+            padded[row_start] = left[lx * size + size - 1]
+            padded[row_start + 1:row_start + 1 + size] = mines[lx * size:(lx + 1) * size]
+            padded[row_start + size + 1] = right[lx * size]
+
+        padded_counts = count_near_mines(padded, padded_size, padded_size)
+        near_mine_counts = bytearray(size * size)
+
+        for lx in range(size):
+            row_start = (lx + 1) * padded_size + 1
+            near_mine_counts[lx * size:(lx + 1) * size] = padded_counts[row_start:row_start + size]
+
+        states = bytearray(size * size)
+        hidden_safe_count = size * size - self.chunk_mine_count
+
+        if (cx, cy) in self.resolved_chunks:
+            hidden_safe_count = 0
+
+            # 다 풀린 청크는 지뢰가 아닌 칸을 모두 드러내고 커버 상태만 되살린다
+            states = bytearray(mines.translate(_RESOLVED_STATE_TABLE))
+
+            for index in self.resolved_chunks[(cx, cy)]:
+                states[index] |= BoardStorage.COVERED
+
+        if self.is_game_over:
+            for index in range(size * size):
+                if mines[index]:
+                    states[index] |= BoardStorage.REVEALED
+
+        self.generated_chunks += 1
+        chunk = Chunk(cx, cy, mines, near_mine_counts, states, hidden_safe_count)
+        chunk.touched = (cx, cy) in self.resolved_chunks
+        return chunk
+
+    def get_chunk(self, cx: int, cy: int):
+        key = (cx, cy)
+        chunk = self.chunks.get(key)
+
+        if chunk is not None:
+            self.chunks.move_to_end(key)
+            return chunk
+
+        chunk = self.generate_chunk(cx, cy)
+        self.chunks[key] = chunk
+        self.resident_bytes += chunk.nbytes()
+        self.evict()
+        return chunk
+
+    def evict(self):
+        # 예산을 넘으면 오래 쓰지 않은 청크부터, 건드리지 않았거나 다 풀린 청크만 내보낸다
+        if self.resident_bytes <= self.memory_budget:
+            return
+
+        for key in list(self.chunks):
+
+            if self.resident_bytes <= self.memory_budget:
+                break
+
+            chunk = self.chunks[key]
+
+            # 방금 적재한 청크는 내보내지 않는다
+            if key == next(reversed(self.chunks)):
+                break
+
+            if chunk.touched:
+
+                if not chunk.is_resolved():
+                    continue
+
+                self.resolved_chunks[key] = frozenset(
+                    index for index, state in enumerate(chunk.states) if state & BoardStorage.COVERED
+                )
+
+            del self.chunks[key]
+            self.resident_bytes -= chunk.nbytes()
+            self.evicted_chunks += 1
+
+    def locate(self, x: int, y: int):
+        cx, lx = divmod(x, self.chunk_size)
+        cy, ly = divmod(y, self.chunk_size)
+        return self.get_chunk(cx, cy), lx * self.chunk_size + ly
+
+    # ---- Map 과 같은 인터페이스 ----
+
+    def out_of_range(self, x, y):
+        return False
+
+    def neighbour_cells(self, x, y):
+        return [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]
+
+    def is_mine(self, x, y):
+        chunk, index = self.locate(x, y)
+        return chunk.mines[index] == 1
+
+    def is_covered(self, x, y):
+        chunk, index = self.locate(x, y)
+        return bool(chunk.states[index] & BoardStorage.COVERED)
+
+    def is_revealed(self, x, y):
+        chunk, index = self.locate(x, y)
+        return bool(chunk.states[index] & BoardStorage.REVEALED)
+
+    def near_mine_count(self, x, y):
+        chunk, index = self.locate(x, y)
+        return chunk.near_mine_counts[index]
+
+    def get_block_info(self, x, y):
+        chunk, index = self.locate(x, y)
+        state = chunk.states[index]
+
+        if chunk.mines[index]:
+
+            if state & BoardStorage.REVEALED:
+                return MineBlockInfo.revealed_mine()
+
+            if state & BoardStorage.COVERED:
+                return MineBlockInfo.covered_mine()
+
+            return MineBlockInfo.unrevealed_mine()
+
+        if state & BoardStorage.COVERED:
+            return BaseBlockInfo.covered_block()
+
+        if state & BoardStorage.REVEALED:
+            return BaseBlockInfo.revealed_block(chunk.near_mine_counts[index])
+
+        return BaseBlockInfo.unrevealed_block()
+
+    def snapshot(self, out=None, x: int = 0, y: int = 0, rows: Optional[int] = None, cols: Optional[int] = None):
+        # Map.snapshot 과 같은 형식, 끝이 없으므로 영역의 크기를 정해야 하고 영역이 걸친 청크는 적재한다
+        if rows is None or cols is None or rows <= 0 or cols <= 0:
+            raise ValueError(f"Endless boards need a region size for a snapshot, got {rows}x{cols}.")
+
+        size = rows * cols
+        chunk_size = self.chunk_size
+        view = None if out is None else memoryview(out).cast("B")
+
+        if view is not None and len(view) < size:
+            raise ValueError(f"Buffer holds {len(view)} bytes, the snapshot needs {size}.")
+
+        segments = []
+        offset = 0
+
+        for row in range(x, x + rows):
+            cx, lx = divmod(row, chunk_size)
+            column = y
+
+            # 한 행을 청크 경계마다 잘라 청크별로 변환한다
+            while column < y + cols:
+                cy, ly = divmod(column, chunk_size)
+                length = min(chunk_size - ly, y + cols - column)
+                chunk = self.get_chunk(cx, cy)
+                start = lx * chunk_size + ly
+                end = start + length
+                codes = cell_codes(chunk.near_mine_counts[start:end], chunk.mines[start:end], chunk.states[start:end])
+
+                if view is None:
+                    segments.append(codes)
+
+                else:
+                    view[offset:offset + length] = codes
+
+                offset += length
+                column += length
+
+        return b"".join(segments) if view is None else view[:size]
+
+    def reveal(self, x, y):
+        chunk, index = self.locate(x, y)
+
+        if chunk.mines[index]:
+            return ClickEventResult.MINE_BLOCK_REVEAL
+
+        if chunk.near_mine_counts[index] == 0:
+            self.reveal_adjacent_zero_blocks(x, y)
+
+        elif not chunk.states[index] & BoardStorage.REVEALED:
+            self.mark_revealed(chunk, index, x, y)
+
+        return ClickEventResult.BASE_BLOCK_REVEAL
+
+    def cover(self, x, y):
+        chunk, index = self.locate(x, y)
+        state = chunk.states[index]
+
+        if not chunk.mines[index] and state & BoardStorage.REVEALED:
+            return
+
+        chunk.states[index] = state ^ BoardStorage.COVERED
+        chunk.touched = True
+        self.changed_cells.add((x, y))
+
+        if chunk.mines[index]:
+            return ClickEventResult.MINE_BLOCK_UNCOVER if state & BoardStorage.COVERED \
+                else ClickEventResult.MINE_BLOCK_COVER
+
+        return ClickEventResult.BASE_BLOCK_UNCOVER if state & BoardStorage.COVERED \
+            else ClickEventResult.BASE_BLOCK_COVER
+
+    def mark_revealed(self, chunk: 'Chunk', index: int, x: int, y: int):
+        chunk.states[index] |= BoardStorage.REVEALED
+        chunk.touched = True
+        chunk.hidden_safe_count -= 1
+        self.changed_cells.add((x, y))
+
+    def reveal_adjacent_zero_blocks(self, x, y):
+        # 청크 경계를 넘어 필요한 청크만 적재하며 진행하는 너비 우선 탐색
+        if (x, y) not in self.cascade_seen:
+            self.cascade_seen.add((x, y))
+            self.cascade_frontier.append((x, y))
+
+        self.continue_cascade()
+
+    def continue_cascade(self, limit: Optional[int] = None):
+        # 보관한 탐색 경계에서 최대 limit(기본 MAX_CASCADE_CELLS) 칸을 더 드러내고 드러낸 칸 수를 돌려준다
+        # 큐에는 아직 드러나지 않은 칸을 한 번씩만 넣는다 (0 칸의 이웃은 지뢰가 아니다)
+        queue = self.cascade_frontier
+        seen = self.cascade_seen
+        limit = self.MAX_CASCADE_CELLS if limit is None else limit
+        revealed = 0
+
+        while queue and revealed < limit:
+            cx, cy = queue.popleft()
+            chunk, index = self.locate(cx, cy)
+
+            if chunk.states[index] & BoardStorage.REVEALED:
+                continue
+
+            self.mark_revealed(chunk, index, cx, cy)
+            revealed += 1
+
+            if chunk.near_mine_counts[index] != 0:
+                continue
+
+            for neighbour in self.neighbour_cells(cx, cy):
+
+                if neighbour not in seen and not self.is_revealed(*neighbour):
+                    seen.add(neighbour)
+                    queue.append(neighbour)
+
+        # 연쇄가 끝나면 다음 연쇄를 위해 비운다
+        if not queue:
+            seen.clear()
+
+        return revealed
+
+    def has_pending_cascade(self):
+        return bool(self.cascade_frontier)
+
+    def reveal_mine_block(self):
+        # 끝없는 맵에서는 적재된 청크의 지뢰만 드러내고, 이후 다시 만드는 청크도 지뢰를 드러낸 채로 만든다
+        self.is_game_over = True
+        self.cascade_frontier.clear()
+        self.cascade_seen.clear()
+        size = self.chunk_size
+
+        for chunk in self.chunks.values():
+            index = chunk.mines.find(1)
+
+            while index != -1:
+                chunk.states[index] |= BoardStorage.REVEALED
+                lx, ly = divmod(index, size)
+                self.changed_cells.add((chunk.cx * size + lx, chunk.cy * size + ly))
+                index = chunk.mines.find(1, index + 1)
+
+    def is_all_safe_revealed(self):
+        # 끝없는 맵은 모든 칸을 드러낼 수 없다
+        return False
+
+    def pop_changed_cells(self):
+        changed_cells = list(self.changed_cells)
+        self.changed_cells.clear()
+        return changed_cells
+
+    def memory_report(self):
+        pinned = sum(1 for chunk in self.chunks.values() if chunk.touched and not chunk.is_resolved())
+        return {
+            "resident_chunks": len(self.chunks),
+            "pinned_chunks": pinned,
+            "resident_bytes": self.resident_bytes,
+            "resolved_chunks": len(self.resolved_chunks),
+            "generated_chunks": self.generated_chunks,
+            "evicted_chunks": self.evicted_chunks,
+        }
+
+    @classmethod
+    def create_game(cls, seed: int, density: float = DEFAULT_DENSITY, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                    memory_budget: int = DEFAULT_MEMORY_BUDGET):
+        endless_map = cls(seed, density, chunk_size, memory_budget)
+        return GameController(Game.create_with_map(endless_map.total_mine_count, endless_map))
+
@@ -0,0 +1,60 @@
+from typing import *
+
+
+class LatencyHistogram:
+    # 로그-선형 버킷 히스토그램, 값을 저장하지 않으므로 수백만 번의 수를 기록해도 메모리가 일정하다
+    # 2의 거듭제곱 구간마다 16개 버킷을 두어 상대 오차는 1/16 이내
+    SUB_BUCKET_BITS = 4
+    SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        self.counts: Dict[int, int] = counts or {}
+        self.total = sum(self.counts.values())
+
+    @classmethod
+    def bucket_of(cls, value: int):
+
+        if value < cls.SUB_BUCKETS:
+            return value
+
+        shift = value.bit_length() - cls.SUB_BUCKET_BITS - 1
+        return (shift + 1) * cls.SUB_BUCKETS + ((value >> shift) & (cls.SUB_BUCKETS - 1))
+
+    @classmethod
+    def bucket_bounds(cls, bucket: int):
+
+        if bucket < cls.SUB_BUCKETS:
+            return bucket, bucket + 1
+
+        shift = bucket // cls.SUB_BUCKETS - 1
+        lower = (cls.SUB_BUCKETS + bucket % cls.SUB_BUCKETS) << shift
+        return lower, lower + (1 << shift)
+
+    def record(self, value: int):
+        bucket = self.bucket_of(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.total += 1
+
+    def merge(self, other: 'LatencyHistogram'):
+
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+
+        self.total += other.total
+
+    def percentile(self, percent: float):
+
+        if self.total == 0:
+            return 0
+
+        threshold = self.total * percent / 100
+        seen = 0
+
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+
+            if seen >= threshold:
+                lower, upper = self.bucket_bounds(bucket)
+                return (lower + upper) // 2
+
+        return self.bucket_bounds(max(self.counts))[1]
@@ -1,8 +1,11 @@
+import os
 import sys
 import traceback
 
-from PyQt5.QtWidgets import QMessageBox, QPushButton, QLineEdit, QFormLayout, QLabel, QVBoxLayout, QWidget, QApplication
-from minegame.minegame_ui import MineGame
+from PyQt5.QtWidgets import QMessageBox, QPushButton, QLineEdit, QFormLayout, QLabel, QVBoxLayout, QWidget, \
+    QApplication, QComboBox, QCheckBox
+from minegame.profiling import profiler
+from minegame.topology import TOPOLOGIES
 
 
 class MainUI(QWidget):
@@ -15,6 +18,16 @@ class MainUI(QWidget):
 
         layout = QVBoxLayout()
 
+        # 보드의 이웃 관계 선택, 난이도와 사용자 설정 게임 모두에 적용
+        layout.addWidget(QLabel("Board Topology:"))
+        self.topology_input = QComboBox()
+        self.topology_input.addItems(list(TOPOLOGIES))
+        layout.addWidget(self.topology_input)
+
+        # 첫 클릭부터 추측 없이 풀리는 보드로 시작 (시작 영역은 열린 채로 시작한다)
+        self.no_guess_input = QCheckBox("No guessing")
+        layout.addWidget(self.no_guess_input)
+
         # 버튼 및 라벨 생성
         layout.addWidget(QLabel("Select Difficulty:"))
         easy_button = QPushButton("Easy")
@@ -54,24 +67,32 @@ class MainUI(QWidget):
         self.setLayout(layout)
 
     def run_with_difficulty(self, difficulty_text):
+        # 게임 창 모듈은 처음 게임을 시작할 때 불러온다 (시작 화면만 띄우는 동안에는 필요 없다)
+        from minegame.minegame_ui import MineGame
+
         try:
-            MineGame.run_with_difficulty(difficulty_text)
+            MineGame.run_with_difficulty(difficulty_text, self.selected_topology(), self.no_guess_input.isChecked())
         except Exception as e:
             self.show_error_message(str(e))
             traceback.print_exc()
 
     def run_with_custom(self):
+        from minegame.minegame_ui import MineGame
+
         try:
             row = int(self.row_input.text())
             col = int(self.col_input.text())
             mine_count = int(self.mine_count_input.text())
-            MineGame.run_with_custom(row, col, mine_count)
+            MineGame.run_with_custom(row, col, mine_count, self.selected_topology(), self.no_guess_input.isChecked())
 
         except ValueError as e:
             self.show_error_message(f"Invalid input: {str(e)}")
         except Exception as e:
             self.show_error_message(f"Error: {str(e)}")
 
+    def selected_topology(self):
+        return TOPOLOGIES[self.topology_input.currentText()]
+
     def show_error_message(self, message):
         msg_box = QMessageBox()
         msg_box.setIcon(QMessageBox.Warning)
@@ -85,6 +106,18 @@ class MainApplication:
     @classmethod
     def run(cls):
         app = QApplication(sys.argv)
+
+        # 계측할 때는 UI 계측 대상도 감쌀 수 있도록 게임 창 모듈을 미리 불러온다
+        if os.environ.get(profiler.ENVIRONMENT_VARIABLE):
+            import minegame.minegame_ui
+
+        profiling = profiler.enable_from_environment()
+
         main_ui = MainUI()
         main_ui.show()
-        sys.exit(app.exec_())
+        exit_code = app.exec_()
+
+        if profiling:
+            profiler.stop_dump()
+
+        sys.exit(exit_code)
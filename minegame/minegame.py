@@ -2,9 +2,12 @@ import enum
 import random
 
 from abc import *
-from collections import deque
+from array import array
+from itertools import compress
 from typing import *
 
+from minegame.topology import SQUARE4, NeighbourTable, Topology
+
 
 class ClickEventResult(enum.Enum):
     BASE_BLOCK_REVEAL = (False, 0, 0)  # 안전 블록 클릭
@@ -45,18 +48,26 @@ class GamePiece(metaclass=ABCMeta):
 
 
 class BlockInfo(metaclass=ABCMeta):
+    # 칸 정보는 상태별로 하나씩만 만들어 두고 모든 조회가 공유하므로(flyweight) 만든 뒤에는 바꿀 수 없다
+    __slots__ = ()
+
     def is_reveal(self):
         pass
 
     def is_covered(self):
         pass
 
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} instances are shared and read-only.")
+
 
 class BaseBlockInfo(BlockInfo):
+    __slots__ = ("reveal", "covered", "near_mine_count")
+
     def __init__(self, is_reveal, is_covered, near_mine_count):
-        self.reveal = is_reveal
-        self.covered = is_covered
-        self.near_mine_count = near_mine_count
+        object.__setattr__(self, "reveal", is_reveal)
+        object.__setattr__(self, "covered", is_covered)
+        object.__setattr__(self, "near_mine_count", near_mine_count)
 
     def is_reveal(self):
         return self.reveal
@@ -66,22 +77,23 @@ class BaseBlockInfo(BlockInfo):
 
     @staticmethod
     def unrevealed_block():
-        return BaseBlockInfo(is_reveal=False, is_covered=False, near_mine_count=0)
+        return _UNREVEALED_BLOCK
 
     @staticmethod
     def covered_block():
-        return BaseBlockInfo(is_reveal=False, is_covered=True, near_mine_count=0)
-
+        return _COVERED_BLOCK
 
     @staticmethod
     def revealed_block(near_mine_count):
-        return BaseBlockInfo(is_reveal=True, is_covered=False, near_mine_count=near_mine_count)
+        return _REVEALED_BLOCKS[near_mine_count]
 
 
 class MineBlockInfo(BlockInfo):
+    __slots__ = ("reveal", "covered")
+
     def __init__(self, is_reveal, is_covered):
-        self.reveal = is_reveal
-        self.covered = is_covered
+        object.__setattr__(self, "reveal", is_reveal)
+        object.__setattr__(self, "covered", is_covered)
 
     def is_reveal(self):
         return self.reveal
@@ -91,17 +103,32 @@ class MineBlockInfo(BlockInfo):
 
     @staticmethod
     def unrevealed_mine():
-        return MineBlockInfo(is_reveal=False, is_covered=False)
+        return _UNREVEALED_MINE
 
     @staticmethod
     def revealed_mine():
-        return MineBlockInfo(is_reveal=True, is_covered=False)
+        return _REVEALED_MINE
 
     @staticmethod
     def covered_mine():
-        return MineBlockInfo(is_reveal=False, is_covered=True)
+        return _COVERED_MINE
 
 
+_UNREVEALED_BLOCK = BaseBlockInfo(is_reveal=False, is_covered=False, near_mine_count=0)
+_COVERED_BLOCK = BaseBlockInfo(is_reveal=False, is_covered=True, near_mine_count=0)
+_REVEALED_BLOCKS = tuple(BaseBlockInfo(is_reveal=True, is_covered=False, near_mine_count=count) for count in range(9))
+
+_UNREVEALED_MINE = MineBlockInfo(is_reveal=False, is_covered=False)
+_REVEALED_MINE = MineBlockInfo(is_reveal=True, is_covered=False)
+_COVERED_MINE = MineBlockInfo(is_reveal=False, is_covered=True)
+
+
+class CellCode:
+    # 보드 스냅샷에서 플레이어에게 보이는 칸 하나를 나타내는 바이트, 0~8 은 드러난 안전 칸의 주변 지뢰 수
+    HIDDEN = 9
+    FLAGGED = 10
+    MINE = 11  # 드러난 지뢰 (진 뒤)
+
 
 class BaseBlock(GamePiece):
 
@@ -200,121 +227,794 @@ class MineBlock(GamePiece):
         return f"MineBlock()"
 
 
+class BoardStorage:
+    # 셀 상태 플래그 (states 평면의 비트)
+    REVEALED = 0x01
+    COVERED = 0x02
+
+    def __init__(self, row: int, col: int, mines=None, near_mine_counts=None, states=None):
+        size = row * col
+
+        self.row = row
+        self.col = col
+
+        # 셀 하나당 1바이트를 쓰는 평면 구조, 인덱스는 x * col + y
+        # 비트로 묶지 않으므로 평면 세 개가 칸당 3바이트를 쓴다 (5000x5000 보드는 약 75MB)
+        # 평면 전체 연산(translate, find, 조각 대입, 바이트 단위 큰 정수 이웃 합, mmap 보드 파일)이 칸당 1바이트를 전제로 한다
+        self.mines = bytearray(size) if mines is None else mines  # 지뢰 여부 (0 또는 1)
+        self.near_mine_counts = bytearray(size) if near_mine_counts is None else near_mine_counts  # 주변 지뢰 개수
+        self.states = bytearray(size) if states is None else states  # 드러냄/커버 플래그
+
+    @classmethod
+    def from_blocks(cls, board: List[List[GamePiece]]):
+        row = len(board)
+        col = len(board[0]) if row else 0
+        storage = cls(row, col)
+
+        for i in range(row):
+            for j in range(col):
+                block = board[i][j]
+                index = i * col + j
+                state = cls.COVERED if block.is_covered() else 0
+
+                if isinstance(block, MineBlock):
+                    storage.mines[index] = 1
+
+                    if block.is_game_end:
+                        state |= cls.REVEALED
+
+                else:
+                    storage.near_mine_counts[index] = block.near_mine_count
+
+                    if block.is_revealed:
+                        state |= cls.REVEALED
+
+                storage.states[index] = state
+
+        return storage
+
+    def index(self, x: int, y: int):
+        return x * self.col + y
+
+    def nbytes(self):
+        return len(self.mines) + len(self.near_mine_counts) + len(self.states)
+
+
+# BoardStorage 의 한 셀을 기존 GamePiece 인터페이스로 보여주는 가벼운 뷰
+class BlockView(GamePiece):
+
+    def __init__(self, storage: 'BoardStorage', index: int):
+        self.storage = storage
+        self.index = index
+
+    def is_mine(self):
+        return self.storage.mines[self.index] == 1
+
+    @property
+    def near_mine_count(self):
+        return self.storage.near_mine_counts[self.index]
+
+    @property
+    def is_revealed(self):
+        return bool(self.storage.states[self.index] & BoardStorage.REVEALED)
+
+    def reveal(self):
+
+        if self.is_mine():
+            return ClickEventResult.MINE_BLOCK_REVEAL
+
+        self.storage.states[self.index] |= BoardStorage.REVEALED
+        return ClickEventResult.BASE_BLOCK_REVEAL
+
+    def cover(self):
+        states = self.storage.states
+        state = states[self.index]
+
+        if self.is_mine():
+
+            if state & BoardStorage.COVERED:
+                states[self.index] = state & ~BoardStorage.COVERED
+                return ClickEventResult.MINE_BLOCK_UNCOVER
+
+            states[self.index] = state | BoardStorage.COVERED
+            return ClickEventResult.MINE_BLOCK_COVER
+
+        if state & BoardStorage.REVEALED:
+            return
+
+        if state & BoardStorage.COVERED:
+            states[self.index] = state & ~BoardStorage.COVERED
+            return ClickEventResult.BASE_BLOCK_UNCOVER
+
+        states[self.index] = state | BoardStorage.COVERED
+        return ClickEventResult.BASE_BLOCK_COVER
+
+    def is_covered(self):
+        return bool(self.storage.states[self.index] & BoardStorage.COVERED)
+
+    def is_near_mine_count_zero(self):
+        return self.near_mine_count == 0
+
+    def get_info(self):
+        state = self.storage.states[self.index]
+
+        if self.is_mine():
+
+            if state & BoardStorage.REVEALED:
+                return MineBlockInfo.revealed_mine()
+
+            if state & BoardStorage.COVERED:
+                return MineBlockInfo.covered_mine()
+
+            return MineBlockInfo.unrevealed_mine()
+
+        if state & BoardStorage.COVERED:
+            return BaseBlockInfo.covered_block()
+
+        if state & BoardStorage.REVEALED:
+            return BaseBlockInfo.revealed_block(self.near_mine_count)
+
+        return BaseBlockInfo.unrevealed_block()
+
+    def __repr__(self):
+        if self.is_mine():
+            return "MineBlock()"
+
+        return f"BaseBlock(near_mine_count = {self.near_mine_count})"
+
+
+# 지뢰 칸은 0, 안전 칸은 0xFF 로 바꾸는 변환 테이블
+_SAFE_MASK_TABLE = bytes([0xFF]) + bytes(255)
+
+# REVEALED 플래그가 켜진 칸만 0xFF 로 바꾸는 변환 테이블
+_REVEALED_FLAG_TABLE = bytes(0xFF if value & BoardStorage.REVEALED else 0 for value in range(256))
+
+# 주변 지뢰 개수가 0 인 칸만 1 로 바꾸는 변환 테이블
+_ZERO_COUNT_TABLE = bytes([1]) + bytes(255)
+
+# REVEALED 플래그가 켜진 칸만 1 로 바꾸는 변환 테이블
+_REVEALED_BIT_TABLE = bytes(1 if value & BoardStorage.REVEALED else 0 for value in range(256))
+
+# COVERED 플래그가 켜진 칸만 1 로 바꾸는 변환 테이블
+_COVERED_BIT_TABLE = bytes(1 if value & BoardStorage.COVERED else 0 for value in range(256))
+
+# 0 이 아닌 칸을 1 로 바꾸는 변환 테이블
+_NONZERO_TABLE = bytes([0]) + bytes([1]) * 255
+
+# 칸 키 (주변 지뢰 수 | 지뢰 << 4 | 상태 << 5) 에서 칸 정보와 CellCode 를 찾는 표, 세 값이 겹치지 않으므로 평면을 큰 정수로
+# 합쳐 보드 전체의 키를 한 번에 만들 수 있다 (주변 지뢰 수는 8 이하, 상태는 REVEALED | COVERED 이하)
+def _cell_key_info(key: int):
+    count, mine, state = key & 0x0F, key >> 4 & 1, key >> 5
+
+    if mine:
+        if state & BoardStorage.REVEALED:
+            return MineBlockInfo.revealed_mine()
+
+        return MineBlockInfo.covered_mine() if state & BoardStorage.COVERED else MineBlockInfo.unrevealed_mine()
+
+    if state & BoardStorage.COVERED:
+        return BaseBlockInfo.covered_block()
+
+    if state & BoardStorage.REVEALED:
+        return BaseBlockInfo.revealed_block(min(count, 8))
+
+    return BaseBlockInfo.unrevealed_block()
+
+
+def _cell_info_code(info: 'BlockInfo'):
+
+    if info.is_reveal():
+        return CellCode.MINE if isinstance(info, MineBlockInfo) else info.near_mine_count
+
+    return CellCode.FLAGGED if info.is_covered() else CellCode.HIDDEN
+
+
+_BLOCK_INFO_TABLE = tuple(_cell_key_info(key) for key in range(128))
+_CELL_CODE_TABLE = bytes(_cell_info_code(info) for info in _BLOCK_INFO_TABLE) + bytes([CellCode.HIDDEN]) * 128
+
+def cell_codes(near_mine_counts: bytes, mines: bytes, states: bytes):
+    # 같은 범위로 자른 세 평면에서 칸마다 CellCode 한 바이트를 만든다
+    # 세 값이 칸 키에서 겹치지 않으므로 평면을 큰 정수로 합쳐 키를 한 번에 만들고 표 하나로 변환한다
+    keys = int.from_bytes(near_mine_counts, "little") | int.from_bytes(mines, "little") << 4 \
+        | int.from_bytes(states, "little") << 5
+    return keys.to_bytes(len(states), "little").translate(_CELL_CODE_TABLE)
+
+
+# 평면 탐색용 바이트, bytearray 와 mmap 평면 모두에서 find 에 쓸 수 있다
+_ZERO_BYTE = b"\x00"
+_ONE_BYTE = b"\x01"
+
+
+class ZeroRegionIndex:
+    # 주변 지뢰가 없는 칸들의 연결 영역 색인
+    # 아직 드러나지 않은 0 칸을 1 로 표시한 평면을 보관하고, 연쇄 드러내기 때 영역을 행 단위 구간(span)으로 찾은 뒤
+    # 영역과 그 경계의 숫자 칸을 한 번에 드러낸다. 0 칸의 이웃에는 지뢰가 없으므로 경계는 영역의 이웃 칸 전체다.
+    # 구간이 위아래 행과 이어지는 범위와 경계 계산은 보드의 Topology 를 따른다
+
+    def __init__(self, storage: 'BoardStorage', pending=None, topology: 'Topology' = SQUARE4):
+        self.row = storage.row
+        self.col = storage.col
+        self.topology = topology
+
+        # 저장해 둔 평면(예: 디스크에 매핑된 평면)이 있으면 그대로 쓴다
+        if pending is not None:
+            self.pending = pending
+            return
+
+        zero_cells = int.from_bytes(storage.near_mine_counts[:].translate(_ZERO_COUNT_TABLE), "little")
+        zero_cells &= int.from_bytes(storage.mines[:].translate(_SAFE_MASK_TABLE), "little")
+
+        # 이미 드러난 칸은 연쇄 드러내기가 지나가지 않는다
+        revealed = storage.states[:].translate(_REVEALED_FLAG_TABLE)
+        zero_cells &= ~int.from_bytes(revealed, "little")
+
+        self.pending = bytearray(zero_cells.to_bytes(self.row * self.col, "little"))
+
+    def reveal_region(self, index: int, states: bytearray, changed_cells: Set[int]):
+        # 새로 드러난 칸 수를 돌려준다
+
+        if not self.pending[index]:
+            return 0
+
+        return self.mark_revealed(self.find_region(index), states, changed_cells)
+
+    def find_region(self, index: int):
+        # 시작 칸이 속한 연결 영역을 행 단위 구간 [left, right) 목록으로 찾고 색인에서 지운다
+        pending = self.pending
+        row = self.row
+        col = self.col
+        wrap = self.topology.wrap
+        span_links = self.topology.span_links
+
+        spans = []
+        stack = [index]
+
+        while stack:
+            start = stack.pop()
+
+            if not pending[start]:
+                continue
+
+            x = start // col
+            row_start = x * col
+            row_end = row_start + col
+
+            left = pending.rfind(_ZERO_BYTE, row_start, start)
+            left = row_start if left == -1 else left + 1
+            right = pending.find(_ZERO_BYTE, start, row_end)
+            right = row_end if right == -1 else right
+
+            pending[left:right] = bytes(right - left)
+            spans.append((left, right))
+
+            # 좌우가 이어진 보드에서는 행의 양 끝도 서로 이웃이다
+            if wrap:
+                if left == row_start and pending[row_end - 1]:
+                    stack.append(row_end - 1)
+
+                if right == row_end and pending[row_start]:
+                    stack.append(row_start)
+
+            # 위아래 행에서 이어지는 0 칸 구간을 찾는다
+            for dx, left_offset, right_offset in span_links[x & 1]:
+                next_row = x + dx
+
+                if wrap:
+                    next_row %= row
+
+                elif not 0 <= next_row < row:
+                    continue
+
+                span_left = left - row_start + left_offset
+                span_right = right - row_start + right_offset
+
+                if not wrap:
+                    ranges = ((max(0, span_left), min(col, span_right)),)
+
+                elif span_right - span_left >= col:
+                    ranges = ((0, col),)
+
+                elif span_left < 0:
+                    ranges = ((span_left + col, col), (0, span_right))
+
+                elif span_right > col:
+                    ranges = ((span_left, col), (0, span_right - col))
+
+                else:
+                    ranges = ((span_left, span_right),)
+
+                base = next_row * col
+
+                for range_left, range_right in ranges:
+                    range_left += base
+                    range_right += base
+                    next_start = pending.find(_ONE_BYTE, range_left, range_right)
+
+                    while next_start != -1:
+                        stack.append(next_start)
+                        next_end = pending.find(_ZERO_BYTE, next_start, range_right)
+
+                        if next_end == -1:
+                            break
+
+                        next_start = pending.find(_ONE_BYTE, next_end, range_right)
+
+        return spans
+
+    def mark_revealed(self, spans: List[Tuple[int, int]], states: bytearray, changed_cells: Set[int]):
+        # 영역이 걸친 행과 위아래 한 행만 잘라 영역과 경계를 한 번에 드러낸다
+        # 끝이 이어진 보드는 경계가 반대쪽 끝으로 넘어갈 수 있으므로 보드 전체를 쓴다
+        col = self.col
+
+        if self.topology.wrap:
+            first_row, last_row = 0, self.row - 1
+
+        else:
+            first_row = max(0, min(left for left, _ in spans) // col - 1)
+            last_row = min(self.row - 1, max(right - 1 for _, right in spans) // col + 1)
+
+        band_start = first_row * col
+        band_end = (last_row + 1) * col
+        band_rows = last_row - first_row + 1
+
+        region = bytearray(band_end - band_start)
+
+        for left, right in spans:
+            region[left - band_start:right - band_start] = b"\x01" * (right - left)
+
+        # 영역 자신과 이웃을 더한 뒤 0 이 아닌 칸이 드러날 칸
+        reveal = int.from_bytes(region, "little") + self.topology.neighbour_sum(region, band_rows, col, first_row)
+        reveal = int.from_bytes(reveal.to_bytes(len(region) + col + 1, "little")[:len(region)]
+                                .translate(_NONZERO_TABLE), "little")
+
+        old_states = states[band_start:band_end]
+        revealed_before = int.from_bytes(old_states.translate(_REVEALED_BIT_TABLE), "little")
+
+        states[band_start:band_end] = (int.from_bytes(old_states, "little") | reveal * BoardStorage.REVEALED) \
+            .to_bytes(len(region), "little")
+
+        newly_revealed = reveal & ~revealed_before
+        changed_cells.update(compress(range(band_start, band_end), newly_revealed.to_bytes(len(region), "little")))
+
+        # 칸마다 비트 하나씩이므로 켜진 비트 수가 새로 드러난 칸 수
+        return newly_revealed.bit_count()
+
+    def restore(self, cells: Iterable[int], storage: 'BoardStorage'):
+        # 되돌려서 다시 드러나지 않은 0 칸을 색인에 돌려놓는다
+        pending = self.pending
+        mines = storage.mines
+        near_mine_counts = storage.near_mine_counts
+        states = storage.states
+
+        for index in cells:
+            pending[index] = not (mines[index] or near_mine_counts[index] or states[index] & BoardStorage.REVEALED)
+
+
+# 밀도가 1/256 이하(또는 이상)인 보드는 부분 Fisher-Yates 로, 그 사이는 바이트 임계값 샘플링으로 생성
+SPARSE_SAMPLE_RATIO = 256
+
+
+def _fisher_yates_indices(size: int, count: int, rng):
+    # 전체 좌표 리스트 없이 앞쪽 count 개만 섞는 부분 Fisher-Yates, 옮겨진 값만 dict 에 기록
+    swapped = {}
+
+    for i in range(count):
+        j = rng.randrange(i, size)
+        yield swapped.get(j, j)
+        swapped[j] = swapped.get(i, i)
+
+
+def sample_mine_bitmap(size: int, count: int, rng: Optional[random.Random] = None):
+    rng = rng or random
+
+    if count * SPARSE_SAMPLE_RATIO <= size:
+        mines = bytearray(size)
+
+        for index in _fisher_yates_indices(size, count, rng):
+            mines[index] = 1
+
+        return mines
+
+    if (size - count) * SPARSE_SAMPLE_RATIO <= size:
+        mines = bytearray(b"\x01") * size
+
+        for index in _fisher_yates_indices(size, size - count, rng):
+            mines[index] = 0
+
+        return mines
+
+    # 모든 칸을 독립적으로 count / size 에 가까운 확률로 지뢰로 만든 뒤, 남거나 모자란 개수만 무작위로 보정
+    # 모든 단계가 칸의 순서와 무관하므로 결과는 count 개 지뢰 배치 중 균등하게 선택된다
+    threshold = count * 256 // size
+    table = bytes(1 if value < threshold else 0 for value in range(256))
+    mines = bytearray(rng.randbytes(size).translate(table))
+    current = mines.count(1)
+
+    while current < count:
+        index = rng.randrange(size)
+
+        if not mines[index]:
+            mines[index] = 1
+            current += 1
+
+    while current > count:
+        index = rng.randrange(size)
+
+        if mines[index]:
+            mines[index] = 0
+            current -= 1
+
+    return mines
+
+
+def sample_mine_bitmap_excluding(size: int, count: int, excluded: Iterable[int], rng: Optional[random.Random] = None):
+    # 제외할 칸을 뺀 나머지 칸에서 count 개를 고른 뒤, 제외한 칸 자리에 0 을 끼워 넣는다
+    excluded = sorted(set(excluded))
+    sample = sample_mine_bitmap(size - len(excluded), count, rng)
+    mines = bytearray()
+    sample_start = 0
+
+    for offset, index in enumerate(excluded):
+        mines += sample[sample_start:index - offset]
+        mines.append(0)
+        sample_start = index - offset
+
+    mines += sample[sample_start:]
+    return mines
+
+
+def count_near_mines(mines: bytearray, row: int, col: int, topology: 'Topology' = SQUARE4):
+    size = row * col
+    total = topology.neighbour_sum(mines, row, col)
+
+    # 지뢰 칸의 개수는 0 으로 유지
+    total &= int.from_bytes(mines.translate(_SAFE_MASK_TABLE), "little")
+
+    return bytearray(total.to_bytes(size + col + 1, "little")[:size])
+
+
+class SizeLimit(NamedTuple):
+    # 보드를 만드는 쪽(화면, 서버 등)이 받아들이는 최대 보드 크기, Map.validate 에 넘긴다
+    max_row: int
+    max_col: int
+
+
 class Map:
     MIN_ROW_SIZE = 4
-    MAX_ROW_SIZE = 25
-
     MIN_COL_SIZE = 4
-    MAX_COL_SIZE = 25
 
-    def __init__(self, row: int, col: int, total_mine_count: int, board: List[List[GamePiece]]):
+    # 칸 단위 이웃 표를 만드는 가장 큰 보드 (표는 칸당 최대 72바이트, 이 크기에서 약 4.5MB)
+    NEIGHBOUR_TABLE_MAX_CELLS = 256 * 256
+
+    def __init__(self, row: int, col: int, total_mine_count: int, board: Union['BoardStorage', List[List[GamePiece]]],
+                 revealed_safe_count: Optional[int] = None, topology: 'Topology' = SQUARE4):
 
         # 유효성 검사
-        self.validate(row, col, total_mine_count)
+        self.validate(row, col, total_mine_count, topology)
+
+        # 블록 객체로 이루어진 기존 보드는 평면 저장소로 변환
+        if not isinstance(board, BoardStorage):
+            board = BoardStorage.from_blocks(board)
 
         self.row = row
         self.col = col
+        self.total_mine_count = total_mine_count
         self.board = board
 
-    @classmethod
-    def create(cls, row: int, col: int, total_mine_count):
+        # 이웃 관계, 칸 단위 이웃 표는 작은 보드에서만 처음 필요할 때 가져온다 (같은 크기의 보드와 나눠 쓴다)
+        self.topology = topology
+        self.neighbour_table: Optional['NeighbourTable'] = None
 
-        dx = [1, -1, 0, 0]
-        dy = [0, 0, 1, -1]
+        # 마지막으로 가져간 이후 상태가 바뀐 셀의 평면 인덱스
+        self.changed_cells: Set[int] = set()
 
-        current_board = [[BaseBlock() for j in range(col)] for i in range(row)]
+        # 동작 하나로 바뀐 셀 묶음을 받는 리스너 (solver 등)
+        self.change_listeners: List[Callable[[Set[int]], None]] = []
 
-        mine_pos = random.sample([(i, j) for i in range(row) for j in range(col)], total_mine_count)
+        # 0 칸 연결 영역 색인, 보드 크기의 평면을 하나 더 쓰므로 생성 때가 아니라 첫 연쇄 드러내기 때 만든다
+        self.zero_regions: Optional['ZeroRegionIndex'] = None
 
-        for x, y in mine_pos:
-            current_board[x][y] = MineBlock()
+        # 지뢰 위치 색인, 게임 종료 때 전체 칸 대신 지뢰만 돈다 (처음 필요할 때 만든다)
+        self.mine_positions: Optional['array'] = None
 
-            for k in range(4):
-                nx = x + dx[k]
-                ny = y + dy[k]
+        # 지뢰를 첫 드러내기 때 놓는 보드의 배치 설정, 지뢰가 놓이면 None
+        self.placement: Optional['MinePlacement'] = None
 
-                if nx < 0 or ny < 0 or nx >= row or ny >= col:
-                    continue
+        # 드러난 안전 칸 수, 모든 안전 칸이 드러났는지를 O(1) 로 판단한다
+        self.safe_cell_count = row * col - total_mine_count
+        self.revealed_safe_count = self.count_revealed_safe() if revealed_safe_count is None else revealed_safe_count
+
+    @classmethod
+    def create(cls, row: int, col: int, total_mine_count, rng: Optional[random.Random] = None,
+               topology: 'Topology' = SQUARE4, size_limit: Optional['SizeLimit'] = None):
 
-                if isinstance(current_board[nx][ny], BaseBlock):
-                    current_board[nx][ny].increase_near_mine_count()
+        cls.validate(row, col, total_mine_count, topology, size_limit)
 
-        return Map(row, col, total_mine_count, current_board)
+        mines = sample_mine_bitmap(row * col, total_mine_count, rng)
+        near_mine_counts = count_near_mines(mines, row, col, topology)
+        storage = BoardStorage(row, col, mines=mines, near_mine_counts=near_mine_counts)
+
+        return Map(row, col, total_mine_count, storage, revealed_safe_count=0, topology=topology)
 
     @classmethod
-    def validate(cls, row: int, col: int, total_mine_count: int):
+    def create_deferred(cls, row: int, col: int, total_mine_count, rng: Optional[random.Random] = None,
+                        topology: 'Topology' = SQUARE4, exclude_neighbours: bool = True,
+                        size_limit: Optional['SizeLimit'] = None):
+        # 빈 보드만 만들어 두고 지뢰와 주변 지뢰 개수는 첫 드러내기(place_mines)에서 만든다
+        cls.validate(row, col, total_mine_count, topology, size_limit)
+
+        current_map = Map(row, col, total_mine_count, BoardStorage(row, col), revealed_safe_count=0, topology=topology)
+        current_map.placement = MinePlacement(rng, exclude_neighbours)
+        return current_map
 
+    @classmethod
+    def validate(cls, row: int, col: int, total_mine_count: int, topology: 'Topology' = SQUARE4,
+                 size_limit: Optional['SizeLimit'] = None):
+        # size_limit 은 보드를 만드는 쪽(화면, 서버 등)이 정한 최대 크기, 없으면 크기의 상한을 검사하지 않는다
         if not (1 <= total_mine_count < row * col):
             raise ValueError(f"Mine count ({total_mine_count}) must be between 1 and {row * col - 1}.")
 
-        if not (cls.MIN_ROW_SIZE <= row <= cls.MAX_ROW_SIZE):
-            raise ValueError(f"Rows ({row}) must be between {cls.MIN_ROW_SIZE} and {cls.MAX_ROW_SIZE}.")
+        max_row, max_col = (row, col) if size_limit is None else size_limit
 
-        if not (cls.MIN_COL_SIZE <= col <= cls.MAX_COL_SIZE):
-            raise ValueError(f"Columns ({col}) must be between {cls.MIN_COL_SIZE} and {cls.MAX_COL_SIZE}.")
+        if not (cls.MIN_ROW_SIZE <= row <= max_row):
+            raise ValueError(f"Rows ({row}) must be between {cls.MIN_ROW_SIZE} and {max_row}."
+                             if size_limit is not None else f"Rows ({row}) must be at least {cls.MIN_ROW_SIZE}.")
+
+        if not (cls.MIN_COL_SIZE <= col <= max_col):
+            raise ValueError(f"Columns ({col}) must be between {cls.MIN_COL_SIZE} and {max_col}."
+                             if size_limit is not None else f"Columns ({col}) must be at least {cls.MIN_COL_SIZE}.")
+
+        topology.validate(row, col)
 
     def get_block_info(self, x, y):
-        return self.board[x][y].get_info()
+        return _BLOCK_INFO_TABLE[self.cell_key(x * self.col + y)]
+
+    def cell_key(self, index: int):
+        board = self.board
+        return board.near_mine_counts[index] | board.mines[index] << 4 | board.states[index] << 5
+
+    def cell_code(self, x, y):
+        return _CELL_CODE_TABLE[self.cell_key(x * self.col + y)]
+
+    def snapshot(self, out=None, x: int = 0, y: int = 0, rows: Optional[int] = None, cols: Optional[int] = None):
+        # 플레이어에게 보이는 보드(또는 (x, y) 에서 시작하는 rows x cols 영역)를 칸당 CellCode 한 바이트로, 행 우선 순서
+        # 행마다 세 평면을 큰 정수 하나로 합친 키를 표 하나로 변환하므로 칸마다 파이썬 객체를 만들지 않고,
+        # 임시 객체도 한 행 크기를 넘지 않는다
+        # out(bytearray, array, numpy 배열 등 쓰기 가능한 버퍼)을 주면 변환한 행을 그 앞부분에 바로 채우고 채운 부분의
+        # memoryview 를, 없으면 bytes 를 돌려준다
+        rows = self.row - x if rows is None else rows
+        cols = self.col - y if cols is None else cols
+
+        if not (0 <= x and 0 <= y and 0 < rows and 0 < cols and x + rows <= self.row and y + cols <= self.col):
+            raise ValueError(f"Region ({x}, {y}) {rows}x{cols} is outside the {self.row}x{self.col} board.")
+
+        size = rows * cols
+        view = None if out is None else memoryview(out).cast("B")
+
+        if view is not None and len(view) < size:
+            raise ValueError(f"Buffer holds {len(view)} bytes, the snapshot needs {size}.")
+
+        near_mine_counts, mines, states = self.board.near_mine_counts, self.board.mines, self.board.states
+        segments = []
+        offset = 0
+
+        for start in range(x * self.col + y, (x + rows) * self.col, self.col):
+            end = start + cols
+            codes = cell_codes(near_mine_counts[start:end], mines[start:end], states[start:end])
+
+            if view is None:
+                segments.append(codes)
+
+            else:
+                view[offset:offset + cols] = codes
+
+            offset += cols
+
+        return b"".join(segments) if view is None else view[:size]
 
     def get_block(self, x, y):
-        return self.board[x][y]
+        return BlockView(self.board, x * self.col + y)
+
+    def is_mine(self, x, y):
+        return self.board.mines[x * self.col + y] == 1
+
+    def is_covered(self, x, y):
+        return bool(self.board.states[x * self.col + y] & BoardStorage.COVERED)
+
+    def is_revealed(self, x, y):
+        return bool(self.board.states[x * self.col + y] & BoardStorage.REVEALED)
+
+    def near_mine_count(self, x, y):
+        return self.board.near_mine_counts[x * self.col + y]
+
+    def neighbours(self, index: int):
+        # 큰 보드의 이웃 표는 보드 전체를 만들어야 하고 칸당 수십 바이트를 쓰므로 칸마다 바로 계산한다
+        table = self.neighbour_table
+
+        if table is None:
+
+            if self.row * self.col > self.NEIGHBOUR_TABLE_MAX_CELLS:
+                return self.topology.neighbour_indices(index, self.row, self.col)
+
+            table = self.neighbour_table = self.topology.neighbour_table(self.row, self.col)
+
+        return table[index]
+
+    def neighbour_cells(self, x, y):
+        return self.topology.neighbour_cells(x, y, self.row, self.col)
 
     def reveal(self, x, y):
 
         if self.out_of_range(x, y):
             return
 
-        block = self.board[x][y]
+        if self.placement is not None:
+            self.place_mines(x, y)
+
+        index = x * self.col + y
+        changed_cells = self.begin_changes()
+
+        if not self.board.mines[index]:
+
+            if self.board.near_mine_counts[index] == 0:
+                self.reveal_adjacent_zero_blocks(x, y, changed_cells)
+
+            elif not self.board.states[index] & BoardStorage.REVEALED:
+                changed_cells.add(index)
+                self.revealed_safe_count += 1
+
+        result = BlockView(self.board, index).reveal()
+        self.publish_changes(changed_cells)
+        return result
+
+    @property
+    def mines_placed(self):
+        return self.placement is None
+
+    def place_mines(self, x, y):
+        # 처음 드러내는 칸(설정에 따라 그 이웃까지)을 빼고 지뢰를 놓는다
+        # 이웃까지 빼면 지뢰를 다 놓을 수 없는 보드는 처음 드러내는 칸만 뺀다
+        placement = self.placement
+        self.placement = None
+
+        size = self.row * self.col
+        start = x * self.col + y
+        excluded = [start]
 
-        if isinstance(block, BaseBlock) and block.is_near_mine_count_zero():
-            self.reveal_adjacent_zero_blocks(x, y)
+        if placement.exclude_neighbours:
+            excluded += [nx * self.col + ny for nx, ny in self.topology.neighbour_cells(x, y, self.row, self.col)]
 
-        return self.board[x][y].reveal()
+            if size - len(set(excluded)) < self.total_mine_count:
+                excluded = [start]
+
+        self.set_mines(sample_mine_bitmap_excluding(size, self.total_mine_count, excluded, placement.rng))
+
+    def set_mines(self, mines: bytes):
+        # 지뢰 평면을 통째로 놓는다 (첫 드러내기 때 뽑은 배치, 스냅샷에 저장해 둔 배치)
+        self.placement = None
+
+        board = self.board
+        board.mines[:] = mines
+        board.near_mine_counts[:] = count_near_mines(mines, self.row, self.col, self.topology)
+
+        # 지뢰에서 파생된 색인은 새 보드로 처음 필요할 때 다시 만든다
+        self.zero_regions = None
+        self.mine_positions = None
 
     def cover(self, x, y):
 
         if self.out_of_range(x, y):
             return
 
-        return self.board[x][y].cover()
+        index = x * self.col + y
+        result = BlockView(self.board, index).cover()
 
-    def reveal_adjacent_zero_blocks(self, x, y):
+        if result is not None:
+            self.publish_changes({index})
 
-        dx = [1, -1, 0, 0]
-        dy = [0, 0, 1, -1]
+        return result
 
-        queue = deque([(x, y)])
+    def pop_changed_cells(self):
+        changed_cells = [divmod(index, self.col) for index in self.changed_cells]
+        self.changed_cells.clear()
+        return changed_cells
 
-        while queue:
-            cx, cy = queue.popleft()
-            current_block = self.board[cx][cy]
+    def add_change_listener(self, listener: Callable[[Set[int]], None]):
+        self.change_listeners.append(listener)
 
-            if not isinstance(current_block, BaseBlock) or current_block.is_revealed:
-                continue
+    def remove_change_listener(self, listener: Callable[[Set[int]], None]):
+        self.change_listeners.remove(listener)
 
-            current_block.set_reveal(True)
+    def begin_changes(self):
+        # 리스너가 없으면 누적 집합에 바로 기록하고, 있으면 동작 하나의 묶음을 따로 모은다
+        return set() if self.change_listeners else self.changed_cells
 
-            if current_block.is_near_mine_count_zero():
+    def publish_changes(self, changed_cells: Set[int]):
 
-                for k in range(4):
-                    nx = cx + dx[k]
-                    ny = cy + dy[k]
+        if changed_cells is self.changed_cells:
+            return
 
-                    if self.out_of_range(nx, ny):
-                        continue
+        self.changed_cells |= changed_cells
+
+        for listener in self.change_listeners:
+            listener(changed_cells)
+
+    def reveal_adjacent_zero_blocks(self, x, y, changed_cells: Optional[Set[int]] = None):
+
+        if self.zero_regions is None:
+            self.zero_regions = ZeroRegionIndex(self.board, topology=self.topology)
+
+        if changed_cells is None:
+            batch = self.begin_changes()
+            self.revealed_safe_count += self.zero_regions.reveal_region(x * self.col + y, self.board.states, batch)
+            self.publish_changes(batch)
+            return
 
-                    queue.append((nx, ny))
+        self.revealed_safe_count += self.zero_regions.reveal_region(x * self.col + y, self.board.states, changed_cells)
 
     def out_of_range(self, x, y):
         return x < 0 or y < 0 or x >= self.row or y >= self.col
 
     def reveal_mine_block(self):
-        for i in range(self.row):
-            for j in range(self.col):
-                block = self.board[i][j]
+        states = self.board.states
+        changed_cells = self.begin_changes()
 
-                if isinstance(block, MineBlock):
-                    block.game_end()
+        for index in self.get_mine_positions():
+            states[index] |= BoardStorage.REVEALED
+
+        changed_cells.update(self.mine_positions)
+        self.publish_changes(changed_cells)
+
+    def get_mine_positions(self):
+
+        if self.mine_positions is None:
+            # mmap 평면은 순회하면 bytes 를 돌려주므로 잘라서 bytes 로 바꾼 뒤 순회한다
+            mines = self.board.mines[:]
+            self.mine_positions = array("q", compress(range(len(mines)), mines))
+
+        return self.mine_positions
+
+    def count_revealed_safe(self):
+        revealed = int.from_bytes(self.board.states[:].translate(_REVEALED_BIT_TABLE), "little")
+        return (revealed & int.from_bytes(self.board.mines[:].translate(_SAFE_MASK_TABLE), "little")).bit_count()
+
+    def count_covered_mines(self):
+        covered = int.from_bytes(self.board.states[:].translate(_COVERED_BIT_TABLE), "little")
+        return (covered & int.from_bytes(self.board.mines[:], "little")).bit_count()
+
+    def is_all_safe_revealed(self):
+        return self.revealed_safe_count == self.safe_cell_count
+
+    def flip_cells(self, cells: Iterable[int], flag: int):
+        # 기록된 동작 하나가 바꾼 칸들의 플래그를 다시 뒤집는다 (되돌리기와 다시 하기 모두 같은 연산)
+        states = self.board.states
+        mines = self.board.mines
+        changed_cells = set(cells)
+        revealed_safe_offset = 0
+
+        for index in changed_cells:
+            state = states[index] ^ flag
+            states[index] = state
+
+            if flag == BoardStorage.REVEALED and not mines[index]:
+                revealed_safe_offset += 1 if state & BoardStorage.REVEALED else -1
+
+        self.revealed_safe_count += revealed_safe_offset
+
+        if flag == BoardStorage.REVEALED and self.zero_regions is not None:
+            self.zero_regions.restore(changed_cells, self.board)
+
+        self.publish_changes(changed_cells)
+
+    def rebuild_indexes(self):
+        # 상태 평면을 통째로 바꾼 뒤(스냅샷 복원 등) 상태에서 파생된 색인을 버리고 다시 센다
+        self.zero_regions = None
+        self.revealed_safe_count = self.count_revealed_safe()
+
+
+class MinePlacement(NamedTuple):
+    rng: Optional[random.Random]
+    exclude_neighbours: bool  # 처음 드러내는 칸의 이웃에도 지뢰를 두지 않는다
 
 
 class GameState:
@@ -324,6 +1024,110 @@ class GameState:
     LOSE = "LOSE"
 
 
+class Action:
+    REVEAL = "REVEAL"
+    COVER = "COVER"
+    UNDO = "UNDO"
+    REDO = "REDO"
+    CHORD = "CHORD"  # 주변 커버 수가 숫자와 같은 칸의 커버되지 않은 이웃을 모두 드러낸다
+
+
+class ActionBatchResult(NamedTuple):
+    changed_cells: List[Tuple[int, int]]  # 묶음 전체에서 상태가 바뀐 칸
+    game_state: str
+    applied_count: int  # 게임이 끝나 적용하지 않은 동작을 뺀 수
+
+
+class ActionBatchError(Exception):
+    # 묶음 중간의 동작이 실패했을 때, 그 앞까지 적용된 동작의 결과를 함께 돌려준다
+
+    def __init__(self, message: str, result: 'ActionBatchResult'):
+        super().__init__(message)
+        self.result = result
+
+
+class JournalEntry(NamedTuple):
+    flag: int  # 동작이 뒤집은 상태 플래그 (드러내기는 REVEALED, 커버는 COVERED)
+    cells: 'array'  # 플래그가 뒤집힌 칸
+    result: Optional['ClickEventResult']  # 카운터 변화량
+    state_before: Tuple[bool, str]  # (is_game_end, game_state)
+    state_after: Tuple[bool, str]
+
+
+class GameJournal:
+    # 동작마다 바뀐 칸과 카운터 변화량만 기록해 두고, 되돌리기/다시 하기는 그 칸들의 플래그를 다시 뒤집는다
+    # 드러내기는 REVEALED 만 켜고 커버는 COVERED 만 뒤집으므로 바뀐 칸 목록만으로 이전 상태가 정해진다
+
+    MAX_ENTRIES = 10_000
+
+    def __init__(self, game: 'Game'):
+        self.game = game
+        self.undo_entries: List['JournalEntry'] = []
+        self.redo_entries: List['JournalEntry'] = []
+        self.batch: Optional[Set[int]] = None
+        self.state_before: Tuple[bool, str] = (False, GameState.START)
+
+        game.map.add_change_listener(self.on_cells_changed)
+
+    def on_cells_changed(self, changed_cells: Set[int]):
+
+        if self.batch is not None:
+            self.batch |= changed_cells
+
+    def begin(self):
+        self.batch = set()
+        self.state_before = (self.game.is_game_end, self.game.game_state)
+
+    def commit(self, flag: int, result: Optional['ClickEventResult']):
+        cells = self.batch
+        self.batch = None
+        state_after = (self.game.is_game_end, self.game.game_state)
+
+        if not cells and state_after == self.state_before:
+            return
+
+        self.undo_entries.append(JournalEntry(flag, array("q", cells), result, self.state_before, state_after))
+        self.redo_entries.clear()
+
+        if len(self.undo_entries) > self.MAX_ENTRIES:
+            del self.undo_entries[0]
+
+    def apply(self, entry: 'JournalEntry', direction: int):
+        # direction 1 은 다시 하기, -1 은 되돌리기
+        game = self.game
+        game.map.flip_cells(entry.cells, entry.flag)
+
+        if entry.result is not None:
+            game.find_mine_count += direction * entry.result.found_mine_count_offset
+            game.covered_block_count += direction * entry.result.covered_block_count_offset
+
+        game.is_game_end, game.game_state = entry.state_after if direction > 0 else entry.state_before
+
+    def undo(self):
+
+        if not self.undo_entries:
+            return False
+
+        entry = self.undo_entries.pop()
+        self.apply(entry, -1)
+        self.redo_entries.append(entry)
+        return True
+
+    def redo(self):
+
+        if not self.redo_entries:
+            return False
+
+        entry = self.redo_entries.pop()
+        self.apply(entry, 1)
+        self.undo_entries.append(entry)
+        return True
+
+    def clear(self):
+        self.undo_entries.clear()
+        self.redo_entries.clear()
+
+
 class Game:
 
     def __init__(self, total_mine_count: int, map: 'Map'):
@@ -334,9 +1138,29 @@ class Game:
         self.is_game_end = False
         self.game_state = GameState.START
 
+        # hint 를 처음 부를 때 만들어지는 제약 전파 solver 와 지뢰 확률 엔진
+        self.solver = None
+        self.probability_engine = None
+
+        # 동작을 기록하는 GameRecorder (minegame.recording)
+        self.recorder = None
+
+        # 되돌리기/다시 하기 기록, 평면 저장소를 쓰는 Map 에서만 지원한다
+        self.journal = GameJournal(self) if isinstance(map, Map) else None
+
     @classmethod
-    def create(cls, row: int, col: int, total_mine_count):
-        current_map = Map.create(row, col, total_mine_count)
+    def create(cls, row: int, col: int, total_mine_count, rng: Optional[random.Random] = None,
+               topology: 'Topology' = SQUARE4, deferred: bool = False, exclude_neighbours: bool = True,
+               size_limit: Optional['SizeLimit'] = None):
+
+        # deferred 면 지뢰를 첫 드러내기 때 놓으므로 첫 클릭에서 지는 일이 없고 생성 비용도 첫 클릭으로 옮겨 간다
+        if deferred:
+            current_map = Map.create_deferred(row, col, total_mine_count, rng, topology, exclude_neighbours,
+                                              size_limit)
+
+        else:
+            current_map = Map.create(row, col, total_mine_count, rng, topology, size_limit)
+
         return Game(total_mine_count=total_mine_count, map=current_map)
 
     @classmethod
@@ -346,31 +1170,206 @@ class Game:
     def get_block_info(self, x, y):
         return self.map.get_block_info(x, y)
 
+    def pop_changed_cells(self):
+        return self.map.pop_changed_cells()
+
+    def snapshot(self, out=None, x: int = 0, y: int = 0, rows: Optional[int] = None, cols: Optional[int] = None):
+        return self.map.snapshot(out, x, y, rows, cols)
+
+    def hint(self):
+        self.require_finite_map("Hints")
+
+        if self.solver is None:
+            from minegame.solver import ConstraintSolver
+            self.solver = ConstraintSolver(self.map)
+
+        return self.solver.hint()
+
+    def mine_probabilities(self, time_budget: float = 0.5):
+        self.require_finite_map("Mine probabilities")
+
+        if self.probability_engine is None:
+            from minegame.probability import MineProbabilityEngine
+            self.probability_engine = MineProbabilityEngine(self)
+
+        return self.probability_engine.compute(time_budget)
+
+    def require_finite_map(self, feature: str):
+
+        # solver, 확률 엔진, 동작 묶음의 변경 리스너는 평면 저장소 전체를 칸 인덱스로 다루므로 끝없는 맵 등에서는 쓸 수 없다
+        if not isinstance(self.map, Map):
+            raise TypeError(f"{feature} need a finite Map, not {type(self.map).__name__}.")
+
     def reveal(self, x, y):
 
         if self.is_game_end:
             return
 
-        block = self.map.get_block(x, y)
+        if self.map.out_of_range(x, y) or self.map.is_covered(x, y):
+            return
+
+        if self.recorder is not None:
+            self.recorder.record(Action.REVEAL, x, y)
 
-        if block.is_covered():
+        if not self.map.mines_placed:
+            self.place_mines(x, y)
+
+        if self.journal is None:
+            self.update_game_when_reveal(self.map.reveal(x, y))
             return
 
+        self.journal.begin()
         reveal_event = self.map.reveal(x, y)
         self.update_game_when_reveal(reveal_event)
+        self.journal.commit(BoardStorage.REVEALED, reveal_event)
 
     def cover(self, x, y):
 
         if self.is_game_end:
             return
 
-        if not self.map.get_block(x, y).is_covered() and self.covered_block_count >= self.total_mine_count + 1:
+        if self.map.out_of_range(x, y):
+            return
+
+        if not self.map.is_covered(x, y) and self.covered_block_count >= self.total_mine_count + 1:
             raise Exception(
                 f"Too many blocks covered current : {self.covered_block_count} maximum : {self.total_mine_count + 1}"
             )
 
+        if self.recorder is not None:
+            self.recorder.record(Action.COVER, x, y)
+
+        if self.journal is None:
+            self.update_game_when_cover(self.map.cover(x, y))
+            return
+
+        self.journal.begin()
         cover_event = self.map.cover(x, y)
         self.update_game_when_cover(cover_event)
+        self.journal.commit(BoardStorage.COVERED, cover_event)
+
+    def place_mines(self, x, y):
+        self.map.place_mines(x, y)
+
+        # 지뢰를 놓기 전에 커버한 칸은 모두 안전 칸으로 세었으므로 찾은 지뢰 수를 다시 세고,
+        # 그 커버들의 되돌리기 기록은 카운터 변화량이 맞지 않으므로 버린다
+        self.find_mine_count = self.map.count_covered_mines()
+
+        if self.journal is not None:
+            self.journal.clear()
+
+        # 지뢰를 놓기 전에 커버한 칸이 새 배치의 지뢰를 모두 덮었을 수 있다
+        self.check_win()
+
+    def chord(self, x, y):
+
+        if self.is_game_end:
+            return
+
+        current_map = self.map
+
+        if current_map.out_of_range(x, y) or not current_map.is_revealed(x, y) or current_map.is_mine(x, y):
+            return
+
+        flagged_count = 0
+        targets = []
+
+        for nx, ny in current_map.neighbour_cells(x, y):
+
+            if current_map.is_covered(nx, ny):
+                flagged_count += 1
+
+            elif not current_map.is_revealed(nx, ny):
+                targets.append((nx, ny))
+
+        if flagged_count != current_map.near_mine_count(x, y) or not targets:
+            return
+
+        if self.recorder is not None:
+            self.recorder.record(Action.CHORD, x, y)
+
+        if self.journal is not None:
+            self.journal.begin()
+
+        for nx, ny in targets:
+            self.update_game_when_reveal(current_map.reveal(nx, ny))
+
+            if self.is_game_end:
+                break
+
+        if self.journal is not None:
+            self.journal.commit(BoardStorage.REVEALED, None)
+
+    def apply_actions(self, actions: Iterable[Tuple[str, int, int]]):
+        # 동작 묶음을 차례로 적용하고, 묶음 전체의 바뀐 칸과 최종 상태를 한 번에 돌려준다
+        # 게임이 끝나면 나머지 동작은 적용하지 않는다
+        # 동작 하나가 실패하면(커버 수 초과 등) 앞의 동작은 적용된 채로 두고 그 결과를 담은 ActionBatchError 를 던진다
+        self.require_finite_map("Action batches")
+
+        changed_cells: Set[int] = set()
+        self.map.add_change_listener(changed_cells.update)
+        handlers = {Action.REVEAL: self.reveal, Action.COVER: self.cover, Action.CHORD: self.chord}
+        applied_count = 0
+
+        try:
+            for action, x, y in actions:
+
+                if self.is_game_end and action not in (Action.UNDO, Action.REDO):
+                    break
+
+                if action == Action.UNDO:
+                    self.undo()
+
+                elif action == Action.REDO:
+                    self.redo()
+
+                else:
+                    handlers[action](x, y)
+
+                applied_count += 1
+
+        except Exception as ex:
+            raise ActionBatchError(str(ex), self.batch_result(changed_cells, applied_count)) from ex
+
+        finally:
+            self.map.remove_change_listener(changed_cells.update)
+
+        return self.batch_result(changed_cells, applied_count)
+
+    def batch_result(self, changed_cells: Set[int], applied_count: int):
+        col = self.map.col
+        return ActionBatchResult([divmod(index, col) for index in changed_cells], self.game_state, applied_count)
+
+    def undo(self):
+
+        if self.journal is None:
+            return False
+
+        if self.recorder is not None:
+            self.recorder.record(Action.UNDO, 0, 0)
+
+        if not self.journal.undo():
+            return False
+
+        # 드러난 칸이 다시 가려지면 solver 의 추론이 맞지 않으므로 처음부터 다시 만든다
+        self.reset_solver()
+        return True
+
+    def redo(self):
+
+        if self.journal is None:
+            return False
+
+        if self.recorder is not None:
+            self.recorder.record(Action.REDO, 0, 0)
+
+        return self.journal.redo()
+
+    def reset_solver(self):
+
+        if self.solver is not None:
+            self.solver.close()
+            self.solver = None
 
     def update_game_when_reveal(self, result: 'ClickEventResult'):
 
@@ -381,6 +1380,8 @@ class Game:
             self.set_game_over()
             return
 
+        self.check_win()
+
     def update_game_when_cover(self, result: 'ClickEventResult'):
 
         if result is None:
@@ -396,11 +1397,13 @@ class Game:
 
     def update_find_mine_count(self, offset):
         self.find_mine_count += offset
+        self.check_win()
 
-        if self.find_mine_count == self.total_mine_count:
+    def check_win(self):
+        # 지뢰를 모두 커버했거나, 지뢰가 아닌 칸을 모두 드러내면 승리
+        if self.find_mine_count == self.total_mine_count or self.map.is_all_safe_revealed():
             self.is_game_end = True
             self.game_state = GameState.WIN
-            return
 
     def update_covered_count(self, offset):
         self.covered_block_count += offset
@@ -430,21 +1433,70 @@ class GameController:
     def cover(self, x: int, y: int):
         self.game.cover(x, y)
 
+    def chord(self, x: int, y: int):
+        self.game.chord(x, y)
+
+    def apply_actions(self, actions: Iterable[Tuple[str, int, int]]):
+        return self.game.apply_actions(actions)
+
+    def undo(self):
+        return self.game.undo()
+
+    def redo(self):
+        return self.game.redo()
+
     def get_block_info(self, x, y):
         return self.game.get_block_info(x, y)
 
+    def pop_changed_cells(self):
+        return self.game.pop_changed_cells()
+
+    def snapshot(self, out=None, x: int = 0, y: int = 0, rows: Optional[int] = None, cols: Optional[int] = None):
+        return self.game.snapshot(out, x, y, rows, cols)
+
+    def hint(self):
+        return self.game.hint()
+
+    def safe_moves(self):
+        return self.game.hint().safe_cells
+
+    def mine_probabilities(self, time_budget: float = 0.5):
+        return self.game.mine_probabilities(time_budget)
+
     def get_game_state(self):
         return self.game.game_state
 
+    def get_topology(self):
+        return self.game.map.topology
+
     @classmethod
-    def create_with_difficulty(cls, difficulty: 'Difficulty'):
+    def create_with_difficulty(cls, difficulty: 'Difficulty', rng: Optional[random.Random] = None,
+                               topology: 'Topology' = SQUARE4, no_guess: bool = False, deferred: bool = False):
         row = difficulty.row_size
         col = difficulty.col_size
         total_mine_count = difficulty.total_mine_count
-        return cls.create_with_user_setting(row, col, total_mine_count)
+        return cls.create_with_user_setting(row, col, total_mine_count, rng, topology, no_guess, deferred)
 
     @classmethod
-    def create_with_user_setting(cls, row: int, col: int, total_mine_count: int):
-        game = Game.create(row, col, total_mine_count)
+    def create_with_user_setting(cls, row: int, col: int, total_mine_count: int, rng: Optional[random.Random] = None,
+                                 topology: 'Topology' = SQUARE4, no_guess: bool = False, deferred: bool = False,
+                                 size_limit: Optional['SizeLimit'] = None):
+
+        if not no_guess:
+            return GameController(Game.create(row, col, total_mine_count, rng, topology, deferred,
+                                              size_limit=size_limit))
+
+        Map.validate(row, col, total_mine_count, topology, size_limit)
+
+        # 추측 없이 풀리는 보드를 만들고 첫 클릭을 대신 두어 시작 영역을 열어 둔다
+        from minegame.noguess import generate_no_guess_map
+        result = generate_no_guess_map(row, col, total_mine_count, rng, topology)
+        game = Game.create_with_map(total_mine_count, result.map)
+
+        if not result.map.is_mine(*result.start):
+            game.reveal(*result.start)
+
+        # 열어 둔 시작 영역은 되돌리기 대상이 아니다
+        game.journal.clear()
         return GameController(game)
 
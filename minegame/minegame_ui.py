@@ -1,10 +1,13 @@
 import traceback
-from typing import List
+from typing import Any, Callable, List, Dict, Optional, Tuple
 
-from PyQt5.QtCore import Qt
-from PyQt5.QtGui import QFont, QIcon
-from PyQt5.QtWidgets import QWidget, QGridLayout, QMessageBox, QApplication, QPushButton, QSizePolicy
-from minegame.minegame import GameState, GameController, Difficulty, BlockInfo, BaseBlockInfo, MineBlockInfo
+from PyQt5.QtCore import Qt, QRect, QSize, QPoint, QThread, pyqtSignal
+from PyQt5.QtGui import QFont, QIcon, QPixmap, QPainter, QColor, QKeySequence
+from PyQt5.QtWidgets import QWidget, QGridLayout, QMessageBox, QApplication, QPushButton, QSizePolicy, \
+    QAbstractScrollArea, QVBoxLayout, QProgressDialog
+from minegame.minegame import GameState, GameController, Difficulty, BlockInfo, BaseBlockInfo, MineBlockInfo, Map, \
+    Action, CellCode, SizeLimit
+from minegame.topology import SQUARE4, Topology
 
 
 def show_warning_message(message):
@@ -16,6 +19,92 @@ def show_warning_message(message):
     msg_box.exec_()
 
 
+class WorkerThread(QThread):
+    # 함수를 작업 스레드에서 실행하고 결과나 오류를 시그널로 보낸다, 시그널은 GUI 스레드의 이벤트 루프에서 받는다
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+    def __init__(self, function: Callable[[], Any], parent=None):
+        super().__init__(parent)
+        self.function = function
+
+    def run(self):
+        try:
+            result = self.function()
+
+        except Exception as ex:
+            traceback.print_exc()
+            self.failed.emit(str(ex))
+
+        else:
+            self.succeeded.emit(result)
+
+
+class BackgroundJob:
+    # 보드 생성이나 큰 연쇄 드러내기처럼 오래 걸리는 작업 하나, 작업 중에는 취소 버튼이 있는 진행 표시를 띄운다
+    # 엔진 연산은 중간에 멈출 수 없으므로 취소하면 작업이 끝난 뒤 결과를 버리거나 on_cancel 로 되돌린다
+
+    # 이보다 빨리 끝나는 작업은 진행 표시를 띄우지 않는다 (ms)
+    PROGRESS_DELAY = 300
+
+    # 부모가 없는 작업이 끝나기 전에 가비지 컬렉션되지 않도록 참조를 보관
+    _jobs: List['BackgroundJob'] = []
+
+    def __init__(self, label: str, function: Callable[[], Any], on_done: Callable[[Any], None],
+                 on_cancel: Optional[Callable[[Any], None]] = None,
+                 on_fail: Callable[[str], None] = show_warning_message, parent: Optional[QWidget] = None):
+        self.on_done = on_done
+        self.on_cancel = on_cancel
+        self.on_fail = on_fail
+        self.cancelled = False
+
+        # 범위 (0, 0) 은 진행률 없이 움직이는 표시
+        self.progress = QProgressDialog(label, "Cancel", 0, 0, parent)
+        self.progress.setWindowTitle("Minesweeper")
+        self.progress.setWindowModality(Qt.WindowModal)
+        self.progress.setMinimumDuration(self.PROGRESS_DELAY)
+        self.progress.canceled.connect(self.cancel)
+
+        self.thread = WorkerThread(function)
+        self.thread.succeeded.connect(self.succeed)
+        self.thread.failed.connect(self.fail)
+        self.thread.finished.connect(self.cleanup)
+
+    def start(self):
+        self._jobs.append(self)
+        self.thread.start()
+        return self
+
+    def is_running(self):
+        return self.thread.isRunning()
+
+    def cancel(self):
+        self.cancelled = True
+
+    def close_progress(self):
+        # 진행 표시를 닫을 때도 canceled 가 나오므로 먼저 끊는다
+        self.progress.canceled.disconnect(self.cancel)
+        self.progress.close()
+
+    def succeed(self, result):
+        self.close_progress()
+
+        if not self.cancelled:
+            self.on_done(result)
+
+        elif self.on_cancel is not None:
+            self.on_cancel(result)
+
+    def fail(self, message: str):
+        self.close_progress()
+        self.on_fail(message)
+
+    def cleanup(self):
+        self.progress.deleteLater()
+        self.thread.deleteLater()
+        self._jobs.remove(self)
+
+
 class CustomButton(QPushButton):
     def __init__(self, x, y, game: 'GameController', main_ui: 'GameUI', parent=None):
         super().__init__(parent)
@@ -33,6 +122,9 @@ class CustomButton(QPushButton):
             elif event.button() == Qt.RightButton:
                 self.right_click()
 
+            elif event.button() == Qt.MiddleButton:
+                self.middle_click()
+
             self.main_ui.update_ui()
 
         except Exception as ex:
@@ -53,15 +145,175 @@ class CustomButton(QPushButton):
         except Exception as ex:
             show_warning_message(str(ex))
 
+    def middle_click(self):
+        # 가운데 버튼은 코드(chord), 바뀐 칸은 한 번의 update_ui 로 다시 그린다
+        self.game.apply_actions([(Action.CHORD, self.x, self.y)])
+
 
 class ImageResource:
     COVER_IMAGE_PATH = 'resources/cover.png'
     MINE_REVEAL_IMAGE_PATH = 'resources/mine.png'
 
+    # 열려 있는 모든 GameUI 가 공유하는 (경로, 크기) 별 캐시, PNG 는 한 번만 디코딩된다
+    _pixmaps: Dict[Tuple[str, int], QPixmap] = {}
+    _icons: Dict[Tuple[str, int], QIcon] = {}
+    _empty_icon: QIcon = None
+
+    @classmethod
+    def pixmap(cls, path: str, size: int):
+        key = (path, size)
+
+        if key not in cls._pixmaps:
+            cls._pixmaps[key] = QPixmap(path).scaled(size, size, Qt.KeepAspectRatio, Qt.SmoothTransformation)
 
-class GameUI(QWidget):
+        return cls._pixmaps[key]
+
+    @classmethod
+    def icon(cls, path: str, size: int):
+        key = (path, size)
+
+        if key not in cls._icons:
+            cls._icons[key] = QIcon(cls.pixmap(path, size))
+
+        return cls._icons[key]
+
+    @classmethod
+    def empty_icon(cls):
+
+        if cls._empty_icon is None:
+            cls._empty_icon = QIcon()
+
+        return cls._empty_icon
+
+
+class ButtonStyle:
     BASE_ZERO_BACKGROUND_COLOR = "#EEF1F1"
     DEFAULT_BACKGROUND_COLOR = "#D0EFFF"
+
+    # 주변 지뢰 개수별 글자색, 4 이상은 빨간색
+    NUMBER_COLORS = {1: "black", 2: "blue", 3: "green"}
+    DEFAULT_NUMBER_COLOR = "red"
+
+    # 스타일시트 문자열은 미리 만들어 두고 셀마다 재사용한다
+    DEFAULT = f"QPushButton {{ background-color: {DEFAULT_BACKGROUND_COLOR}; color: black; }}"
+    ZERO = f"QPushButton {{ background-color: {BASE_ZERO_BACKGROUND_COLOR}; color: black; }}"
+    NUMBERS = {}
+
+    for number in range(1, 9):
+        NUMBERS[number] = (
+            f"background-color: {DEFAULT_BACKGROUND_COLOR}; "
+            f"color: {NUMBER_COLORS.get(number, DEFAULT_NUMBER_COLOR)};"
+        )
+
+    del number
+
+    _backgrounds: Dict[str, str] = {}
+
+    @classmethod
+    def number(cls, number: int):
+        return cls.NUMBERS[number]
+
+    @classmethod
+    def background(cls, color: str):
+
+        if color not in cls._backgrounds:
+            cls._backgrounds[color] = f"QPushButton {{ background-color: {color}; color: black; }}"
+
+        return cls._backgrounds[color]
+
+
+class GameWindow(QWidget):
+
+    def __init__(self):
+        super().__init__()
+
+        # 진행 중인 작업, 작업 스레드가 게임을 바꾸는 동안에는 보드 입력과 화면 갱신을 멈춘다
+        self.job: Optional['BackgroundJob'] = None
+
+        # 게임 결과 창, 한 번만 띄운다
+        self.result_box: Optional[QMessageBox] = None
+
+    def is_busy(self):
+        return self.job is not None
+
+    def run_in_background(self, label: str, function: Callable[[], Any], rollback: bool = False):
+        # rollback 이면 취소했을 때 작업이 끝난 뒤 그 동작을 되돌린다 (되돌리기 기록을 쓴다)
+        # 아무것도 바꾸지 않은 동작은 기록되지 않으므로 작업 전의 마지막 기록과 비교해 새 기록이 있을 때만 되돌린다
+        # (기록 수는 상한에서 오래된 기록이 빠지거나 첫 드러내기의 지뢰 배치로 비워질 수 있어 비교에 쓰지 않는다)
+        journal = self.game.game.journal
+        undo_entries = journal.undo_entries if rollback and journal is not None else []
+        last_entry = undo_entries[-1] if undo_entries else None
+
+        def done(_):
+            self.job = None
+            self.update_ui()
+
+        def cancel(_):
+            self.job = None
+
+            if rollback and undo_entries and undo_entries[-1] is not last_entry:
+                self.game.undo()
+
+            self.update_ui()
+
+        def fail(message):
+            self.job = None
+            self.update_ui()
+            show_warning_message(message)
+
+        self.job = BackgroundJob(label, function, done, cancel, fail, parent=self).start()
+
+    def closeEvent(self, event):
+
+        # 작업 스레드가 게임을 쓰는 동안에는 닫지 않는다 (진행 표시에서 취소할 수 있다)
+        if self.is_busy():
+            event.ignore()
+            return
+
+        super().closeEvent(event)
+
+    def keyPressEvent(self, event):
+
+        if self.is_busy():
+            event.ignore()
+
+        # Ctrl+Z 로 되돌리고 Ctrl+Y(또는 Ctrl+Shift+Z)로 다시 한다
+        elif event.matches(QKeySequence.Undo):
+            self.game.undo()
+            self.update_ui()
+
+        elif event.matches(QKeySequence.Redo):
+            self.game.redo()
+            self.update_ui()
+
+        else:
+            super().keyPressEvent(event)
+
+    def display_game_result(self):
+
+        if self.result_box is not None:
+            return
+
+        if self.game.get_game_state() == GameState.WIN:
+            self.show_message("Congratulations!", "You won the game!")
+        if self.game.get_game_state() == GameState.LOSE:
+            self.show_message("Game Over", "You hit a mine!")
+
+    def show_message(self, title, message):
+        # exec_ 로 클릭 처리 안에서 멈추지 않도록 open 으로 띄우고, 닫히면 게임 창도 닫는다
+        msg_box = QMessageBox(self)
+        msg_box.setIcon(QMessageBox.Information)
+        msg_box.setWindowTitle(title)
+        msg_box.setText(message)
+        msg_box.setStandardButtons(QMessageBox.Ok)
+        msg_box.finished.connect(self.close)
+        msg_box.open()
+        self.result_box = msg_box
+
+
+class GameUI(GameWindow):
+    BASE_ZERO_BACKGROUND_COLOR = ButtonStyle.BASE_ZERO_BACKGROUND_COLOR
+    DEFAULT_BACKGROUND_COLOR = ButtonStyle.DEFAULT_BACKGROUND_COLOR
     DEFAULT_FONT_SIZE = 20
     BUTTON_SIZE = 45
 
@@ -71,9 +323,12 @@ class GameUI(QWidget):
         self.col_size: int = col
         self.game: 'GameController' = game
         self.layout: 'QGridLayout' = QGridLayout()
-        self.buttons: List[List[QPushButton]] = [[None for _ in range(self.row_size)] for _ in range(self.col_size)]
+        self.buttons: List[List[QPushButton]] = [[None for _ in range(self.col_size)] for _ in range(self.row_size)]
         self.init_ui()
 
+        # 만들 때 이미 드러나 있는 칸(추측 없는 보드의 시작 영역)을 그린다
+        self.update_ui()
+
         self.adjustSize()
         self.setFixedSize(self.size())
 
@@ -88,6 +343,9 @@ class GameUI(QWidget):
         font = QFont()
         font.setPointSize(self.DEFAULT_FONT_SIZE)
 
+        # 육각형 보드는 열 하나를 격자 두 칸으로 두고 홀수 행을 한 칸(버튼 반 개) 밀어 배치한다
+        staggered = self.game.get_topology().staggered
+
         # 생성된 버튼을 레이아웃에 대해 연결
         for i in range(self.row_size):
             for j in range(self.col_size):
@@ -95,48 +353,38 @@ class GameUI(QWidget):
 
                 # 버튼에 대한 크기 설정 최소 사이즈는 BUTTON_MIN_SIZE, 최대 사이즈는 BUTTON_MAX_SIZE
                 button.setFixedSize(self.BUTTON_SIZE, self.BUTTON_SIZE)
+                button.setIconSize(button.size())
                 button.setFont(font)
 
                 # 버튼에 대한 배경색을 설정 기본 배경색은 DEFAULT_BACKGROUND_COLOR
-                button.setStyleSheet(
-                    f"QPushButton {{ background-color: {self.DEFAULT_BACKGROUND_COLOR}; color: black; }}")
+                button.setStyleSheet(ButtonStyle.DEFAULT)
+
+                if staggered:
+                    self.layout.addWidget(button, i, 2 * j + (i & 1), 1, 2)
+
+                else:
+                    self.layout.addWidget(button, i, j)
 
-                self.layout.addWidget(button, i, j)
                 self.buttons[i][j] = button
 
         self.setLayout(self.layout)
 
     def update_ui(self):
 
-        for i in range(self.row_size):
-            for j in range(self.col_size):
-                block_info: 'BlockInfo' = self.game.get_block_info(i, j)
-                self.set_button_text(block_info, i, j)
-                self.set_button_image(block_info, i, j)
+        # 마지막 갱신 이후 상태가 바뀐 셀만 다시 그린다
+        for i, j in self.game.pop_changed_cells():
+            block_info: 'BlockInfo' = self.game.get_block_info(i, j)
+            self.set_button_text(block_info, i, j)
+            self.set_button_image(block_info, i, j)
 
         self.display_game_result()
 
     def set_button_text(self, block_info: 'BlockInfo', i: int, j: int):
 
-        def find_color(text: str):
-            number = int(text)
-
-            if number == 1:
-                return "black"
-
-            elif number == 2:
-                return "blue"
-
-            elif number == 3:
-                return "green"
-
-            else:
-                return "red"
-
-        def set_button_text_color(i, j, color):
-            self.buttons[i][j].setStyleSheet(f"background-color: {self.DEFAULT_BACKGROUND_COLOR}; color: {color};")
-
+        # 되돌리기로 다시 가려진 칸은 숫자와 배경색을 지우고 처음 모양으로 돌린다
         if not block_info.is_covered() and not block_info.is_reveal():
+            self.buttons[i][j].setText("")
+            self.buttons[i][j].setStyleSheet(ButtonStyle.DEFAULT)
             return
 
         if block_info.is_covered():
@@ -150,65 +398,395 @@ class GameUI(QWidget):
 
         else:
             self.buttons[i][j].setText(str(block_info.near_mine_count))
-            color = find_color(str(block_info.near_mine_count))
-            set_button_text_color(i, j, color)
+            self.buttons[i][j].setStyleSheet(ButtonStyle.number(block_info.near_mine_count))
 
     def fill_button_background(self, i, j, color):
-        self.buttons[i][j].setStyleSheet(f"QPushButton {{ background-color: {color}; color: black; }}")
+        self.buttons[i][j].setStyleSheet(ButtonStyle.background(color))
 
     def set_button_image(self, block_info, i, j):
 
+        cover_icon = ImageResource.icon(ImageResource.COVER_IMAGE_PATH, self.BUTTON_SIZE)
 
         if isinstance(block_info, BaseBlockInfo):
             if block_info.is_covered():
-                self.buttons[i][j].setIcon(QIcon(ImageResource.COVER_IMAGE_PATH))
-                self.buttons[i][j].setIconSize(self.buttons[i][j].size())
+                self.buttons[i][j].setIcon(cover_icon)
 
             else:
-                self.buttons[i][j].setIcon(QIcon())
+                self.buttons[i][j].setIcon(ImageResource.empty_icon())
 
         elif isinstance(block_info, MineBlockInfo):
 
             if block_info.is_reveal():
-                self.buttons[i][j].setIcon(QIcon(ImageResource.MINE_REVEAL_IMAGE_PATH))
-                self.buttons[i][j].setIconSize(self.buttons[i][j].size())
+                self.buttons[i][j].setIcon(ImageResource.icon(ImageResource.MINE_REVEAL_IMAGE_PATH, self.BUTTON_SIZE))
 
             elif block_info.is_covered():
-                self.buttons[i][j].setIcon(QIcon(ImageResource.COVER_IMAGE_PATH))
-                self.buttons[i][j].setIconSize(self.buttons[i][j].size())
+                self.buttons[i][j].setIcon(cover_icon)
 
             else:
-                self.buttons[i][j].setIcon(QIcon())
+                self.buttons[i][j].setIcon(ImageResource.empty_icon())
 
 
+# 보드 전체를 한 위젯에 직접 그리는 스크롤/확대 가능한 뷰포트, 화면에 보이는 셀만 그린다
+class BoardCanvas(QAbstractScrollArea):
+    DEFAULT_CELL_SIZE = GameUI.BUTTON_SIZE
+    MIN_CELL_SIZE = 8
+    MAX_CELL_SIZE = 64
+    ZOOM_STEP = 1.25
+    CELL_SPACING = 1
 
+    # 이보다 작은 셀에는 숫자를 그리지 않는다
+    MIN_TEXT_CELL_SIZE = 12
 
+    # 변경된 셀이 이보다 많으면 셀마다 영역을 나누지 않고 뷰포트 전체를 다시 그린다
+    FULL_REPAINT_THRESHOLD = 1024
 
-    def display_game_result(self):
+    _colors: Dict[str, QColor] = {}
 
-        if self.game.get_game_state() == GameState.WIN:
-            self.show_message("Congratulations!", "You won the game!")
-        if self.game.get_game_state() == GameState.LOSE:
-            self.show_message("Game Over", "You hit a mine!")
+    def __init__(self, game: 'GameController', row, col, board_view: 'BoardView', parent=None):
+        super().__init__(parent)
+        self.row_size: int = row
+        self.col_size: int = col
+        self.game: 'GameController' = game
+        self.board_view = board_view
+        self.cell_font = QFont()
 
-    def show_message(self, title, message):
-        msg_box = QMessageBox()
-        msg_box.setIcon(QMessageBox.Information)
-        msg_box.setWindowTitle(title)
-        msg_box.setText(message)
-        msg_box.setStandardButtons(QMessageBox.Ok)
-        msg_box.exec_()
-        self.close()
+        # 육각형 보드는 홀수 행을 반 칸 오른쪽으로 밀어 그린다
+        self.staggered = game.get_topology().staggered
+
+        # paintEvent 가 칸 상태를 읽어 오는 버퍼와 마지막으로 읽은 영역 (첫 행, 첫 열, 행 수, 열 수)
+        # 작업 스레드가 평면을 바꾸는 동안에는 보드를 읽지 않고 이 버퍼로 그린다
+        self.snapshot_buffer = bytearray()
+        self.snapshot_region = (0, 0, 0, 0)
+
+        # 작업 중에 버퍼 밖의 칸을 가려진 칸으로 그렸는지, 작업이 끝나면 뷰포트 전체를 다시 그린다
+        self.stale = False
+
+        self.set_cell_size(self.DEFAULT_CELL_SIZE)
+
+    @classmethod
+    def color(cls, name: str):
+
+        if name not in cls._colors:
+            cls._colors[name] = QColor(name)
+
+        return cls._colors[name]
+
+    def set_cell_size(self, cell_size: int):
+        self.cell_size = max(self.MIN_CELL_SIZE, min(self.MAX_CELL_SIZE, cell_size))
+        self.cell_pitch = self.cell_size + self.CELL_SPACING
+        self.cell_font.setPixelSize(max(1, self.cell_size * 3 // 5))
+        self.update_scroll_range()
+        self.viewport().update()
+
+    def row_shift(self, x: int):
+        return self.cell_pitch // 2 if self.staggered and x & 1 else 0
+
+    def content_size(self):
+        return (self.col_size * self.cell_pitch - self.CELL_SPACING + self.row_shift(1),
+                self.row_size * self.cell_pitch - self.CELL_SPACING)
+
+    def sizeHint(self):
+        width, height = self.content_size()
+        return QSize(width + 2 * self.frameWidth(), height + 2 * self.frameWidth())
+
+    def update_scroll_range(self):
+        width, height = self.content_size()
+        viewport = self.viewport().size()
+
+        self.horizontalScrollBar().setRange(0, max(0, width - viewport.width()))
+        self.horizontalScrollBar().setPageStep(viewport.width())
+        self.horizontalScrollBar().setSingleStep(self.cell_pitch)
+
+        self.verticalScrollBar().setRange(0, max(0, height - viewport.height()))
+        self.verticalScrollBar().setPageStep(viewport.height())
+        self.verticalScrollBar().setSingleStep(self.cell_pitch)
+
+    def resizeEvent(self, event):
+        super().resizeEvent(event)
+        self.update_scroll_range()
+
+    def scrollContentsBy(self, dx, dy):
+        self.viewport().update()
+
+    def wheelEvent(self, event):
+
+        # Ctrl + 휠은 커서 위치를 기준으로 확대/축소
+        if event.modifiers() & Qt.ControlModifier:
+            factor = self.ZOOM_STEP if event.angleDelta().y() > 0 else 1 / self.ZOOM_STEP
+            self.zoom(factor, event.pos())
+            return
+
+        super().wheelEvent(event)
+
+    def keyPressEvent(self, event):
+
+        if event.key() in (Qt.Key_Plus, Qt.Key_Equal):
+            self.zoom(self.ZOOM_STEP)
+
+        elif event.key() == Qt.Key_Minus:
+            self.zoom(1 / self.ZOOM_STEP)
+
+        else:
+            super().keyPressEvent(event)
+
+    def zoom(self, factor: float, anchor: 'QPoint' = None):
+
+        if anchor is None:
+            anchor = self.viewport().rect().center()
+
+        old_pitch = self.cell_pitch
+        content_x = self.horizontalScrollBar().value() + anchor.x()
+        content_y = self.verticalScrollBar().value() + anchor.y()
+
+        self.set_cell_size(round(self.cell_size * factor))
+
+        # 확대 전후로 커서 아래의 셀이 같은 위치에 남도록 스크롤을 옮긴다
+        self.horizontalScrollBar().setValue(content_x * self.cell_pitch // old_pitch - anchor.x())
+        self.verticalScrollBar().setValue(content_y * self.cell_pitch // old_pitch - anchor.y())
+
+    def cell_rect(self, x: int, y: int):
+        return QRect(y * self.cell_pitch + self.row_shift(x) - self.horizontalScrollBar().value(),
+                     x * self.cell_pitch - self.verticalScrollBar().value(),
+                     self.cell_size, self.cell_size)
+
+    def cell_at(self, px: int, py: int):
+        x, offset_x = divmod(py + self.verticalScrollBar().value(), self.cell_pitch)
+        y, offset_y = divmod(px + self.horizontalScrollBar().value() - self.row_shift(x), self.cell_pitch)
+
+        # 셀 사이의 간격이나 보드 밖을 누른 경우
+        if offset_x >= self.cell_size or offset_y >= self.cell_size:
+            return None
+
+        if not (0 <= x < self.row_size and 0 <= y < self.col_size):
+            return None
+
+        return x, y
+
+    def mousePressEvent(self, event):
+        cell = self.cell_at(event.pos().x(), event.pos().y())
+
+        if cell is None or self.board_view.is_busy():
+            return
+
+        if event.button() == Qt.LeftButton:
+            self.board_view.left_click(*cell)
+
+        elif event.button() == Qt.RightButton:
+            self.board_view.right_click(*cell)
+
+        elif event.button() == Qt.MiddleButton:
+            self.board_view.middle_click(*cell)
+
+        self.board_view.update_ui()
+
+    def update_cells(self, changed_cells):
+
+        if self.stale or len(changed_cells) > self.FULL_REPAINT_THRESHOLD:
+            self.stale = False
+            self.viewport().update()
+            return
+
+        visible = self.viewport().rect()
+
+        for x, y in changed_cells:
+            rect = self.cell_rect(x, y)
+
+            if rect.intersects(visible):
+                self.viewport().update(rect)
+
+    def cell_range(self, area: 'QRect'):
+        # 뷰포트 안의 영역에 걸친 셀 범위 (첫 행, 마지막 행, 첫 열, 마지막 열), 걸친 셀이 없으면 None
+        offset_x = self.horizontalScrollBar().value()
+        offset_y = self.verticalScrollBar().value()
+
+        first_row = max(0, (area.top() + offset_y) // self.cell_pitch)
+        last_row = min(self.row_size - 1, (area.bottom() + offset_y) // self.cell_pitch)
+        first_col = max(0, (area.left() + offset_x - self.row_shift(1)) // self.cell_pitch)
+        last_col = min(self.col_size - 1, (area.right() + offset_x) // self.cell_pitch)
+
+        if first_row > last_row or first_col > last_col:
+            return None
+
+        return first_row, last_row, first_col, last_col
+
+    def read_visible_cells(self):
+        # 뷰포트에 보이는 셀 전체의 상태를 버퍼로 읽어 온다, 버퍼는 그릴 때마다 재사용한다
+        # 다시 그릴 영역만 읽으면 작업 중에 쓸 버퍼가 작은 영역만 남으므로 항상 보이는 영역 전체를 읽는다
+        visible = self.cell_range(self.viewport().rect())
+
+        if visible is None:
+            return
+
+        first_row, last_row, first_col, last_col = visible
+        rows = last_row - first_row + 1
+        cols = last_col - first_col + 1
+
+        if len(self.snapshot_buffer) < rows * cols:
+            self.snapshot_buffer = bytearray(rows * cols)
+
+        self.game.snapshot(self.snapshot_buffer, first_row, first_col, rows, cols)
+        self.snapshot_region = (first_row, first_col, rows, cols)
+
+    def cached_code(self, x: int, y: int):
+        first_row, first_col, rows, cols = self.snapshot_region
+
+        if first_row <= x < first_row + rows and first_col <= y < first_col + cols:
+            return self.snapshot_buffer[(x - first_row) * cols + y - first_col]
+
+        self.stale = True
+        return CellCode.HIDDEN
+
+    def paintEvent(self, event):
+        painter = QPainter(self.viewport())
+        painter.setFont(self.cell_font)
+
+        # 다시 그려야 하는 영역(뷰포트 이내)에 걸친 셀만 그린다
+        cells = self.cell_range(event.rect())
+
+        if cells is None:
+            painter.end()
+            return
+
+        # 작업 스레드가 게임을 바꾸는 중에는 GUI 스레드에서 평면을 읽지 않는다 (반쯤 바뀐 보드를 읽게 된다)
+        if not self.board_view.is_busy():
+            self.read_visible_cells()
+
+        first_row, last_row, first_col, last_col = cells
+
+        for x in range(first_row, last_row + 1):
+            for y in range(first_col, last_col + 1):
+                self.paint_cell(painter, x, y, self.cached_code(x, y))
+
+        painter.end()
+
+    def paint_cell(self, painter: 'QPainter', x: int, y: int, code: int):
+        rect = self.cell_rect(x, y)
+
+        background = ButtonStyle.BASE_ZERO_BACKGROUND_COLOR if code == 0 else ButtonStyle.DEFAULT_BACKGROUND_COLOR
+        painter.fillRect(rect, self.color(background))
+
+        if code == CellCode.MINE:
+            painter.drawPixmap(rect, ImageResource.pixmap(ImageResource.MINE_REVEAL_IMAGE_PATH, self.cell_size))
+            return
+
+        if code == CellCode.FLAGGED:
+            painter.drawPixmap(rect, ImageResource.pixmap(ImageResource.COVER_IMAGE_PATH, self.cell_size))
+            return
+
+        if 0 < code < CellCode.HIDDEN and self.cell_size >= self.MIN_TEXT_CELL_SIZE:
+            painter.setPen(self.color(ButtonStyle.NUMBER_COLORS.get(code, ButtonStyle.DEFAULT_NUMBER_COLOR)))
+            painter.drawText(rect, Qt.AlignCenter, str(code))
+
+
+class BoardView(GameWindow):
+    # 창의 최초 크기 상한, 보드가 더 크면 스크롤로 이동한다
+    MAX_WINDOW_WIDTH = 1280
+    MAX_WINDOW_HEIGHT = 860
+
+    # 셀이 이보다 많은 보드는 드러내기(첫 클릭의 지뢰 배치, 큰 연쇄)를 작업 스레드에서 돌린다
+    BACKGROUND_MIN_CELLS = 500 * 500
+
+    def __init__(self, game: 'GameController', row, col):
+        super().__init__()
+        self.row_size: int = row
+        self.col_size: int = col
+        self.game: 'GameController' = game
+        self.canvas = BoardCanvas(game, row, col, self)
+        self.init_ui()
+
+    def init_ui(self):
+        self.setWindowTitle('Minesweeper')
+
+        layout = QVBoxLayout()
+        layout.setContentsMargins(0, 0, 0, 0)
+        layout.addWidget(self.canvas)
+        self.setLayout(layout)
+
+        hint = self.canvas.sizeHint()
+        self.resize(min(hint.width(), self.MAX_WINDOW_WIDTH), min(hint.height(), self.MAX_WINDOW_HEIGHT))
+
+    def is_large(self):
+        return self.row_size * self.col_size >= self.BACKGROUND_MIN_CELLS
+
+    def left_click(self, x, y):
+
+        if self.is_large():
+            self.run_in_background("Revealing cells...", lambda: self.game.reveal(x, y), rollback=True)
+            return
+
+        try:
+            self.game.reveal(x, y)
+
+        except Exception as ex:
+            show_warning_message(str(ex))
+
+    def right_click(self, x, y):
+        try:
+            self.game.cover(x, y)
+
+        except Exception as ex:
+            show_warning_message(str(ex))
+
+    def middle_click(self, x, y):
+
+        if self.is_large():
+            self.run_in_background("Revealing cells...", lambda: self.game.chord(x, y), rollback=True)
+            return
+
+        self.game.apply_actions([(Action.CHORD, x, y)])
+
+    def update_ui(self):
+
+        # 작업 스레드가 게임을 바꾸는 중에는 바뀐 칸을 가져가지 않고, 작업이 끝나면 한 번에 그린다
+        if self.is_busy():
+            return
+
+        self.canvas.update_cells(self.game.pop_changed_cells())
+        self.display_game_result()
 
 
 class MineGame:
+    # 셀이 이보다 많은 보드는 버튼 격자 대신 BoardView 로 연다
+    BUTTON_GRID_MAX_CELLS = 25 * 25
+
+    # BoardView 로 열 수 있는 사용자 정의 보드의 최대 크기
+    MAX_BOARD_SIZE = 5000
+    SIZE_LIMIT = SizeLimit(MAX_BOARD_SIZE, MAX_BOARD_SIZE)
+
+    # 부모가 없는 게임 창이 가비지 컬렉션되지 않도록 참조를 보관
+    _windows: List[QWidget] = []
+
+    @classmethod
+    def create_view(cls, game: 'GameController', row, col):
+
+        if row * col > cls.BUTTON_GRID_MAX_CELLS:
+            return BoardView(game, row, col)
+
+        return GameUI(game, row, col)
+
+    @classmethod
+    def show_window(cls, window: 'QWidget'):
+        window.setAttribute(Qt.WA_DeleteOnClose)
+        window.destroyed.connect(lambda: cls._windows.remove(window))
+        cls._windows.append(window)
+        window.show()
+
+    @classmethod
+    def start_game(cls, create: Callable[[], 'GameController'], row, col, no_guess: bool):
+        # 추측 없는 보드(후보를 여러 번 풀어 본다)와 큰 보드는 작업 스레드에서 만들고, 창은 다 만든 뒤 GUI 스레드에서 연다
+        if not no_guess and row * col < BoardView.BACKGROUND_MIN_CELLS:
+            cls.show_window(cls.create_view(create(), row, col))
+            return
+
+        label = "Generating a no-guess board..." if no_guess else "Creating the board..."
+        BackgroundJob(label, create, lambda game: cls.show_window(cls.create_view(game, row, col))).start()
 
     @classmethod
-    def run_with_difficulty(cls, text):
+    def run_with_difficulty(cls, text, topology: 'Topology' = SQUARE4, no_guess: bool = False):
         difficulty = cls.find_difficulty(text)
-        game = GameController.create_with_difficulty(difficulty=difficulty)
-        game_ui = GameUI(game, difficulty.row_size, difficulty.col_size)
-        game_ui.show()
+        cls.start_game(lambda: GameController.create_with_difficulty(difficulty=difficulty, topology=topology,
+                                                                     no_guess=no_guess, deferred=True),
+                       difficulty.row_size, difficulty.col_size, no_guess)
 
     @classmethod
     def find_difficulty(cls, text):
@@ -220,7 +798,12 @@ class MineGame:
         raise ValueError("The difficulty level should be either EASY, MEDIUM, or HARD")
 
     @classmethod
-    def run_with_custom(cls, row, col, mine_count):
-        game = GameController.create_with_user_setting(row, col, mine_count)
-        game_ui = GameUI(game, row, col)
-        game_ui.show()
+    def run_with_custom(cls, row, col, mine_count, topology: 'Topology' = SQUARE4, no_guess: bool = False):
+        # 잘못된 설정은 작업을 띄우기 전에 호출한 쪽(시작 화면)으로 알린다
+        Map.validate(row, col, mine_count, topology, cls.SIZE_LIMIT)
+
+        # 지뢰는 첫 클릭 때 놓으므로 큰 보드도 창이 바로 열린다
+        cls.start_game(lambda: GameController.create_with_user_setting(row, col, mine_count, topology=topology,
+                                                                       no_guess=no_guess, deferred=True,
+                                                                       size_limit=cls.SIZE_LIMIT),
+                       row, col, no_guess)
@@ -0,0 +1,289 @@
+import argparse
+import concurrent.futures
+import multiprocessing
+import random
+import sys
+import time
+
+from typing import *
+
+from minegame.minegame import Difficulty, Map
+from minegame.solver import ConstraintSolver
+from minegame.topology import SQUARE4, TOPOLOGIES, Topology, get_topology
+
+
+# 찾지 못하면 일반 보드로 대신하기까지 기다리는 시간 (초)
+DEFAULT_TIMEOUT = 2.0
+
+# 이보다 작은 보드는 후보 하나를 푸는 시간이 프로세스 사이 전달 비용보다 짧으므로 현재 프로세스에서 차례로 만든다
+PARALLEL_MIN_CELLS = 24 * 24
+
+
+class CandidateTask(NamedTuple):
+    row: int
+    col: int
+    total_mine_count: int
+    topology: str  # 워커 프로세스로 넘기므로 Topology 대신 이름을 둔다
+    start: Tuple[int, int]
+    seed: int
+
+
+class CandidateResult(NamedTuple):
+    seed: int
+    solvable: bool
+    elapsed: float
+
+
+class GenerationResult(NamedTuple):
+    map: 'Map'
+    start: Tuple[int, int]  # 첫 클릭 칸, 풀 수 있는 보드면 여기서부터 추측 없이 끝까지 풀린다
+    solvable: bool  # False 면 시간 안에 찾지 못해 일반 보드로 대신한 것
+    attempts: int  # 검사한 후보 수
+    elapsed: float
+
+
+def default_start(row: int, col: int):
+    return row // 2, col // 2
+
+
+def solve_from(current_map: 'Map', start: Tuple[int, int]):
+    # 첫 클릭 칸을 드러낸 뒤 solver 가 확실히 안전하다고 추론한 칸만 드러내며 모든 안전 칸이 드러나는지 본다
+    # 첫 클릭은 주변 지뢰가 없는 칸이어야 영역이 열리며 추론을 시작할 수 있다
+    x, y = start
+
+    if current_map.is_mine(x, y) or current_map.near_mine_count(x, y) != 0:
+        return False
+
+    current_map.reveal(x, y)
+    solver = ConstraintSolver(current_map)
+
+    try:
+        while not current_map.is_all_safe_revealed():
+            safe_cells = solver.hint().safe_cells
+
+            if not safe_cells:
+                return False
+
+            for x, y in safe_cells:
+                current_map.reveal(x, y)
+
+        return True
+
+    finally:
+        solver.close()
+
+
+def create_candidate(task: 'CandidateTask'):
+    return Map.create(task.row, task.col, task.total_mine_count, random.Random(task.seed), get_topology(task.topology))
+
+
+def check_candidate(task: 'CandidateTask'):
+    started = time.perf_counter()
+
+    solvable = solve_from(create_candidate(task), task.start)
+    return CandidateResult(task.seed, solvable, time.perf_counter() - started)
+
+
+class GenerationStats:
+    # (크기, 지뢰 수, 이웃 관계) 별 후보 성공률과 보드 하나를 만드는 평균 시간
+
+    def __init__(self):
+        self.entries: Dict[Tuple[int, int, int, str], Dict[str, float]] = {}
+
+    def record(self, row: int, col: int, total_mine_count: int, topology: 'Topology', result: 'GenerationResult'):
+        key = (row, col, total_mine_count, topology.name)
+        entry = self.entries.setdefault(key, {"boards": 0, "solvable": 0, "attempts": 0, "elapsed": 0.0})
+        entry["boards"] += 1
+        entry["solvable"] += result.solvable
+        entry["attempts"] += result.attempts
+        entry["elapsed"] += result.elapsed
+
+    def report(self):
+        rows = []
+
+        for (row, col, total_mine_count, topology), entry in sorted(self.entries.items()):
+            rows.append({
+                "board": f"{row}x{col}",
+                "mines": total_mine_count,
+                "density": total_mine_count / (row * col),
+                "topology": topology,
+                "boards": entry["boards"],
+                "fallbacks": entry["boards"] - entry["solvable"],
+                "candidate_success_rate": entry["solvable"] / entry["attempts"] if entry["attempts"] else 0.0,
+                "mean_attempts": entry["attempts"] / entry["boards"],
+                "mean_ms": entry["elapsed"] / entry["boards"] * 1000,
+            })
+
+        return rows
+
+
+class NoGuessGenerator:
+    # 후보 보드를 Map.create 로 만들고 solver 로 첫 클릭부터 추측 없이 풀리는지 검사한다
+    # 큰 보드는 후보를 프로세스 풀에서 workers 개씩 동시에 검사하고 처음 성공한 후보를 쓴다
+    # 후보는 시드만 주고받고, 성공한 시드로 현재 프로세스에서 같은 보드를 다시 만든다
+
+    def __init__(self, workers: Optional[int] = None, timeout: float = DEFAULT_TIMEOUT):
+        self.workers = workers if workers is not None else multiprocessing.cpu_count()
+        self.timeout = timeout
+        self.executor: Optional[concurrent.futures.ProcessPoolExecutor] = None
+        self.stats = GenerationStats()
+
+    def close(self):
+
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+
+    def generate(self, row: int, col: int, total_mine_count: int, rng: Optional[random.Random] = None,
+                 topology: 'Topology' = SQUARE4, start: Optional[Tuple[int, int]] = None,
+                 timeout: Optional[float] = None):
+        Map.validate(row, col, total_mine_count, topology)
+
+        rng = rng or random.Random()
+        start = start if start is not None else default_start(row, col)
+        timeout = self.timeout if timeout is None else timeout
+        started = time.perf_counter()
+
+        base_seed = rng.getrandbits(48)
+        tasks = (CandidateTask(row, col, total_mine_count, topology.name, start, base_seed + attempt)
+                 for attempt in range(sys.maxsize))
+
+        if self.workers > 1 and row * col >= PARALLEL_MIN_CELLS:
+            seed, attempts = self.search_parallel(tasks, started + timeout)
+
+        else:
+            seed, attempts = self.search_serial(tasks, started + timeout)
+
+        if seed is not None:
+            current_map = create_candidate(CandidateTask(row, col, total_mine_count, topology.name, start, seed))
+            result = GenerationResult(current_map, start, True, attempts, time.perf_counter() - started)
+
+        else:
+            result = GenerationResult(self.fallback(row, col, total_mine_count, rng, topology, start), start, False,
+                                      attempts, time.perf_counter() - started)
+
+        self.stats.record(row, col, total_mine_count, topology, result)
+        return result
+
+    def search_serial(self, tasks: Iterator['CandidateTask'], deadline: float):
+        attempts = 0
+
+        for task in tasks:
+            attempts += 1
+
+            if check_candidate(task).solvable:
+                return task.seed, attempts
+
+            if time.perf_counter() >= deadline:
+                return None, attempts
+
+    def search_parallel(self, tasks: Iterator['CandidateTask'], deadline: float):
+
+        if self.executor is None:
+            self.executor = concurrent.futures.ProcessPoolExecutor(self.workers)
+
+        # 워커마다 후보 하나씩 검사하고, 하나가 끝날 때마다 새 후보를 넣는다
+        pending = {self.executor.submit(check_candidate, next(tasks)) for _ in range(self.workers)}
+        attempts = 0
+
+        try:
+            while pending:
+                remaining = deadline - time.perf_counter()
+
+                if remaining <= 0:
+                    return None, attempts
+
+                done, pending = concurrent.futures.wait(pending, remaining,
+                                                        return_when=concurrent.futures.FIRST_COMPLETED)
+
+                for future in done:
+                    attempts += 1
+                    result = future.result()
+
+                    if result.solvable:
+                        return result.seed, attempts
+
+                    pending.add(self.executor.submit(check_candidate, next(tasks)))
+
+            return None, attempts
+
+        finally:
+            # 아직 시작하지 않은 후보는 취소하고, 검사 중인 후보의 결과는 버린다
+            for future in pending:
+                future.cancel()
+
+    @staticmethod
+    def fallback(row: int, col: int, total_mine_count: int, rng: random.Random, topology: 'Topology',
+                 start: Tuple[int, int], tries: int = 100):
+        # 추측 없는 보드를 찾지 못했을 때의 일반 보드, 가능하면 첫 클릭 칸만은 열리는 칸으로 고른다
+        current_map = None
+
+        for _ in range(tries):
+            current_map = Map.create(row, col, total_mine_count, rng, topology)
+
+            if not current_map.is_mine(*start) and current_map.near_mine_count(*start) == 0:
+                break
+
+        return current_map
+
+
+_default_generator: Optional['NoGuessGenerator'] = None
+
+
+def default_generator():
+    global _default_generator
+
+    if _default_generator is None:
+        _default_generator = NoGuessGenerator()
+
+    return _default_generator
+
+
+def generate_no_guess_map(row: int, col: int, total_mine_count: int, rng: Optional[random.Random] = None,
+                          topology: 'Topology' = SQUARE4, start: Optional[Tuple[int, int]] = None,
+                          timeout: Optional[float] = None):
+    return default_generator().generate(row, col, total_mine_count, rng, topology, start, timeout)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m minegame.noguess",
+                                     description="Generate no-guess boards and report success rate and time.")
+    parser.add_argument("--difficulty", action="append", choices=[difficulty.name for difficulty in Difficulty],
+                        help="preset to measure, may be repeated")
+    parser.add_argument("--size", action="append", default=[], help="custom board as ROWxCOL:MINES, may be repeated")
+    parser.add_argument("--boards", type=int, default=10, help="boards to generate per size")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--timeout", type=float, default=DEFAULT_TIMEOUT)
+    parser.add_argument("--topology", choices=list(TOPOLOGIES), default="square4")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    sizes = [(Difficulty[name].row_size, Difficulty[name].col_size, Difficulty[name].total_mine_count)
+             for name in args.difficulty or ([] if args.size else [difficulty.name for difficulty in Difficulty])]
+
+    for size in args.size:
+        board, mines = size.lower().split(":")
+        row, col = (int(value) for value in board.split("x"))
+        sizes.append((row, col, int(mines)))
+
+    generator = NoGuessGenerator(args.workers, args.timeout)
+    rng = random.Random(args.seed)
+    topology = get_topology(args.topology)
+
+    try:
+        for row, col, total_mine_count in sizes:
+            for _ in range(args.boards):
+                generator.generate(row, col, total_mine_count, rng, topology)
+
+    finally:
+        generator.close()
+
+    for entry in generator.stats.report():
+        print(f"{entry['topology']} {entry['board']:>9} {entry['mines']:6} mines ({entry['density'] * 100:4.1f}%)  "
+              f"candidate success {entry['candidate_success_rate'] * 100:5.1f}%  "
+              f"mean {entry['mean_attempts']:6.1f} candidates {entry['mean_ms']:9.1f} ms  "
+              f"fallbacks {entry['fallbacks']}/{entry['boards']}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,466 @@
+import math
+import time
+
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict
+from typing import *
+
+from minegame.minegame import BoardStorage, Game, _REVEALED_BIT_TABLE
+
+
+class BudgetExceeded(Exception):
+    pass
+
+
+class MineProbabilities:
+    # 칸별 지뢰 확률, 드러난 안전 칸은 0.0, 드러났거나 확실한 지뢰는 1.0
+
+    def __init__(self, row: int, col: int, values: 'array', approximate: bool, outside_probability: float):
+        self.row = row
+        self.col = col
+        self.values = values
+        self.approximate = approximate  # 예산 초과로 일부 성분을 근사했는지
+        self.outside_probability = outside_probability  # 프런티어에 닿지 않은 칸의 확률
+
+    def probability(self, x: int, y: int):
+        return self.values[x * self.col + y]
+
+    def as_array(self):
+        return self.values
+
+    def safest_cell(self, states: bytearray):
+        # 드러나지 않았고 커버하지 않은 칸 중 지뢰 확률이 가장 낮은 칸
+        best = None
+        best_probability = 2.0
+
+        for index, probability in enumerate(self.values):
+
+            if probability < best_probability and not states[index] & (BoardStorage.REVEALED | BoardStorage.COVERED):
+                best = index
+                best_probability = probability
+
+        return None if best is None else divmod(best, self.col)
+
+
+class ComponentResult(NamedTuple):
+    cells: List[int]
+    totals: Dict[int, int]  # 지뢰 수 k -> 배치 수
+    cell_totals: List[Dict[int, int]]  # 칸마다, 그 칸이 지뢰인 배치에 대해 k -> 배치 수
+
+
+def _add_poly(target: Dict[int, int], source: Dict[int, int], shift: int = 0):
+    for k, ways in source.items():
+        target[k + shift] = target.get(k + shift, 0) + ways
+
+
+def _mul_poly(left: Dict[int, int], right: Dict[int, int], limit: Optional[int] = None):
+    # limit 을 주면 차수가 limit 을 넘는 항은 버린다
+    result: Dict[int, int] = {}
+
+    for k1, w1 in left.items():
+        for k2, w2 in right.items():
+
+            if limit is not None and k1 + k2 > limit:
+                continue
+
+            result[k1 + k2] = result.get(k1 + k2, 0) + w1 * w2
+
+    return result
+
+
+def _div_poly(numerator: Dict[int, int], denominator: Dict[int, int], limit: int):
+    # 나누어떨어지는 다항식의 몫을 낮은 차수부터 구한다, 차수 limit 까지만 구하므로 numerator 는 그보다 높은 차수가
+    # 잘려 있어도 된다
+    low = min(denominator)
+    lead = denominator[low]
+    others = [(k - low, ways) for k, ways in denominator.items() if k != low]
+    quotient: Dict[int, int] = {}
+
+    for j in range(min(numerator) - low, limit + 1):
+        value = numerator.get(j + low, 0)
+
+        for offset, ways in others:
+            value -= quotient.get(j - offset, 0) * ways
+
+        if value:
+            quotient[j] = value // lead
+
+    return quotient
+
+
+def _log(value: int):
+    return math.log(value) if value > 0 else -math.inf
+
+
+def _log_comb(n: int, k: int):
+
+    if k < 0 or k > n:
+        return -math.inf
+
+    return math.lgamma(n + 1) - math.lgamma(k + 1) - math.lgamma(n - k + 1)
+
+
+def _log_sum_exp(values: Iterable[float]):
+    values = [value for value in values if value != -math.inf]
+
+    if not values:
+        return -math.inf
+
+    peak = max(values)
+    return peak + math.log(sum(math.exp(value - peak) for value in values))
+
+
+class MineProbabilityEngine:
+    # 프런티어를 서로 독립인 성분으로 나누고, 성분마다 칸을 순서대로 지나며 열린 제약의 남은 지뢰 수를 상태로 하는
+    # 동적 계획법(같은 상태는 합쳐서 기억)으로 지뢰 수별 배치 수와 칸별 지뢰 배치 수를 센다.
+    # 성분 결과는 제약 모양을 키로 캐시하므로 바뀌지 않은 성분은 다시 세지 않는다.
+    # 프런티어 밖 칸들과는 남은 지뢰 수에 대한 이항계수로 결합한다.
+
+    DEFAULT_TIME_BUDGET = 0.5
+    DEFAULT_MAX_STATES = 200_000
+    CACHE_SIZE = 4096
+
+    # 전체 지뢰 수 분포에서 가장 큰 항보다 이만큼(로그) 작은 항은 확률에 영향이 없으므로 결합할 때 건너뛴다
+    NEGLIGIBLE_LOG_WEIGHT = 60.0
+
+    def __init__(self, game: 'Game'):
+        self.game = game
+        self.cache: 'OrderedDict[tuple, ComponentResult]' = OrderedDict()
+
+    def compute(self, time_budget: float = DEFAULT_TIME_BUDGET, max_states: int = DEFAULT_MAX_STATES):
+        game = self.game
+        current_map = game.map
+        game.hint()
+        solver = game.solver
+
+        # 확실한 칸을 추론한 뒤부터 예산을 잰다
+        deadline = time.perf_counter() + time_budget
+
+        size = current_map.row * current_map.col
+        states = current_map.board.states
+
+        constraints = {}
+
+        for index in solver.frontier:
+            unknown, remaining = solver.constraint(index)
+
+            if unknown:
+                constraints[index] = (frozenset(unknown), remaining)
+
+        components = self.split_components(constraints)
+        frontier_cells = sum(len(cells) for cells, _ in components)
+
+        hidden_mines = sum(1 for index in solver.mines if not states[index] & BoardStorage.REVEALED)
+        hidden_safe = len(solver.safe)
+        hidden = size - states[:].translate(_REVEALED_BIT_TABLE).count(1)
+
+        remaining_mines = game.total_mine_count - hidden_mines
+        outside = hidden - hidden_mines - hidden_safe - frontier_cells
+
+        exact: List['ComponentResult'] = []
+        estimates: Dict[int, float] = {}
+        approximate = False
+
+        for cells, component_constraints in components:
+            try:
+                if approximate:
+                    raise BudgetExceeded()
+
+                exact.append(self.count_component(cells, component_constraints, deadline, max_states))
+
+            except BudgetExceeded:
+                approximate = True
+                estimates.update(self.estimate_component(cells, component_constraints))
+
+        remaining_mines -= round(sum(estimates.values()))
+
+        probabilities, outside_probability, combined = self.combine(exact, outside, remaining_mines, deadline)
+        probabilities.update(estimates)
+        approximate = approximate or not combined
+
+        values = array("d", [outside_probability]) * size
+        revealed = states[:].translate(_REVEALED_BIT_TABLE)
+        index = revealed.find(1)
+
+        while index != -1:
+            values[index] = 1.0 if current_map.board.mines[index] else 0.0
+            index = revealed.find(1, index + 1)
+
+        for index in solver.safe:
+            values[index] = 0.0
+
+        for index in solver.mines:
+            values[index] = 1.0
+
+        for index, probability in probabilities.items():
+            values[index] = probability
+
+        return MineProbabilities(current_map.row, current_map.col, values, approximate, outside_probability)
+
+    @staticmethod
+    def split_components(constraints: Dict[int, Tuple[FrozenSet[int], int]]):
+        # 모르는 칸을 공유하는 제약끼리 묶는다
+        cell_constraints: Dict[int, List[int]] = {}
+
+        for index, (unknown, _) in constraints.items():
+            for cell in unknown:
+                cell_constraints.setdefault(cell, []).append(index)
+
+        components = []
+        visited: Set[int] = set()
+
+        for start in cell_constraints:
+
+            if start in visited:
+                continue
+
+            # 성분 안의 칸 순서는 너비 우선 순서, 열린 제약의 수(상태 폭)를 작게 유지한다
+            cells = []
+            component_constraints = set()
+            queue = [start]
+            visited.add(start)
+
+            for cell in queue:
+                cells.append(cell)
+
+                for index in cell_constraints[cell]:
+
+                    if index in component_constraints:
+                        continue
+
+                    component_constraints.add(index)
+
+                    for other in sorted(constraints[index][0]):
+
+                        if other not in visited:
+                            visited.add(other)
+                            queue.append(other)
+
+            components.append((cells, [constraints[index] for index in sorted(component_constraints)]))
+
+        return components
+
+    def count_component(self, cells: List[int], constraints: List[Tuple[FrozenSet[int], int]], deadline: float,
+                        max_states: int):
+        key = (tuple(cells), tuple((tuple(sorted(unknown)), remaining) for unknown, remaining in constraints))
+
+        if key in self.cache:
+            self.cache.move_to_end(key)
+            return self.cache[key]
+
+        result = self.count_configurations(cells, constraints, deadline, max_states)
+
+        self.cache[key] = result
+
+        if len(self.cache) > self.CACHE_SIZE:
+            self.cache.popitem(last=False)
+
+        return result
+
+    @staticmethod
+    def count_configurations(cells: List[int], constraints: List[Tuple[FrozenSet[int], int]], deadline: float,
+                             max_states: int):
+        n = len(cells)
+        position = {cell: i for i, cell in enumerate(cells)}
+
+        first = [min(position[cell] for cell in unknown) for unknown, _ in constraints]
+        last = [max(position[cell] for cell in unknown) for unknown, _ in constraints]
+        members = [set(position[cell] for cell in unknown) for unknown, _ in constraints]
+
+        # active[i]: 칸 i 앞 경계에서 열려 있는 제약 (이미 일부 칸이 정해졌고 남은 칸이 있음)
+        # closing[i]: 칸 i 가 마지막 칸인 제약, 닫힐 때 남은 지뢰가 정확히 0 이어야 한다
+        opening: List[List[int]] = [[] for _ in range(n)]
+        closing: List[List[int]] = [[] for _ in range(n)]
+
+        for c in range(len(constraints)):
+            opening[first[c]].append(c)
+            closing[last[c]].append(c)
+
+        active = [[]]
+        current: Set[int] = set()
+
+        for i in range(n):
+            current.update(opening[i])
+            current.difference_update(closing[i])
+            active.append(sorted(current))
+
+        # unassigned[i]: active[i] 의 각 제약에서 경계 i 이후에 남은 칸 수
+        positions = [sorted(p) for p in members]
+        unassigned = [[len(positions[c]) - bisect_left(positions[c], i) for c in active[i]] for i in range(n + 1)]
+
+        def transition(i: int, state: Tuple[int, ...], value: int):
+            before = dict(zip(active[i], state))
+
+            for c in closing[i]:
+                if before.get(c, constraints[c][1]) - value != 0:
+                    return None
+
+            after = []
+
+            for c, bound in zip(active[i + 1], unassigned[i + 1]):
+                residual = before.get(c, constraints[c][1])
+
+                if i in members[c]:
+                    residual -= value
+
+                if residual < 0 or residual > bound:
+                    return None
+
+                after.append(residual)
+
+            return tuple(after)
+
+        # 앞에서부터: forward[i][state] = {k: 배치 수}
+        forward: List[Dict[Tuple[int, ...], Dict[int, int]]] = [{(): {0: 1}}]
+        transitions: List[Dict[Tuple[Tuple[int, ...], int], Optional[Tuple[int, ...]]]] = []
+        state_count = 0
+
+        for i in range(n):
+            layer: Dict[Tuple[int, ...], Dict[int, int]] = {}
+            moves = {}
+
+            for state, poly in forward[i].items():
+                for value in (0, 1):
+                    target = transition(i, state, value)
+                    moves[(state, value)] = target
+
+                    if target is not None:
+                        _add_poly(layer.setdefault(target, {}), poly, value)
+
+            state_count += len(layer)
+
+            if state_count > max_states or time.perf_counter() > deadline:
+                raise BudgetExceeded()
+
+            forward.append(layer)
+            transitions.append(moves)
+
+        # 뒤에서부터: backward[i][state] = 경계 i 의 상태에서 나머지 칸을 채우는 {k: 배치 수}
+        backward: List[Dict[Tuple[int, ...], Dict[int, int]]] = [{} for _ in range(n + 1)]
+        backward[n] = {state: {0: 1} for state in forward[n]}
+
+        for i in range(n - 1, -1, -1):
+            for state in forward[i]:
+                poly: Dict[int, int] = {}
+
+                for value in (0, 1):
+                    target = transitions[i][(state, value)]
+
+                    if target is not None and target in backward[i + 1]:
+                        _add_poly(poly, backward[i + 1][target], value)
+
+                if poly:
+                    backward[i][state] = poly
+
+        totals = backward[0].get((), {})
+        cell_totals = []
+
+        for i in range(n):
+            mine_poly: Dict[int, int] = {}
+
+            for state, poly in forward[i].items():
+                target = transitions[i][(state, 1)]
+
+                if target is not None and target in backward[i + 1]:
+                    _add_poly(mine_poly, _mul_poly(poly, backward[i + 1][target]), 1)
+
+            cell_totals.append(mine_poly)
+
+        return ComponentResult(cells, totals, cell_totals)
+
+    @staticmethod
+    def estimate_component(cells: List[int], constraints: List[Tuple[FrozenSet[int], int]]):
+        # 예산을 넘은 성분은 칸이 속한 제약들의 (남은 지뢰 / 모르는 칸) 평균으로 근사한다
+        sums: Dict[int, float] = {cell: 0.0 for cell in cells}
+        counts: Dict[int, int] = {cell: 0 for cell in cells}
+
+        for unknown, remaining in constraints:
+            density = remaining / len(unknown)
+
+            for cell in unknown:
+                sums[cell] += density
+                counts[cell] += 1
+
+        return {cell: sums[cell] / counts[cell] for cell in cells}
+
+    @classmethod
+    def combine(cls, components: List['ComponentResult'], outside: int, remaining_mines: int, deadline: float):
+        # 성분들의 지뢰 수 분포를 곱하고, 나머지 지뢰는 프런티어 밖 칸에 C(outside, m) 가지로 놓인다
+        # (칸별 확률, 밖 칸의 확률, 정확히 결합했는지) 를 돌려주고, 예산을 넘으면 남은 성분은 근사한다
+        # 지뢰가 remaining_mines 개를 넘는 항은 가중치가 0 이므로 곱할 때부터 잘라낸다
+        product = {0: 1}
+
+        for component in components:
+
+            if time.perf_counter() > deadline:
+                return cls.combine_independent(components, outside, remaining_mines) + (False,)
+
+            product = _mul_poly(product, component.totals, remaining_mines)
+
+        log_weights = {k: _log(ways) + _log_comb(outside, remaining_mines - k) for k, ways in product.items()}
+        total = _log_sum_exp(log_weights.values())
+
+        if total == -math.inf:
+            # 추정치와 맞지 않는 경우 남은 지뢰를 모르는 칸 전체에 고르게 나눈다
+            unknown = outside + sum(len(component.cells) for component in components)
+            uniform = max(0.0, min(1.0, remaining_mines / unknown)) if unknown else 0.0
+            return {cell: uniform for component in components for cell in component.cells}, uniform, True
+
+        outside_probability = 0.0
+
+        if outside:
+            outside_probability = sum(math.exp(log_weight - total) * (remaining_mines - k) / outside
+                                      for k, log_weight in log_weights.items() if log_weight != -math.inf)
+
+        # 전체 지뢰 수가 이 창 밖인 배치는 무시할 만큼 작다, 성분과 나머지의 조합도 전체 항보다 클 수 없다
+        window = [k for k, log_weight in log_weights.items() if log_weight >= total - cls.NEGLIGIBLE_LOG_WEIGHT]
+        window_low, window_high = min(window), max(window)
+
+        probabilities: Dict[int, float] = {}
+
+        for c, component in enumerate(components):
+
+            if time.perf_counter() > deadline:
+                probabilities.update(cls.combine_independent(components[c:], outside, remaining_mines)[0])
+                return probabilities, outside_probability, False
+
+            # 나머지 성분 전체의 분포는 전체 곱을 이 성분으로 나눈 몫, 창에 닿는 차수까지만 구한다
+            rest = _div_poly(product, component.totals, window_high - min(component.totals))
+            rest_logs = {rest_k: _log(ways) for rest_k, ways in rest.items()}
+
+            # rest_weight[k]: 이 성분에 지뢰가 k 개일 때 나머지 전체의 로그 가중치
+            rest_weight = {
+                k: _log_sum_exp(rest_logs[rest_k] + _log_comb(outside, remaining_mines - k - rest_k)
+                                for rest_k in range(window_low - k, window_high - k + 1) if rest_k in rest_logs)
+                for k in component.totals
+            }
+
+            for cell, mine_poly in zip(component.cells, component.cell_totals):
+                probabilities[cell] = sum(math.exp(_log(ways) + rest_weight[k] - total)
+                                          for k, ways in mine_poly.items())
+
+        return probabilities, outside_probability, True
+
+    @staticmethod
+    def combine_independent(components: List['ComponentResult'], outside: int, remaining_mines: int):
+        # 예산을 넘었을 때의 근사: 성분끼리의 지뢰 수 제약을 무시하고, 모르는 칸 전체의 평균 밀도로 칸마다 독립인
+        # 사전 확률을 두어 성분 안의 배치에 가중치를 준다
+        unknown = outside + sum(len(component.cells) for component in components)
+        density = max(0.0, min(1.0, remaining_mines / unknown)) if unknown else 0.0
+
+        if density in (0.0, 1.0):
+            return {cell: density for component in components for cell in component.cells}, density
+
+        odds = math.log(density) - math.log(1.0 - density)
+        probabilities: Dict[int, float] = {}
+
+        for component in components:
+            weights = {k: _log(ways) + k * odds for k, ways in component.totals.items()}
+            total = _log_sum_exp(weights.values())
+
+            for cell, mine_poly in zip(component.cells, component.cell_totals):
+                probabilities[cell] = density if total == -math.inf else \
+                    sum(math.exp(_log(ways) + k * odds - total) for k, ways in mine_poly.items())
+
+        return probabilities, density
@@ -0,0 +1,244 @@
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+
+from typing import *
+
+from minegame.histogram import LatencyHistogram
+
+
+class Probe(NamedTuple):
+    module: str
+    owner: Optional[str]  # 클래스 이름, 모듈 함수면 None
+    attribute: str
+    name: str
+    # (인자, 반환값) 으로 추가 카운터 {이름: 증가량} 을 만드는 함수
+    counters: Optional[Callable[[tuple, Any], Dict[str, int]]] = None
+
+
+def _region_counters(args, spans):
+    return {"zero_region.spans": len(spans), "zero_region.cells": sum(right - left for left, right in spans)}
+
+
+def _changed_counters(args, changed_cells):
+    return {"changed_cells": len(changed_cells)}
+
+
+def _widget_counters(args, result):
+    return {"ui.widgets_touched": 1}
+
+
+def _painted_counters(args, result):
+    return {"ui.cells_painted": 1}
+
+
+ENGINE_PROBES = [
+    Probe("minegame.minegame", "Game", "reveal", "game.reveal"),
+    Probe("minegame.minegame", "Game", "cover", "game.cover"),
+    Probe("minegame.minegame", "Game", "get_block_info", "game.get_block_info"),
+    Probe("minegame.minegame", "Game", "snapshot", "game.snapshot"),
+    Probe("minegame.minegame", "Game", "pop_changed_cells", "game.pop_changed_cells", _changed_counters),
+    Probe("minegame.minegame", "Game", "set_game_over", "game.set_game_over"),
+    Probe("minegame.minegame", "Map", "create", "map.create"),
+    Probe("minegame.minegame", "Map", "reveal_adjacent_zero_blocks", "map.reveal_adjacent_zero_blocks"),
+    Probe("minegame.minegame", "ZeroRegionIndex", "find_region", "zero_region.find_region", _region_counters),
+    Probe("minegame.minegame", "ZeroRegionIndex", "mark_revealed", "zero_region.mark_revealed"),
+    Probe("minegame.minegame", None, "sample_mine_bitmap", "generation.sample_mine_bitmap"),
+    Probe("minegame.minegame", None, "count_near_mines", "generation.count_near_mines"),
+    Probe("minegame.noguess", "NoGuessGenerator", "generate", "generation.no_guess"),
+]
+
+# Qt 모듈은 이미 불러온 경우에만 계측한다 (계측 때문에 Qt 를 불러오지 않도록)
+UI_PROBES = [
+    Probe("minegame.minegame_ui", "GameUI", "update_ui", "ui.update_ui"),
+    Probe("minegame.minegame_ui", "GameUI", "set_button_text", "ui.set_button_text"),
+    Probe("minegame.minegame_ui", "GameUI", "set_button_image", "ui.set_button_image", _widget_counters),
+    Probe("minegame.minegame_ui", "BoardView", "update_ui", "ui.board_view.update_ui"),
+    Probe("minegame.minegame_ui", "BoardCanvas", "paintEvent", "ui.canvas.paint_event"),
+    Probe("minegame.minegame_ui", "BoardCanvas", "paint_cell", "ui.canvas.paint_cell", _painted_counters),
+]
+
+
+class TimerStats:
+    __slots__ = ("count", "total_ns", "max_ns", "histogram")
+
+    def __init__(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = LatencyHistogram()
+
+    def record(self, elapsed_ns: int):
+        self.count += 1
+        self.total_ns += elapsed_ns
+
+        if elapsed_ns > self.max_ns:
+            self.max_ns = elapsed_ns
+
+        self.histogram.record(elapsed_ns)
+
+    def clear(self):
+        self.count = 0
+        self.total_ns = 0
+        self.max_ns = 0
+        self.histogram = LatencyHistogram()
+
+    def to_dict(self):
+        return {
+            "count": self.count,
+            "total_ms": self.total_ns / 1e6,
+            "mean_us": self.total_ns / self.count / 1e3 if self.count else 0.0,
+            "p50_us": self.histogram.percentile(50) / 1e3,
+            "p99_us": self.histogram.percentile(99) / 1e3,
+            "max_us": self.max_ns / 1e3,
+        }
+
+
+class Profiler:
+    # 켜면 Probe 대상 메서드를 시간을 재는 래퍼로 바꾸고, 끄면 원래 메서드를 되돌린다
+    # 꺼져 있을 때는 어떤 코드 경로에도 검사가 남지 않으므로 비용이 없다
+
+    ENVIRONMENT_VARIABLE = "MINEGAME_PROFILE"
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timers: Dict[str, 'TimerStats'] = {}
+        self.counters: Dict[str, int] = {}
+        self.originals: List[Tuple[Any, str, Any]] = []  # (소유자, 속성 이름, 원래 값)
+
+        self.dump_thread: Optional[threading.Thread] = None
+        self.dump_stop: Optional[threading.Event] = None
+        self.dump_file = None
+
+    def is_enabled(self):
+        return bool(self.originals)
+
+    def enable(self, ui: bool = True):
+
+        if self.is_enabled():
+            return
+
+        probes = list(ENGINE_PROBES)
+
+        if ui and "minegame.minegame_ui" in sys.modules:
+            probes += UI_PROBES
+
+        for probe in probes:
+            self.install(probe)
+
+    def disable(self):
+        for owner, attribute, original in reversed(self.originals):
+            setattr(owner, attribute, original)
+
+        self.originals.clear()
+
+    def install(self, probe: 'Probe'):
+        module = importlib.import_module(probe.module)
+        owner = module if probe.owner is None else getattr(module, probe.owner)
+        original = vars(owner)[probe.attribute]
+
+        # classmethod / staticmethod 는 안쪽 함수를 감싸고 같은 종류로 다시 묶는다
+        if isinstance(original, (classmethod, staticmethod)):
+            wrapped = type(original)(self.wrap(original.__func__, probe))
+
+        else:
+            wrapped = self.wrap(original, probe)
+
+        setattr(owner, probe.attribute, wrapped)
+        self.originals.append((owner, probe.attribute, original))
+
+    def wrap(self, func: Callable, probe: 'Probe'):
+        stats = self.timers.setdefault(probe.name, TimerStats())
+        counters = probe.counters
+        lock = self.lock
+        clock = time.perf_counter_ns
+
+        def wrapper(*args, **kwargs):
+            start = clock()
+            result = ()
+
+            try:
+                result = func(*args, **kwargs)
+                return result
+
+            finally:
+                elapsed = clock() - start
+
+                with lock:
+                    stats.record(elapsed)
+
+                    if counters is not None:
+                        for name, value in counters(args, result).items():
+                            self.counters[name] = self.counters.get(name, 0) + value
+
+        wrapper.__name__ = func.__name__
+        wrapper.__qualname__ = func.__qualname__
+        wrapper.__wrapped__ = func
+        return wrapper
+
+    def count(self, name: str, value: int = 1):
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + value
+
+    def reset(self):
+        # 래퍼가 통계 객체를 붙잡고 있으므로 객체는 그대로 두고 비운다
+        with self.lock:
+            for stats in self.timers.values():
+                stats.clear()
+
+            self.counters.clear()
+
+    def snapshot(self):
+        with self.lock:
+            return {
+                "timers": {name: stats.to_dict() for name, stats in self.timers.items() if stats.count},
+                "counters": dict(self.counters),
+            }
+
+    def dump(self, stream: TextIO):
+        stream.write(json.dumps({"time": time.time(), **self.snapshot()}) + "\n")
+        stream.flush()
+
+    def start_dump(self, path: str, interval: float = 1.0):
+        # interval 초마다 누적 통계를 JSON 한 줄씩 덧붙인다
+        self.stop_dump()
+        self.dump_file = open(path, "a")
+        self.dump_stop = threading.Event()
+
+        def run(stop: threading.Event, stream: TextIO):
+            while not stop.wait(interval):
+                self.dump(stream)
+
+        self.dump_thread = threading.Thread(target=run, args=(self.dump_stop, self.dump_file), daemon=True)
+        self.dump_thread.start()
+
+    def stop_dump(self):
+
+        if self.dump_thread is None:
+            return
+
+        self.dump_stop.set()
+        self.dump_thread.join()
+        self.dump(self.dump_file)
+        self.dump_file.close()
+
+        self.dump_thread = None
+        self.dump_stop = None
+        self.dump_file = None
+
+    def enable_from_environment(self):
+        # MINEGAME_PROFILE=경로 로 실행하면 계측을 켜고 그 파일에 주기적으로 기록한다
+        path = os.environ.get(self.ENVIRONMENT_VARIABLE)
+
+        if not path:
+            return False
+
+        self.enable()
+        self.start_dump(path)
+        return True
+
+
+profiler = Profiler()
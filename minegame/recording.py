@@ -0,0 +1,418 @@
+import argparse
+import random
+import sys
+import time
+
+from itertools import compress
+from operator import ne
+from typing import *
+
+from minegame.minegame import Action, BoardStorage, Game, Map, count_near_mines
+from minegame.topology import SQUARE4, TOPOLOGY_CODES, Topology
+
+
+# 파일 구조
+#   MAGIC, VERSION
+#   varint row, col, total_mine_count
+#   byte   이웃 관계 (Topology.code)
+#   byte   보드 종류 (BOARD_SEED: zigzag varint 시드, BOARD_BITMAP: 칸당 1비트로 묶은 지뢰 평면,
+#                     BOARD_DEFERRED_SEED: 시드와 첫 클릭 이웃 제외 여부 byte, 지뢰는 첫 드러내기 때 놓인다)
+#   varint 동작들, 값은 (칸 인덱스 << ACTION_BITS) | 동작 종류 이며 파일 끝까지 이어진다
+MAGIC = b"MGRC"
+VERSION = 4
+
+BOARD_SEED = 0
+BOARD_BITMAP = 1
+BOARD_DEFERRED_SEED = 2
+
+ACTION_CODES = {Action.REVEAL: 0, Action.COVER: 1, Action.UNDO: 2, Action.REDO: 3, Action.CHORD: 4}
+ACTION_KINDS = (Action.REVEAL, Action.COVER, Action.UNDO, Action.REDO, Action.CHORD)
+
+# 동작 종류에 쓰는 비트 수
+ACTION_BITS = 3
+
+# 비트맵을 묶고 풀 때 쓰는, 각 바이트의 최하위 비트만 남기는 마스크 (길이에 맞춰 잘라 쓴다)
+_BIT_MASK_CACHE: Dict[int, int] = {}
+
+
+def write_varint(buffer: bytearray, value: int):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+
+    buffer.append(value)
+
+
+def read_varint(data: bytes, offset: int):
+    value = 0
+    shift = 0
+
+    while True:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+
+        if byte < 0x80:
+            return value, offset
+
+        shift += 7
+
+
+def zigzag(value: int):
+    return value * 2 if value >= 0 else -value * 2 - 1
+
+
+def unzigzag(value: int):
+    return value // 2 if value % 2 == 0 else -(value + 1) // 2
+
+
+def pack_bitmap(cells: bytearray):
+    # 칸 k 를 바이트 k // 8 의 비트 k % 8 에 놓는다
+    # cells[bit::8] 의 각 바이트는 0 또는 1 이므로 큰 정수로 읽어 bit 만큼 밀어도 옆 바이트로 넘치지 않는다
+    size = (len(cells) + 7) // 8
+    padded = cells[:] + bytes(size * 8 - len(cells))
+    packed = 0
+
+    for bit in range(8):
+        packed |= int.from_bytes(padded[bit::8], "little") << bit
+
+    return packed.to_bytes(size, "little")
+
+
+def unpack_bitmap(packed: bytes, count: int):
+    size = len(packed)
+
+    if size not in _BIT_MASK_CACHE:
+        _BIT_MASK_CACHE[size] = int.from_bytes(b"\x01" * size, "little")
+
+    mask = _BIT_MASK_CACHE[size]
+    value = int.from_bytes(packed, "little")
+    cells = bytearray(size * 8)
+
+    for bit in range(8):
+        cells[bit::8] = ((value >> bit) & mask).to_bytes(size, "little")
+
+    del cells[count:]
+    return cells
+
+
+class Recording:
+
+    def __init__(self, row: int, col: int, total_mine_count: int, seed: Optional[int] = None,
+                 mines: Optional[bytearray] = None, actions: Optional[List[int]] = None,
+                 topology: 'Topology' = SQUARE4, exclude_neighbours: Optional[bool] = None):
+        self.row = row
+        self.col = col
+        self.total_mine_count = total_mine_count
+        self.seed = seed
+        self.mines = mines
+        self.actions = actions if actions is not None else []  # (인덱스 << ACTION_BITS) | 동작 코드
+        self.topology = topology
+        self.exclude_neighbours = exclude_neighbours  # None 이 아니면 지뢰를 첫 드러내기 때 놓는 보드
+
+    def action(self, position: int):
+        code = self.actions[position]
+        x, y = divmod(code >> ACTION_BITS, self.col)
+        return ACTION_KINDS[code & ((1 << ACTION_BITS) - 1)], x, y
+
+    def create_game(self):
+        if self.seed is not None:
+            return Game.create(self.row, self.col, self.total_mine_count, random.Random(self.seed), self.topology,
+                               self.exclude_neighbours is not None, bool(self.exclude_neighbours))
+
+        mines = bytearray(self.mines)
+        board = BoardStorage(self.row, self.col, mines, count_near_mines(mines, self.row, self.col, self.topology))
+        current_map = Map(self.row, self.col, self.total_mine_count, board, topology=self.topology)
+        return Game.create_with_map(self.total_mine_count, current_map)
+
+    def header_bytes(self):
+        buffer = bytearray(MAGIC)
+        buffer.append(VERSION)
+        write_varint(buffer, self.row)
+        write_varint(buffer, self.col)
+        write_varint(buffer, self.total_mine_count)
+        buffer.append(self.topology.code)
+
+        if self.seed is not None and self.exclude_neighbours is not None:
+            buffer.append(BOARD_DEFERRED_SEED)
+            write_varint(buffer, zigzag(self.seed))
+            buffer.append(self.exclude_neighbours)
+
+        elif self.seed is not None:
+            buffer.append(BOARD_SEED)
+            write_varint(buffer, zigzag(self.seed))
+
+        else:
+            buffer.append(BOARD_BITMAP)
+            buffer += pack_bitmap(self.mines)
+
+        return buffer
+
+    def to_bytes(self):
+        buffer = self.header_bytes()
+
+        for code in self.actions:
+            write_varint(buffer, code)
+
+        return bytes(buffer)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+
+        if data[:len(MAGIC)] != MAGIC:
+            raise ValueError("Not a game recording.")
+
+        version = data[len(MAGIC)]
+
+        if version != VERSION:
+            raise ValueError(f"Unsupported recording version {version}.")
+
+        offset = len(MAGIC) + 1
+        row, offset = read_varint(data, offset)
+        col, offset = read_varint(data, offset)
+        total_mine_count, offset = read_varint(data, offset)
+
+        if data[offset] not in TOPOLOGY_CODES:
+            raise ValueError(f"Unknown board topology {data[offset]}.")
+
+        topology = TOPOLOGY_CODES[data[offset]]
+        offset += 1
+
+        board_kind = data[offset]
+        offset += 1
+        seed = None
+        mines = None
+        exclude_neighbours = None
+
+        if board_kind in (BOARD_SEED, BOARD_DEFERRED_SEED):
+            value, offset = read_varint(data, offset)
+            seed = unzigzag(value)
+
+            if board_kind == BOARD_DEFERRED_SEED:
+                exclude_neighbours = bool(data[offset])
+                offset += 1
+
+        elif board_kind == BOARD_BITMAP:
+            size = (row * col + 7) // 8
+            mines = unpack_bitmap(data[offset:offset + size], row * col)
+            offset += size
+
+        else:
+            raise ValueError(f"Unknown board kind {board_kind}.")
+
+        actions = []
+        end = len(data)
+
+        while offset < end:
+            code, offset = read_varint(data, offset)
+            actions.append(code)
+
+        return cls(row, col, total_mine_count, seed, mines, actions, topology, exclude_neighbours)
+
+    @classmethod
+    def load(cls, path: str):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read())
+
+
+class GameRecorder:
+    # Game.reveal / Game.cover 가 실제로 적용하는 동작을 varint 하나씩으로 기록한다
+    # seed 를 주면 시드만, 아니면 지뢰 평면을 비트맵으로 기록한다 (seed 는 random.Random(seed) 로 만든 게임이어야 한다)
+    # 지뢰를 첫 드러내기 때 놓는 게임은 아직 평면이 없으므로 seed 가 있어야 한다
+
+    FLUSH_SIZE = 64 * 1024
+
+    def __init__(self, game: 'Game', stream: BinaryIO, seed: Optional[int] = None):
+        current_map = game.map
+        self.game = game
+        self.stream = stream
+        self.col = current_map.col
+        self.action_count = 0
+
+        placement = current_map.placement
+
+        if placement is not None and seed is None:
+            raise ValueError("Recording a game whose mines are not placed yet needs its seed.")
+
+        recording = Recording(current_map.row, current_map.col, game.total_mine_count, seed,
+                              None if seed is not None else current_map.board.mines, topology=current_map.topology,
+                              exclude_neighbours=None if placement is None else placement.exclude_neighbours)
+        self.buffer = recording.header_bytes()
+
+        game.recorder = self
+
+    @classmethod
+    def open(cls, game: 'Game', path: str, seed: Optional[int] = None):
+        return cls(game, open(path, "wb"), seed)
+
+    def record(self, action: str, x: int, y: int):
+        write_varint(self.buffer, (x * self.col + y) << ACTION_BITS | ACTION_CODES[action])
+        self.action_count += 1
+
+        if len(self.buffer) >= self.FLUSH_SIZE:
+            self.flush()
+
+    def flush(self):
+        self.stream.write(self.buffer)
+        self.buffer = bytearray()
+        self.stream.flush()
+
+    def close(self):
+        self.flush()
+        self.game.recorder = None
+        self.stream.close()
+
+
+class Snapshot(NamedTuple):
+    position: int
+    states: bytes
+    find_mine_count: int
+    covered_block_count: int
+    is_game_end: bool
+    game_state: str
+    undo_entries: tuple  # 되돌리기 기록 (항목은 바뀌지 않으므로 목록만 복사한다)
+    redo_entries: tuple
+    mines: Optional[bytes]  # 지뢰 평면, 지뢰를 첫 드러내기 때 놓는 게임에서 아직 놓이기 전이면 None
+
+
+class GameReplayer:
+    # 기록된 동작을 엔진에 그대로 다시 적용한다
+    # SNAPSHOT_INTERVAL 수마다 상태 평면과 게임 카운터를 저장해 두고, seek 는 가장 가까운 이전 스냅샷에서 이어서 둔다
+
+    SNAPSHOT_INTERVAL = 256
+
+    def __init__(self, recording: 'Recording', snapshot_interval: int = SNAPSHOT_INTERVAL):
+        self.recording = recording
+        self.snapshot_interval = snapshot_interval
+        self.game = recording.create_game()
+        self.position = 0
+
+        # 지뢰 평면은 놓인 뒤로 바뀌지 않으므로 스냅샷들이 같은 bytes 하나를 나눠 쓴다
+        self.mines: Optional[bytes] = None
+        self.snapshots: List['Snapshot'] = [self.take_snapshot()]
+
+    @classmethod
+    def load(cls, path: str, snapshot_interval: int = SNAPSHOT_INTERVAL):
+        return cls(Recording.load(path), snapshot_interval)
+
+    def __len__(self):
+        return len(self.recording.actions)
+
+    def take_snapshot(self):
+        game = self.game
+
+        if self.mines is None and game.map.mines_placed:
+            self.mines = bytes(game.map.board.mines)
+
+        return Snapshot(self.position, bytes(game.map.board.states), game.find_mine_count, game.covered_block_count,
+                        game.is_game_end, game.game_state, tuple(game.journal.undo_entries),
+                        tuple(game.journal.redo_entries), self.mines if game.map.mines_placed else None)
+
+    def restore(self, snapshot: 'Snapshot'):
+        # 되돌린 상태에서는 이전 추론이 맞지 않으므로 다시 만든다
+        self.game.reset_solver()
+        old_states = self.game.map.board.states
+
+        # 지뢰를 놓기 전으로 돌아가면 지뢰 배치와 그 난수도 되돌려야 하므로 기록에서 게임을 새로 만든다
+        # (다시 두는 첫 드러내기가 Game.place_mines 와 되돌리기 기록 정리를 거치도록)
+        if snapshot.mines is None and self.game.map.mines_placed:
+            self.game = self.recording.create_game()
+
+        game = self.game
+        current_map = game.map
+        states = current_map.board.states
+
+        # 지뢰를 놓기 전으로 돌아갔던 게임에서 놓인 뒤의 스냅샷으로 가면 저장해 둔 배치를 놓는다
+        # (다시 두는 드러내기가 새 배치를 뽑지 않도록)
+        if snapshot.mines is not None and not current_map.mines_placed:
+            current_map.set_mines(snapshot.mines)
+
+        # 화면이 다시 그릴 수 있도록 달라진 칸을 변경으로 알린다
+        changed = set(compress(range(len(old_states)), map(ne, old_states, snapshot.states)))
+        states[:] = snapshot.states
+        current_map.rebuild_indexes()
+        current_map.publish_changes(changed)
+
+        game.journal.undo_entries[:] = snapshot.undo_entries
+        game.journal.redo_entries[:] = snapshot.redo_entries
+
+        game.find_mine_count = snapshot.find_mine_count
+        game.covered_block_count = snapshot.covered_block_count
+        game.is_game_end = snapshot.is_game_end
+        game.game_state = snapshot.game_state
+        self.position = snapshot.position
+
+    def step(self):
+        if self.position >= len(self.recording.actions):
+            return None
+
+        action, x, y = self.recording.action(self.position)
+
+        if action == Action.REVEAL:
+            self.game.reveal(x, y)
+
+        elif action == Action.COVER:
+            self.game.cover(x, y)
+
+        elif action == Action.CHORD:
+            self.game.chord(x, y)
+
+        elif action == Action.UNDO:
+            self.game.undo()
+
+        else:
+            self.game.redo()
+
+        self.position += 1
+
+        if self.position % self.snapshot_interval == 0 and self.position > self.snapshots[-1].position:
+            self.snapshots.append(self.take_snapshot())
+
+        return action, x, y
+
+    def play(self, until: Optional[int] = None):
+        end = len(self.recording.actions) if until is None else min(until, len(self.recording.actions))
+
+        while self.position < end:
+            self.step()
+
+        return self.game
+
+    def seek(self, position: int):
+        position = max(0, min(position, len(self.recording.actions)))
+
+        # 스냅샷은 0, interval, 2 * interval, ... 순서로 빈틈없이 쌓인다
+        snapshot = self.snapshots[min(len(self.snapshots) - 1, position // self.snapshot_interval)]
+
+        if position < self.position or snapshot.position > self.position:
+            self.restore(snapshot)
+
+        return self.play(position)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m minegame.recording",
+                                     description="Replay a recorded game and print its final state.")
+    parser.add_argument("path")
+    parser.add_argument("--seek", type=int, help="stop after this many moves")
+    parser.add_argument("--repeat", type=int, default=1, help="replay this many times and report the speed")
+    args = parser.parse_args(argv)
+
+    recording = Recording.load(args.path)
+    started = time.perf_counter()
+
+    for _ in range(args.repeat):
+        replayer = GameReplayer(recording)
+        game = replayer.seek(args.seek) if args.seek is not None else replayer.play()
+
+    elapsed = time.perf_counter() - started
+    moves = replayer.position * args.repeat
+
+    print(f"{recording.topology.name} board {recording.row}x{recording.col}, {recording.total_mine_count} mines, "
+          f"{len(recording.actions)} moves recorded")
+    print(f"  replayed {replayer.position} moves -> {game.game_state}")
+    print(f"  {moves / elapsed:.0f} moves/sec over {elapsed:.3f} s")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
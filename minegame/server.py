@@ -0,0 +1,371 @@
+import argparse
+import asyncio
+import base64
+import concurrent.futures
+import json
+import random
+import secrets
+import sys
+import time
+
+from typing import *
+
+from minegame.minegame import Action, ActionBatchError, CellCode, GameController, Map, SizeLimit
+from minegame.topology import get_topology
+
+
+# 프로토콜: 한 줄에 JSON 하나 (요청과 응답 모두), 요청의 "id" 를 응답에 그대로 돌려주므로 한 연결에 여러 요청을 겹쳐 보낼 수 있다
+#   {"id": 1, "op": "new", "row": 16, "col": 16, "mines": 40, "topology": "square4", "seed": 7, "deferred": true}
+#       -> {"id": 1, "game": "...", "row": 16, "col": 16, "mines": 40, "state": "START", "cells": [...]}
+#   {"id": 2, "op": "reveal" | "cover" | "chord", "game": "...", "x": 3, "y": 4}
+#   {"id": 3, "op": "undo" | "redo", "game": "..."}
+#   {"id": 4, "op": "actions", "game": "...", "actions": [["REVEAL", 3, 4], ["COVER", 0, 1]]}
+#       -> {"id": ..., "game": "...", "state": "PLAYING", "applied": 2, "cells": [...]}
+#       동작 하나가 실패하면 "applied" 는 그 앞까지 적용된 동작 수이고 "error" 가 함께 온다
+#   {"id": 5, "op": "board", "game": "..."}  보드 전체 (다시 연결한 클라이언트용)
+#       -> {"id": 5, "game": "...", "row": 16, "col": 16, "state": "PLAYING", "snapshot": "<base64>"}
+#   {"id": 6, "op": "close", "game": "..."}
+#   {"id": 7, "op": "stats"}  세션 수 (메모리 예산이 있으면 상주/디스크 세션 수와 내림/올림 횟수도)
+# "cells" 는 바뀐 칸만 [x, y, code, x, y, code, ...] 로 펼친 목록이다
+# "snapshot" 은 칸마다 code 한 바이트를 행 우선으로 늘어놓은 것을 base64 로 인코딩한 것이다
+# code: 0~8 드러난 칸의 주변 지뢰 수, HIDDEN, FLAGGED, MINE (엔진의 CellCode)
+HIDDEN = CellCode.HIDDEN
+FLAGGED = CellCode.FLAGGED
+MINE = CellCode.MINE
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+DEFAULT_MAX_SIZE = 5000
+
+# 이보다 칸이 많은 보드는 생성과 드러내기(연쇄)를 실행기 스레드에서 돌려 이벤트 루프를 막지 않는다
+# 추측 없는 보드 생성은 작은 보드에서도 오래 걸리므로 크기와 관계없이 실행기에서 돌린다
+OFFLOAD_MIN_CELLS = 128 * 128
+
+ACTIONS = {"reveal": Action.REVEAL, "cover": Action.COVER, "chord": Action.CHORD}
+BATCH_ACTIONS = {Action.REVEAL, Action.COVER, Action.CHORD, Action.UNDO, Action.REDO}
+
+
+class ProtocolError(Exception):
+    pass
+
+
+class Session:
+    __slots__ = ("game_id", "controller", "row", "col", "lock", "last_used")
+
+    def __init__(self, game_id: str, controller: 'GameController', row: int, col: int):
+        self.game_id = game_id
+        self.controller = controller
+        self.row = row
+        self.col = col
+
+        # 같은 게임의 요청은 도착한 순서대로 하나씩 적용한다 (asyncio.Lock 은 기다린 순서대로 깨운다)
+        self.lock = asyncio.Lock()
+        self.last_used = time.monotonic()
+
+    def is_large(self):
+        return self.row * self.col >= OFFLOAD_MIN_CELLS
+
+
+class SessionRegistry:
+
+    def __init__(self, max_sessions: int = 100_000):
+        self.max_sessions = max_sessions
+        self.sessions: Dict[str, 'Session'] = {}
+
+    def __len__(self):
+        return len(self.sessions)
+
+    def add(self, controller: 'GameController', row: int, col: int):
+
+        if len(self.sessions) >= self.max_sessions:
+            raise ProtocolError(f"Too many sessions ({self.max_sessions}).")
+
+        game_id = secrets.token_hex(8)
+        session = Session(game_id, controller, row, col)
+        self.sessions[game_id] = session
+        return session
+
+    def get(self, game_id: str):
+        session = self.sessions.get(game_id)
+
+        if session is None:
+            raise ProtocolError(f"Unknown game {game_id!r}.")
+
+        session.last_used = time.monotonic()
+        return session
+
+    def load(self, session: 'Session'):
+        # 세션 잠금을 잡은 상태에서 게임을 가져온다 (메모리 예산이 있는 세션 목록은 여기서 디스크에서 다시 올린다)
+        return session.controller
+
+    def remove(self, game_id: str):
+        self.sessions.pop(game_id, None)
+
+    def expire(self, idle_seconds: float):
+        # 오래 쓰지 않은 세션을 지운다, 지운 수를 돌려준다
+        deadline = time.monotonic() - idle_seconds
+        expired = [game_id for game_id, session in self.sessions.items()
+                   if session.last_used < deadline and not session.lock.locked()]
+
+        for game_id in expired:
+            del self.sessions[game_id]
+
+        return len(expired)
+
+    def stats(self):
+        return {"sessions": len(self.sessions)}
+
+    def close(self):
+        pass
+
+
+def encode_cells(current_map: 'Map', cells: Iterable[Tuple[int, int]]):
+    # 칸 정보 객체를 만들지 않고 평면에서 바로 읽는다
+    cell_code = current_map.cell_code
+    encoded = []
+
+    for x, y in cells:
+        encoded += (x, y, cell_code(x, y))
+
+    return encoded
+
+
+class GameServer:
+
+    def __init__(self, registry: Optional['SessionRegistry'] = None,
+                 executor: Optional[concurrent.futures.Executor] = None, idle_timeout: float = 30 * 60,
+                 max_size: int = DEFAULT_MAX_SIZE):
+        self.registry = registry if registry is not None else SessionRegistry()
+        self.executor = executor
+        self.idle_timeout = idle_timeout
+        self.size_limit = SizeLimit(max_size, max_size)  # 클라이언트가 요청할 수 있는 가장 큰 보드
+        self.server: Optional[asyncio.AbstractServer] = None
+        self.sweeper: Optional[asyncio.Task] = None
+
+        self.handlers = {
+            "new": self.new_game,
+            "reveal": self.play,
+            "cover": self.play,
+            "chord": self.play,
+            "undo": self.play,
+            "redo": self.play,
+            "actions": self.play_batch,
+            "board": self.board,
+            "close": self.close_game,
+            "stats": self.stats,
+        }
+
+    async def start(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT):
+        self.server = await asyncio.start_server(self.handle_connection, host, port, limit=1 << 20)
+        self.sweeper = asyncio.get_running_loop().create_task(self.sweep())
+        return self.server
+
+    async def close(self):
+
+        if self.sweeper is not None:
+            self.sweeper.cancel()
+
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+
+        self.registry.close()
+
+    async def sweep(self):
+        while True:
+            await asyncio.sleep(max(1.0, self.idle_timeout / 10))
+            self.registry.expire(self.idle_timeout)
+
+    async def run_blocking(self, session_is_large: bool, function: Callable, *args):
+        # 큰 보드의 생성/연쇄는 실행기에서, 나머지는 루프에서 바로 실행한다 (스레드 전환 비용이 더 크다)
+        if not session_is_large:
+            return function(*args)
+
+        return await asyncio.get_running_loop().run_in_executor(self.executor, function, *args)
+
+    async def handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        # 요청마다 태스크를 띄워 다른 게임의 요청은 서로 기다리지 않는다, 같은 게임의 순서는 세션 잠금이 지킨다
+        tasks: Set[asyncio.Task] = set()
+
+        try:
+            while True:
+                line = await reader.readline()
+
+                if not line:
+                    break
+
+                task = asyncio.ensure_future(self.handle_line(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+
+        finally:
+            writer.close()
+
+    async def handle_line(self, line: bytes, writer: asyncio.StreamWriter):
+        request_id = None
+
+        try:
+            request = json.loads(line)
+            request_id = request.get("id")
+            handler = self.handlers.get(request.get("op"))
+
+            if handler is None:
+                raise ProtocolError(f"Unknown op {request.get('op')!r}.")
+
+            response = await handler(request)
+
+        except Exception as ex:
+            response = {"error": str(ex)}
+
+        response["id"] = request_id
+
+        if writer.is_closing():
+            return
+
+        writer.write(json.dumps(response, separators=(",", ":")).encode() + b"\n")
+
+        # 쓰기 버퍼가 쌓인 경우에만 기다린다
+        if writer.transport.get_write_buffer_size() > 1 << 16:
+            await writer.drain()
+
+    async def new_game(self, request: Dict[str, Any]):
+        row = int(request["row"])
+        col = int(request["col"])
+        total_mine_count = int(request["mines"])
+        topology = get_topology(request.get("topology", "square4"))
+        rng = random.Random(request["seed"]) if "seed" in request else None
+        deferred = bool(request.get("deferred", True))
+        no_guess = bool(request.get("no_guess", False))
+
+        def create():
+            return GameController.create_with_user_setting(row, col, total_mine_count, rng, topology, no_guess,
+                                                           deferred, self.size_limit)
+
+        controller = await self.run_blocking(no_guess or row * col >= OFFLOAD_MIN_CELLS, create)
+        session = self.registry.add(controller, row, col)
+        cells = encode_cells(controller.game.map, controller.pop_changed_cells())
+
+        return {"game": session.game_id, "row": row, "col": col, "mines": total_mine_count, "topology": topology.name,
+                "state": controller.get_game_state(), "cells": cells}
+
+    async def play(self, request: Dict[str, Any]):
+        op = request["op"]
+        actions = [(Action.UNDO if op == "undo" else Action.REDO, 0, 0)] if op in ("undo", "redo") \
+            else [(ACTIONS[op], int(request["x"]), int(request["y"]))]
+
+        return await self.apply(request["game"], actions)
+
+    async def play_batch(self, request: Dict[str, Any]):
+        return await self.apply(request["game"], [(str(action).upper(), int(x), int(y))
+                                                  for action, x, y in request["actions"]])
+
+    async def apply(self, game_id: str, actions: List[Tuple[str, int, int]]):
+        session = self.registry.get(game_id)
+
+        for action, x, y in actions:
+            if action not in BATCH_ACTIONS:
+                raise ProtocolError(f"Unknown action {action!r}.")
+
+            if action not in (Action.UNDO, Action.REDO) and not (0 <= x < session.row and 0 <= y < session.col):
+                raise ProtocolError(f"Cell ({x}, {y}) is outside the {session.row}x{session.col} board.")
+
+        async with session.lock:
+            controller = self.registry.load(session)
+            error = None
+
+            try:
+                result = await self.run_blocking(session.is_large(), controller.apply_actions, actions)
+
+            except ActionBatchError as ex:
+                # 실패한 동작 앞까지는 적용되었으므로 그 변경도 오류와 함께 보낸다
+                error = str(ex)
+                result = ex.result
+
+            # apply_actions 가 돌려준 묶음에 들어 있으므로 누적된 변경은 비운다
+            controller.game.map.changed_cells.clear()
+
+            response = {"game": game_id, "state": result.game_state, "applied": result.applied_count,
+                        "cells": encode_cells(controller.game.map, result.changed_cells)}
+
+            if error is not None:
+                response["error"] = error
+
+            return response
+
+    async def board(self, request: Dict[str, Any]):
+        session = self.registry.get(request["game"])
+
+        async with session.lock:
+            controller = self.registry.load(session)
+            snapshot = controller.snapshot()
+            return {"game": session.game_id, "row": session.row, "col": session.col,
+                    "state": controller.get_game_state(), "snapshot": base64.b64encode(snapshot).decode("ascii")}
+
+    async def close_game(self, request: Dict[str, Any]):
+        self.registry.remove(request["game"])
+        return {"game": request["game"], "closed": True}
+
+    async def stats(self, request: Dict[str, Any]):
+        return self.registry.stats()
+
+
+async def serve(host: str, port: int, max_sessions: int, idle_timeout: float, threads: int,
+                memory_budget: Optional[int] = None, spill_path: Optional[str] = None,
+                max_size: int = DEFAULT_MAX_SIZE):
+    executor = concurrent.futures.ThreadPoolExecutor(threads, thread_name_prefix="minegame")
+
+    if memory_budget is not None:
+        from minegame.sessionstore import SessionStore
+        registry = SessionStore(max_sessions, memory_budget, spill_path)
+
+    else:
+        registry = SessionRegistry(max_sessions)
+
+    server = GameServer(registry, executor, idle_timeout, max_size)
+    listener = await server.start(host, port)
+
+    print(f"serving on {', '.join(str(socket.getsockname()) for socket in listener.sockets)}", flush=True)
+
+    try:
+        await listener.serve_forever()
+
+    finally:
+        await server.close()
+        executor.shutdown(wait=False)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m minegame.server",
+                                     description="Serve minesweeper games over a JSON-lines TCP protocol.")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-sessions", type=int, default=100_000)
+    parser.add_argument("--idle-timeout", type=float, default=30 * 60, help="seconds before an idle game is dropped")
+    parser.add_argument("--threads", type=int, default=4, help="executor threads for large boards")
+    parser.add_argument("--max-size", type=int, default=DEFAULT_MAX_SIZE, help="largest board side a client may request")
+    parser.add_argument("--memory-budget", help="spill idle games to disk above this many bytes (e.g. 512M)")
+    parser.add_argument("--spill-dir", help="directory for spilled games (default: a temporary directory)")
+    args = parser.parse_args(argv)
+
+    memory_budget = None
+
+    if args.memory_budget is not None:
+        from minegame.sessionstore import parse_memory_size
+        memory_budget = parse_memory_size(args.memory_budget)
+
+    try:
+        asyncio.run(serve(args.host, args.port, args.max_sessions, args.idle_timeout, args.threads, memory_budget,
+                          args.spill_dir, args.max_size))
+
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,298 @@
+import os
+import pickle
+import shutil
+import struct
+import tempfile
+import time
+import zlib
+
+from collections import OrderedDict
+from typing import *
+
+from minegame.minegame import BoardStorage, Game, GameController, GameState, Map, count_near_mines
+from minegame.server import Session, SessionRegistry
+from minegame.topology import TOPOLOGY_CODES
+
+
+# 묶은 게임 구조
+#   헤더: 매직, 버전, 이웃 관계(Topology.code), 크기, 지뢰 수, Game 카운터, 드러난 안전 칸 수, 칸 블록 길이
+#   칸 블록: 칸마다 (지뢰 | 상태 << 1) 한 바이트를 zlib 으로 압축한 것, 주변 지뢰 수와 연쇄 색인은 풀 때 다시 계산한다
+#   나머지: 지뢰 배치 설정(아직 놓지 않은 보드)과 되돌리기 기록을 pickle 해 압축한 것
+MAGIC = b"MGSS"
+VERSION = 1
+
+HEADER = struct.Struct("<4sBBIIIqqBBQI")
+
+GAME_STATES = (GameState.START, GameState.PLAYING, GameState.WIN, GameState.LOSE)
+
+# 칸 바이트에서 지뢰 비트와 상태 플래그를 꺼내는 표
+_MINE_TABLE = bytes(value & 1 for value in range(256))
+_STATE_TABLE = bytes((value >> 1) & (BoardStorage.REVEALED | BoardStorage.COVERED) for value in range(256))
+
+# 평면 외에 게임 하나가 차지하는 객체들(Map, Game, 기록기, 세션)의 대략적인 크기
+GAME_OVERHEAD_BYTES = 2048
+
+# 상주하는 게임 하나의 칸당 바이트 (평면 3개, 연쇄 색인, 바뀐 칸 집합 등)
+BYTES_PER_CELL = 5
+
+DEFAULT_MEMORY_BUDGET = 256 * 1024 * 1024
+
+
+class PackedGame:
+    # 디스크에 내려 두는 게임 상태, 평면은 압축한 바이트 하나로 묶는다
+    __slots__ = ("header", "cells", "extras")
+
+    def __init__(self, header: bytes, cells: bytes, extras: bytes):
+        self.header = header
+        self.cells = cells
+        self.extras = extras
+
+    def nbytes(self):
+        return len(self.header) + len(self.cells) + len(self.extras)
+
+    def to_bytes(self):
+        return self.header + self.cells + self.extras
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        header = data[:HEADER.size]
+        magic, version, *_, cells_length = HEADER.unpack(header)
+
+        if magic != MAGIC:
+            raise ValueError("Not a packed game.")
+
+        if version != VERSION:
+            raise ValueError(f"Unsupported packed game version {version}.")
+
+        cells_end = HEADER.size + cells_length
+        return cls(header, data[HEADER.size:cells_end], data[cells_end:])
+
+    @classmethod
+    def pack(cls, game: 'Game'):
+        current_map = game.map
+        storage = current_map.board
+        size = current_map.row * current_map.col
+
+        # 지뢰(0/1) 와 상태(0~3) 를 한 바이트에 담는다, 두 값이 겹치지 않으므로 큰 정수 하나로 합친다
+        combined = int.from_bytes(storage.states[:], "little") << 1 | int.from_bytes(storage.mines[:], "little")
+        cells = zlib.compress(combined.to_bytes(size, "little"), 1)
+
+        journal = game.journal
+        history = (journal.undo_entries, journal.redo_entries) if journal is not None else ([], [])
+        extras = zlib.compress(pickle.dumps((current_map.placement, history), pickle.HIGHEST_PROTOCOL), 1)
+
+        header = HEADER.pack(MAGIC, VERSION, current_map.topology.code, current_map.row, current_map.col,
+                             game.total_mine_count, game.find_mine_count, game.covered_block_count, game.is_game_end,
+                             GAME_STATES.index(game.game_state), current_map.revealed_safe_count, len(cells))
+
+        return cls(header, cells, extras)
+
+    def unpack(self):
+        _, _, topology_code, row, col, total_mine_count, find_mine_count, covered_block_count, is_game_end, \
+            game_state, revealed_safe_count, _ = HEADER.unpack(self.header)
+
+        topology = TOPOLOGY_CODES[topology_code]
+        placement, (undo_entries, redo_entries) = pickle.loads(zlib.decompress(self.extras))
+
+        combined = zlib.decompress(self.cells)
+        mines = bytearray(combined.translate(_MINE_TABLE))
+        states = bytearray(combined.translate(_STATE_TABLE))
+
+        # 지뢰를 아직 놓지 않은 보드는 주변 지뢰 수도 비어 있다
+        near_mine_counts = count_near_mines(mines, row, col, topology) if placement is None else bytearray(row * col)
+        storage = BoardStorage(row, col, mines, near_mine_counts, states)
+
+        current_map = Map(row, col, total_mine_count, storage, revealed_safe_count, topology)
+        current_map.placement = placement
+
+        game = Game.create_with_map(total_mine_count, current_map)
+        game.find_mine_count = find_mine_count
+        game.covered_block_count = covered_block_count
+        game.is_game_end = bool(is_game_end)
+        game.game_state = GAME_STATES[game_state]
+
+        if game.journal is not None:
+            game.journal.undo_entries = undo_entries
+            game.journal.redo_entries = redo_entries
+
+        return game
+
+
+def estimate_game_nbytes(game: 'Game'):
+    current_map = game.map
+    size = current_map.row * current_map.col
+    nbytes = GAME_OVERHEAD_BYTES + BYTES_PER_CELL * size
+
+    if current_map.mine_positions is not None:
+        nbytes += current_map.mine_positions.itemsize * len(current_map.mine_positions)
+
+    if game.journal is not None:
+        for entries in (game.journal.undo_entries, game.journal.redo_entries):
+            nbytes += sum(64 + entry.cells.itemsize * len(entry.cells) for entry in entries)
+
+    return nbytes
+
+
+class SpillDirectory:
+    # 게임 하나를 파일 하나로 내려 두는 디스크 저장소
+
+    def __init__(self, path: Optional[str] = None):
+        self.owned = path is None
+        self.path = tempfile.mkdtemp(prefix="minegame-sessions-") if path is None else path
+        os.makedirs(self.path, exist_ok=True)
+
+    def file_path(self, game_id: str):
+        return os.path.join(self.path, game_id + ".mgs")
+
+    def write(self, game_id: str, packed: 'PackedGame'):
+        with open(self.file_path(game_id), "wb") as file:
+            file.write(packed.to_bytes())
+
+    def read(self, game_id: str):
+        path = self.file_path(game_id)
+
+        with open(path, "rb") as file:
+            packed = PackedGame.from_bytes(file.read())
+
+        os.remove(path)
+        return packed
+
+    def discard(self, game_id: str):
+        try:
+            os.remove(self.file_path(game_id))
+
+        except FileNotFoundError:
+            pass
+
+    def close(self):
+
+        if self.owned:
+            shutil.rmtree(self.path, ignore_errors=True)
+
+
+class SessionStore(SessionRegistry):
+    # 메모리 예산을 넘으면 가장 오래 쓰지 않은 세션의 게임을 디스크로 내리고, 다음 동작 때 다시 올리는 세션 목록
+    # 세션 객체(잠금 포함)는 계속 메모리에 두고 게임만 내리므로 내려 간 세션의 요청 순서도 그대로 지켜진다
+
+    def __init__(self, max_sessions: int = 100_000, memory_budget: int = DEFAULT_MEMORY_BUDGET,
+                 spill_path: Optional[str] = None):
+        super().__init__(max_sessions)
+        self.memory_budget = memory_budget
+        self.spill = SpillDirectory(spill_path)
+
+        # 상주하는 세션, 오래 쓰지 않은 순서
+        self.resident: OrderedDict[str, int] = OrderedDict()
+        self.resident_bytes = 0
+        self.spilled_bytes = 0
+        self.spilled_sizes: Dict[str, int] = {}
+
+        self.spill_count = 0
+        self.reload_count = 0
+        self.started = time.monotonic()
+
+    def add(self, controller: 'GameController', row: int, col: int):
+        session = super().add(controller, row, col)
+        self.set_resident(session)
+        self.enforce_budget(session)
+        return session
+
+    def load(self, session: 'Session'):
+        # 세션 잠금을 잡은 상태에서 부른다, 내려 간 게임이면 다시 올린다
+        if session.controller is None:
+            packed = self.spill.read(session.game_id)
+            self.spilled_bytes -= self.spilled_sizes.pop(session.game_id)
+            session.controller = GameController(packed.unpack())
+            self.reload_count += 1
+
+        self.set_resident(session)
+        self.enforce_budget(session)
+        return session.controller
+
+    def remove(self, game_id: str):
+        super().remove(game_id)
+        self.drop(game_id)
+
+    def expire(self, idle_seconds: float):
+        known = set(self.sessions)
+        expired = super().expire(idle_seconds)
+
+        for game_id in known - set(self.sessions):
+            self.drop(game_id)
+
+        return expired
+
+    def close(self):
+        self.spill.close()
+
+    def drop(self, game_id: str):
+        nbytes = self.resident.pop(game_id, None)
+
+        if nbytes is not None:
+            self.resident_bytes -= nbytes
+
+        if game_id in self.spilled_sizes:
+            self.spilled_bytes -= self.spilled_sizes.pop(game_id)
+            self.spill.discard(game_id)
+
+    def set_resident(self, session: 'Session'):
+        # 동작마다 게임 크기(되돌리기 기록 등)가 바뀌므로 다시 잰다
+        nbytes = estimate_game_nbytes(session.controller.game)
+        self.resident_bytes += nbytes - self.resident.pop(session.game_id, 0)
+        self.resident[session.game_id] = nbytes
+
+    def enforce_budget(self, keep: 'Session'):
+        # 방금 쓴 세션과 동작 중인(잠금이 잡힌) 세션은 내리지 않는다
+        if self.resident_bytes <= self.memory_budget:
+            return
+
+        for game_id in list(self.resident):
+            if self.resident_bytes <= self.memory_budget:
+                break
+
+            session = self.sessions[game_id]
+
+            if session is keep or session.lock.locked():
+                continue
+
+            self.spill_session(session)
+
+    def spill_session(self, session: 'Session'):
+        packed = PackedGame.pack(session.controller.game)
+        self.spill.write(session.game_id, packed)
+
+        self.resident_bytes -= self.resident.pop(session.game_id)
+        self.spilled_sizes[session.game_id] = packed.nbytes()
+        self.spilled_bytes += packed.nbytes()
+        self.spill_count += 1
+
+        session.controller = None
+
+    def stats(self):
+        elapsed = time.monotonic() - self.started
+        resident = len(self.resident)
+        spilled = len(self.spilled_sizes)
+
+        return {
+            "sessions": len(self.sessions),
+            "resident_sessions": resident,
+            "spilled_sessions": spilled,
+            "memory_budget": self.memory_budget,
+            "resident_bytes": self.resident_bytes,
+            "bytes_per_resident_session": self.resident_bytes / resident if resident else 0.0,
+            "bytes_per_spilled_session": self.spilled_bytes / spilled if spilled else 0.0,
+            "spills": self.spill_count,
+            "reloads": self.reload_count,
+            "spills_per_sec": self.spill_count / elapsed if elapsed else 0.0,
+            "reloads_per_sec": self.reload_count / elapsed if elapsed else 0.0,
+        }
+
+
+def parse_memory_size(text: str):
+    # "512M", "2G", "65536" 같은 크기를 바이트로
+    units = {"K": 1 << 10, "M": 1 << 20, "G": 1 << 30}
+    text = text.strip().upper().rstrip("B")
+
+    if text and text[-1] in units:
+        return int(float(text[:-1]) * units[text[-1]])
+
+    return int(text)
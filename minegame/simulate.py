@@ -0,0 +1,400 @@
+import argparse
+import importlib
+import json
+import multiprocessing
+import os
+import random
+import sys
+import time
+
+from abc import *
+from typing import *
+
+from minegame.histogram import LatencyHistogram
+from minegame.minegame import Action, BoardStorage, Difficulty, GameController, GameState
+from minegame.recording import GameRecorder
+from minegame.topology import TOPOLOGIES, get_topology
+
+
+class Strategy(metaclass=ABCMeta):
+    # 한 판을 두는 전략, 게임마다 새 인스턴스가 만들어진다
+
+    def start(self, game: 'GameController', rng: random.Random):
+        self.game = game
+        self.rng = rng
+
+    @abstractmethod
+    def next_move(self, changed_cells: List[Tuple[int, int]]) -> Optional[Tuple[str, int, int]]:
+        # 직전 수로 상태가 바뀐 셀을 받아 (Action, x, y) 를 돌려준다, None 이면 기권
+        pass
+
+
+class RandomStrategy(Strategy):
+    # 드러나지 않은 칸을 무작위로 열고, 남은 칸 수가 남은 지뢰 수와 같아지면 남은 칸을 모두 커버한다
+
+    def start(self, game: 'GameController', rng: random.Random):
+        super().start(game, rng)
+        current_map = game.game.map
+
+        self.size = current_map.row * current_map.col
+        self.col = current_map.col
+        self.states = current_map.board.states
+        self.hidden_count = self.size
+        self.to_cover: List[int] = []
+
+    def next_move(self, changed_cells):
+        move = self.finish_move(changed_cells)
+
+        if move is not None:
+            return move
+
+        return self.random_reveal()
+
+    def finish_move(self, changed_cells):
+        states = self.states
+        col = self.col
+
+        # 직전 수로 새로 드러난 셀만큼 드러나지 않은 칸이 줄어든다
+        self.hidden_count -= sum(1 for x, y in changed_cells if states[x * col + y] & BoardStorage.REVEALED)
+
+        # 드러나지 않은 칸이 모두 지뢰이면 아직 커버하지 않은 칸을 커버해 끝낸다
+        if self.hidden_count == self.game.game.total_mine_count and not self.to_cover:
+            self.to_cover = [index for index in range(self.size)
+                             if not states[index] & (BoardStorage.REVEALED | BoardStorage.COVERED)]
+
+        if self.to_cover:
+            return (Action.COVER,) + divmod(self.to_cover.pop(), col)
+
+        return None
+
+    def random_reveal(self):
+        states = self.states
+
+        while True:
+            index = self.rng.randrange(self.size)
+
+            if not states[index] & (BoardStorage.REVEALED | BoardStorage.COVERED):
+                return (Action.REVEAL,) + divmod(index, self.col)
+
+
+class SolverStrategy(RandomStrategy):
+    # Game.hint 로 확실한 칸부터 처리하고, 확실한 칸이 없을 때만 추론된 지뢰가 아닌 칸을 무작위로 연다
+
+    def start(self, game: 'GameController', rng: random.Random):
+        super().start(game, rng)
+        self.safe_cells: List[Tuple[int, int]] = []
+        self.mine_cells: List[Tuple[int, int]] = []
+
+    def next_move(self, changed_cells):
+        move = self.finish_move(changed_cells)
+
+        if move is not None:
+            return move
+
+        if not self.safe_cells and not self.mine_cells:
+            hint = self.game.hint()
+            self.safe_cells = hint.safe_cells
+            self.mine_cells = [(x, y) for x, y in hint.mine_cells
+                               if not self.states[x * self.col + y] & BoardStorage.COVERED]
+
+        while self.safe_cells:
+            x, y = self.safe_cells.pop()
+
+            if not self.states[x * self.col + y] & (BoardStorage.REVEALED | BoardStorage.COVERED):
+                return Action.REVEAL, x, y
+
+        if self.mine_cells:
+            return (Action.COVER,) + self.mine_cells.pop()
+
+        known_mines = self.game.game.solver.mines
+
+        while True:
+            move = self.random_reveal()
+
+            if move[1] * self.col + move[2] not in known_mines:
+                return move
+
+
+class ProbabilityStrategy(SolverStrategy):
+    # 확실한 칸이 없으면 무작위 대신 지뢰 확률이 가장 낮은 칸을 연다
+
+    def random_reveal(self):
+        cell = self.game.mine_probabilities().safest_cell(self.states)
+
+        if cell is None:
+            return super().random_reveal()
+
+        return (Action.REVEAL,) + cell
+
+
+STRATEGIES: Dict[str, Type[Strategy]] = {
+    "random": RandomStrategy,
+    "solver": SolverStrategy,
+    "probability": ProbabilityStrategy,
+}
+
+
+def load_strategy(name: str) -> Type[Strategy]:
+    # 등록된 이름 또는 "패키지.모듈:클래스" 형식의 경로
+    if name in STRATEGIES:
+        return STRATEGIES[name]
+
+    if ":" not in name:
+        raise ValueError(f"Unknown strategy ({name}). Use one of {sorted(STRATEGIES)} or 'module:Class'.")
+
+    module_name, class_name = name.split(":", 1)
+    return getattr(importlib.import_module(module_name), class_name)
+
+
+class SimulationConfig(NamedTuple):
+    row: int
+    col: int
+    total_mine_count: int
+    strategy: str
+    seed: int
+    max_moves: int
+    record_dir: Optional[str] = None  # 게임마다 기록 파일을 남길 디렉터리
+    topology: str = "square4"  # 워커 프로세스로 넘기므로 Topology 대신 이름을 둔다
+    deferred: bool = False  # 지뢰를 첫 드러내기 때 놓는다 (첫 클릭과 그 이웃은 안전)
+
+
+class ChunkResult(NamedTuple):
+    games: List[Tuple[int, str, int]]  # (게임 번호, 최종 상태, 둔 수)
+    moves: int
+    histogram: Dict[int, int]
+
+
+def game_seed(base_seed: int, game_index: int):
+    # 게임 번호만으로 시드가 정해지므로 워커 수나 분배 순서와 무관하게 재현된다
+    return (base_seed * 1_000_003 + game_index) & 0xFFFFFFFFFFFF
+
+
+def play_game(config: 'SimulationConfig', strategy_class: Type[Strategy], game_index: int,
+              histogram: 'LatencyHistogram'):
+    seed = game_seed(config.seed, game_index)
+    rng = random.Random(seed)
+
+    # 지뢰를 나중에 놓는 게임은 전략이 쓰는 난수와 섞이지 않도록 같은 시드의 별도 난수로 놓는다 (기록 재생과 같게)
+    game_rng = random.Random(seed) if config.deferred else rng
+    game = GameController.create_with_user_setting(config.row, config.col, config.total_mine_count, game_rng,
+                                                   get_topology(config.topology), deferred=config.deferred)
+    recorder = None
+
+    if config.record_dir:
+        recorder = GameRecorder.open(game.game, os.path.join(config.record_dir, f"game-{game_index}.mgr"), seed)
+
+    strategy = strategy_class()
+    strategy.start(game, rng)
+
+    changed_cells: List[Tuple[int, int]] = []
+    moves = 0
+
+    while not game.game.is_game_end and moves < config.max_moves:
+        started = time.perf_counter_ns()
+        move = strategy.next_move(changed_cells)
+
+        if move is None:
+            break
+
+        action, x, y = move
+
+        if action == Action.REVEAL:
+            game.reveal(x, y)
+
+        elif action == Action.COVER:
+            game.cover(x, y)
+
+        elif action == Action.CHORD:
+            game.chord(x, y)
+
+        elif action == Action.UNDO:
+            game.undo()
+
+        elif action == Action.REDO:
+            game.redo()
+
+        else:
+            raise ValueError(f"Unknown action ({action}) from {strategy_class.__name__}.")
+
+        changed_cells = game.pop_changed_cells()
+        histogram.record(time.perf_counter_ns() - started)
+        moves += 1
+
+    if recorder is not None:
+        recorder.close()
+
+    state = game.get_game_state() if game.game.is_game_end else GameState.PLAYING
+    return state, moves
+
+
+_worker_config: Optional['SimulationConfig'] = None
+_worker_strategy: Optional[Type[Strategy]] = None
+
+
+def init_worker(config: 'SimulationConfig'):
+    global _worker_config, _worker_strategy
+
+    _worker_config = config
+    _worker_strategy = load_strategy(config.strategy)
+
+
+def play_chunk(chunk: Tuple[int, int]):
+    first_index, count = chunk
+    histogram = LatencyHistogram()
+    games = []
+    total_moves = 0
+
+    for game_index in range(first_index, first_index + count):
+        state, moves = play_game(_worker_config, _worker_strategy, game_index, histogram)
+        games.append((game_index, state, moves))
+        total_moves += moves
+
+    return ChunkResult(games, total_moves, histogram.counts)
+
+
+def iter_chunks(games: int, chunk_size: int):
+    for first_index in range(0, games, chunk_size):
+        yield first_index, min(chunk_size, games - first_index)
+
+
+class SimulationReport:
+
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.losses = 0
+        self.moves = 0
+        self.histogram = LatencyHistogram()
+        self.elapsed = 0.0
+
+    def add(self, result: 'ChunkResult'):
+        self.games += len(result.games)
+        self.wins += sum(1 for _, state, _ in result.games if state == GameState.WIN)
+        self.losses += sum(1 for _, state, _ in result.games if state == GameState.LOSE)
+        self.moves += result.moves
+        self.histogram.merge(LatencyHistogram(result.histogram))
+
+    def to_dict(self):
+        return {
+            "games": self.games,
+            "wins": self.wins,
+            "losses": self.losses,
+            "unfinished": self.games - self.wins - self.losses,
+            "win_rate": self.wins / self.games if self.games else 0.0,
+            "elapsed_sec": self.elapsed,
+            "games_per_sec": self.games / self.elapsed if self.elapsed else 0.0,
+            "moves": self.moves,
+            "move_latency_us": {
+                f"p{percent:g}": self.histogram.percentile(percent) / 1000 for percent in (50, 90, 99, 99.9)
+            },
+        }
+
+
+def run_simulation(config: 'SimulationConfig', games: int, workers: int = 1, chunk_size: int = 100,
+                   on_chunk: Optional[Callable[['ChunkResult'], None]] = None):
+    report = SimulationReport()
+    started = time.perf_counter()
+
+    if workers <= 1:
+        init_worker(config)
+        results = map(play_chunk, iter_chunks(games, chunk_size))
+        report = _collect(results, report, on_chunk)
+
+    else:
+        with multiprocessing.Pool(workers, initializer=init_worker, initargs=(config,)) as pool:
+            results = pool.imap_unordered(play_chunk, iter_chunks(games, chunk_size))
+            report = _collect(results, report, on_chunk)
+
+    report.elapsed = time.perf_counter() - started
+    return report
+
+
+def _collect(results: Iterable['ChunkResult'], report: 'SimulationReport', on_chunk):
+
+    # 청크 단위로 집계하고 버리므로 게임 수와 무관하게 메모리가 일정하다
+    for result in results:
+        report.add(result)
+
+        if on_chunk is not None:
+            on_chunk(result)
+
+    return report
+
+
+def parse_board(args):
+
+    if args.difficulty:
+        difficulty = Difficulty[args.difficulty]
+        return difficulty.row_size, difficulty.col_size, difficulty.total_mine_count
+
+    if args.size is None or args.mines is None:
+        raise SystemExit("Either --difficulty or both --size and --mines are required.")
+
+    row, col = (int(value) for value in args.size.lower().split("x"))
+    return row, col, args.mines
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m minegame.simulate",
+                                     description="Play many headless games and report throughput and win rate.")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--difficulty", choices=[difficulty.name for difficulty in Difficulty])
+    parser.add_argument("--size", help="custom board size as ROWxCOL")
+    parser.add_argument("--mines", type=int, help="mine count for a custom board")
+    parser.add_argument("--strategy", default="random", help="registered name or module:Class")
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=100)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-moves", type=int, default=1_000_000)
+    parser.add_argument("--jsonl", help="stream one line per game to this file")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    parser.add_argument("--record", help="write a replayable recording of every game into this directory")
+    parser.add_argument("--topology", choices=list(TOPOLOGIES), default="square4", help="board neighbourhood")
+    parser.add_argument("--deferred", action="store_true", help="place mines on the first reveal, away from it")
+    args = parser.parse_args(argv)
+
+    if not args.difficulty and args.size is None:
+        args.difficulty = Difficulty.EASY.name
+
+    row, col, total_mine_count = parse_board(args)
+    config = SimulationConfig(row, col, total_mine_count, args.strategy, args.seed, args.max_moves, args.record,
+                              args.topology, args.deferred)
+
+    if args.record:
+        os.makedirs(args.record, exist_ok=True)
+
+    # 전략 이름이 잘못되었으면 워커를 띄우기 전에 실패
+    load_strategy(config.strategy)
+
+    output = open(args.jsonl, "w") if args.jsonl else None
+
+    def write_games(result: 'ChunkResult'):
+        for game_index, state, moves in result.games:
+            output.write(json.dumps({"game": game_index, "seed": game_seed(config.seed, game_index),
+                                     "state": state, "moves": moves}) + "\n")
+
+    try:
+        report = run_simulation(config, args.games, args.workers, args.chunk_size,
+                                write_games if output else None)
+    finally:
+        if output:
+            output.close()
+
+    summary = report.to_dict()
+
+    if args.json:
+        print(json.dumps(summary))
+        return
+
+    latency = summary["move_latency_us"]
+    print(f"{config.topology} board {row}x{col}, {total_mine_count} mines, strategy {config.strategy}, {args.workers} workers")
+    print(f"  games      {summary['games']} ({summary['wins']} won, {summary['losses']} lost, "
+          f"{summary['unfinished']} unfinished)")
+    print(f"  win rate   {summary['win_rate'] * 100:.2f}%")
+    print(f"  throughput {summary['games_per_sec']:.1f} games/sec over {summary['elapsed_sec']:.2f} s")
+    print(f"  move (us)  p50 {latency['p50']:.1f}  p90 {latency['p90']:.1f}  "
+          f"p99 {latency['p99']:.1f}  p99.9 {latency['p99.9']:.1f}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
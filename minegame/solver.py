@@ -0,0 +1,167 @@
+from itertools import compress
+from typing import *
+
+from minegame.minegame import BoardStorage, Map, _REVEALED_BIT_TABLE
+
+
+class Hint(NamedTuple):
+    safe_cells: List[Tuple[int, int]]  # 확실히 안전한, 아직 드러나지 않은 칸
+    mine_cells: List[Tuple[int, int]]  # 확실히 지뢰인 칸
+
+
+class ConstraintSolver:
+    # 드러난 숫자 칸 하나가 "주변의 모르는 칸 중 remaining 개가 지뢰" 라는 제약이 된다
+    # Map 의 변경 리스너로 바뀐 셀만 받아 두었다가, hint 를 부를 때 영향을 받은 제약만 다시 계산한다
+    # 추론은 단일 제약 규칙(남은 지뢰가 0 이거나 모르는 칸 수와 같음)과 두 제약의 부분집합 규칙을 쓴다
+
+    def __init__(self, current_map: 'Map'):
+        self.map = current_map
+        self.row = current_map.row
+        self.col = current_map.col
+        self.states = current_map.board.states
+        self.near_mine_counts = current_map.board.near_mine_counts
+
+        self.safe: Set[int] = set()  # 추론된 안전 칸 (드러나면 빠진다)
+        self.mines: Set[int] = set()  # 추론되었거나 게임 종료로 드러난 지뢰 칸
+
+        self.pending_changes: Set[int] = set()
+        self.dirty: Set[int] = set()
+
+        # 아직 모르는 이웃 칸이 남아 있는 제약 (확률 계산 등에서 사용)
+        self.frontier: Set[int] = set()
+
+        # 이미 드러나 있는 숫자 칸으로 처음 제약을 만든다
+        revealed = current_map.board.states[:].translate(_REVEALED_BIT_TABLE)
+        self.pending_changes.update(compress(range(len(revealed)), revealed))
+
+        current_map.add_change_listener(self.on_cells_changed)
+
+    def close(self):
+        self.map.remove_change_listener(self.on_cells_changed)
+
+    def on_cells_changed(self, changed_cells: Set[int]):
+        self.pending_changes |= changed_cells
+
+    def neighbours(self, index: int):
+        return self.map.neighbours(index)
+
+    def is_revealed(self, index: int):
+        return self.states[index] & BoardStorage.REVEALED
+
+    def is_constraint(self, index: int):
+        return self.states[index] & BoardStorage.REVEALED and index not in self.mines \
+            and self.near_mine_counts[index] > 0
+
+    def constraint(self, index: int):
+        # (모르는 이웃 칸 집합, 그 안의 지뢰 수)
+        unknown = set()
+        remaining = self.near_mine_counts[index]
+
+        for neighbour in self.neighbours(index):
+
+            if neighbour in self.mines:
+                remaining -= 1
+
+            elif not self.is_revealed(neighbour) and neighbour not in self.safe:
+                unknown.add(neighbour)
+
+        return unknown, remaining
+
+    def absorb_changes(self):
+        changes = self.pending_changes
+        self.pending_changes = set()
+
+        for index in changes:
+
+            # 커버만 바뀐 칸은 추론에 영향이 없다
+            if not self.is_revealed(index):
+                continue
+
+            self.safe.discard(index)
+
+            if self.map.board.mines[index]:
+                self.mines.add(index)
+                self.frontier.discard(index)
+                continue
+
+            if self.near_mine_counts[index] > 0:
+                self.dirty.add(index)
+
+            for neighbour in self.neighbours(index):
+
+                if self.is_constraint(neighbour):
+                    self.dirty.add(neighbour)
+
+    def deduce(self, cells: Iterable[int], is_mine: bool):
+        target = self.mines if is_mine else self.safe
+
+        for cell in cells:
+
+            if cell in target:
+                continue
+
+            target.add(cell)
+
+            # 이 칸을 이웃으로 둔 제약을 다시 계산한다
+            for neighbour in self.neighbours(cell):
+
+                if self.is_constraint(neighbour):
+                    self.dirty.add(neighbour)
+
+    def propagate(self):
+        self.absorb_changes()
+
+        while self.dirty:
+            index = self.dirty.pop()
+            unknown, remaining = self.constraint(index)
+
+            if not unknown:
+                self.frontier.discard(index)
+                continue
+
+            self.frontier.add(index)
+
+            if remaining == 0:
+                self.deduce(unknown, is_mine=False)
+                continue
+
+            if remaining == len(unknown):
+                self.deduce(unknown, is_mine=True)
+                continue
+
+            self.apply_subset_rule(index, unknown, remaining)
+
+    def apply_subset_rule(self, index: int, unknown: Set[int], remaining: int):
+        # 모르는 칸을 공유하는 다른 제약과 비교해 한쪽이 다른 쪽의 부분집합이면 차집합을 추론한다
+        related = {neighbour for cell in unknown for neighbour in self.neighbours(cell)
+                   if neighbour != index and self.is_constraint(neighbour)}
+
+        for other in related:
+            other_unknown, other_remaining = self.constraint(other)
+
+            if not other_unknown:
+                continue
+
+            if unknown <= other_unknown:
+                self.deduce_difference(other_unknown - unknown, other_remaining - remaining)
+
+            elif other_unknown <= unknown:
+                self.deduce_difference(unknown - other_unknown, remaining - other_remaining)
+
+    def deduce_difference(self, cells: Set[int], mine_count: int):
+
+        if not cells:
+            return
+
+        if mine_count == 0:
+            self.deduce(cells, is_mine=False)
+
+        elif mine_count == len(cells):
+            self.deduce(cells, is_mine=True)
+
+    def hint(self):
+        self.propagate()
+
+        safe_cells = [divmod(index, self.col) for index in self.safe]
+        mine_cells = [divmod(index, self.col) for index in self.mines if not self.is_revealed(index)]
+        return Hint(safe_cells, mine_cells)
@@ -0,0 +1,316 @@
+import argparse
+import curses
+import random
+import sys
+
+from typing import *
+
+from minegame.minegame import CellCode, Difficulty, GameController, GameState, Map, SizeLimit
+from minegame.topology import TOPOLOGIES, get_topology
+
+
+# Qt 를 불러오지 않는 터미널 화면, 엔진(minegame.minegame)만으로 시작하므로 수십 ms 안에 뜬다
+# 동작 뒤에는 엔진이 돌려주는 바뀐 칸만 다시 그린다
+
+HIDDEN_GLYPH = "#"
+FLAG_GLYPH = "F"
+MINE_GLYPH = "*"
+ZERO_GLYPH = "."
+
+# 칸 하나가 차지하는 화면 열 수, 육각형 보드는 홀수 행을 한 열 밀어 그린다
+CELL_WIDTH = 2
+
+# 상태 줄과 보드 사이의 줄 수
+BOARD_TOP = 2
+
+HELP = "arrows/hjkl move  space reveal  f flag  c chord  u undo  r redo  n new  q quit"
+
+KEY_MOVES = {
+    curses.KEY_UP: (-1, 0), ord("k"): (-1, 0),
+    curses.KEY_DOWN: (1, 0), ord("j"): (1, 0),
+    curses.KEY_LEFT: (0, -1), ord("h"): (0, -1),
+    curses.KEY_RIGHT: (0, 1), ord("l"): (0, 1),
+}
+
+
+class GameSettings(NamedTuple):
+    row: int
+    col: int
+    total_mine_count: int
+    topology: str
+    no_guess: bool
+    seed: Optional[int]
+
+
+class TerminalGame:
+    MAX_BOARD_SIZE = 1000
+    SIZE_LIMIT = SizeLimit(MAX_BOARD_SIZE, MAX_BOARD_SIZE)
+
+    def __init__(self, screen, settings: 'GameSettings'):
+        self.screen = screen
+        self.settings = settings
+        self.rng = random.Random(settings.seed)
+        self.colors = self.init_colors()
+
+        self.controller: Optional['GameController'] = None
+        self.cursor = (0, 0)
+        self.top = 0  # 화면에 보이는 첫 행과 첫 열
+        self.left = 0
+
+        self.new_game()
+
+    @staticmethod
+    def init_colors():
+        # 숫자별 색 (1~8), 색을 쓸 수 없는 터미널이면 빈 표
+
+        if not curses.has_colors():
+            return {}
+
+        curses.start_color()
+        curses.use_default_colors()
+        palette = [curses.COLOR_BLUE, curses.COLOR_GREEN, curses.COLOR_RED, curses.COLOR_MAGENTA,
+                   curses.COLOR_YELLOW, curses.COLOR_CYAN, curses.COLOR_WHITE, curses.COLOR_WHITE]
+
+        for number, color in enumerate(palette, start=1):
+            curses.init_pair(number, color, -1)
+
+        return {number: curses.color_pair(number) for number in range(1, 9)}
+
+    def new_game(self):
+        settings = self.settings
+        self.controller = GameController.create_with_user_setting(
+            settings.row, settings.col, settings.total_mine_count, self.rng, get_topology(settings.topology),
+            settings.no_guess, deferred=True, size_limit=self.SIZE_LIMIT)
+
+        # 처음 그릴 때 보드 전체를 그리므로 생성 중 쌓인 변경은 버린다
+        self.controller.pop_changed_cells()
+        self.cursor = (settings.row // 2, settings.col // 2)
+        self.top = self.left = 0
+        self.scroll_to_cursor()
+        self.draw_all()
+
+    def viewport(self):
+        height, width = self.screen.getmaxyx()
+        return max(1, height - BOARD_TOP - 1), max(1, (width - 2) // CELL_WIDTH)
+
+    def scroll_to_cursor(self):
+        # 커서가 화면 밖으로 나가면 화면을 옮기고 True 를 돌려준다
+        rows, cols = self.viewport()
+        x, y = self.cursor
+        top = min(max(self.top, x - rows + 1), x)
+        left = min(max(self.left, y - cols + 1), y)
+
+        if (top, left) == (self.top, self.left):
+            return False
+
+        self.top, self.left = top, left
+        return True
+
+    def cell_glyph(self, x: int, y: int):
+        code = self.controller.game.map.cell_code(x, y)
+
+        if code == CellCode.FLAGGED:
+            return FLAG_GLYPH, curses.A_BOLD
+
+        if code == CellCode.HIDDEN:
+            return HIDDEN_GLYPH, curses.A_DIM
+
+        if code == CellCode.MINE:
+            return MINE_GLYPH, curses.A_BOLD
+
+        if code == 0:
+            return ZERO_GLYPH, curses.A_NORMAL
+
+        return str(code), self.colors.get(code, curses.A_NORMAL)
+
+    def draw_cell(self, x: int, y: int):
+        rows, cols = self.viewport()
+
+        if not (self.top <= x < self.top + rows and self.left <= y < self.left + cols):
+            return
+
+        glyph, attribute = self.cell_glyph(x, y)
+
+        if (x, y) == self.cursor:
+            attribute |= curses.A_REVERSE
+
+        shift = x & 1 if self.controller.get_topology().staggered else 0
+
+        try:
+            self.screen.addstr(BOARD_TOP + x - self.top, (y - self.left) * CELL_WIDTH + shift, glyph, attribute)
+
+        except curses.error:
+            # 화면 오른쪽 아래 끝 칸에 쓰면 커서가 밖으로 나가며 오류가 나지만 글자는 쓰인다
+            pass
+
+    def draw_all(self):
+        self.screen.erase()
+        rows, cols = self.viewport()
+
+        for x in range(self.top, min(self.settings.row, self.top + rows)):
+            for y in range(self.left, min(self.settings.col, self.left + cols)):
+                self.draw_cell(x, y)
+
+        self.draw_status()
+
+    def draw_status(self):
+        game = self.controller.game
+        settings = self.settings
+        state = self.controller.get_game_state()
+        message = {GameState.WIN: "You won!  n: new game", GameState.LOSE: "Boom!  n: new game"}.get(state, HELP)
+
+        status = (f"{settings.row}x{settings.col} {settings.topology}  mines {settings.total_mine_count}  "
+                  f"flags {game.covered_block_count}  {state}")
+
+        _, width = self.screen.getmaxyx()
+        self.screen.addnstr(0, 0, status.ljust(width - 1), width - 1, curses.A_BOLD)
+        self.screen.addnstr(1, 0, message.ljust(width - 1), width - 1)
+
+    def move_cursor(self, dx: int, dy: int):
+        previous = self.cursor
+        x, y = previous
+        self.cursor = (min(max(x + dx, 0), self.settings.row - 1), min(max(y + dy, 0), self.settings.col - 1))
+
+        if self.scroll_to_cursor():
+            self.draw_all()
+
+        else:
+            self.draw_cell(*previous)
+            self.draw_cell(*self.cursor)
+
+    def play(self, action: Callable[[int, int], Any]):
+
+        if self.controller.game.is_game_end:
+            return
+
+        try:
+            action(*self.cursor)
+
+        except Exception as ex:
+            # 커버 수 제한 등 엔진이 거절한 동작은 상태 줄에만 알린다
+            self.show_message(str(ex))
+            return
+
+        self.draw_changes()
+
+    def draw_changes(self):
+        for x, y in self.controller.pop_changed_cells():
+            self.draw_cell(x, y)
+
+        self.draw_cell(*self.cursor)
+        self.draw_status()
+
+    def show_message(self, message: str):
+        _, width = self.screen.getmaxyx()
+        self.screen.addnstr(1, 0, message.ljust(width - 1), width - 1, curses.A_BOLD)
+
+    def click(self):
+        # 왼쪽 클릭은 드러내기, 오른쪽 클릭은 커버
+        try:
+            _, mouse_x, mouse_y, _, button = curses.getmouse()
+
+        except curses.error:
+            return
+
+        x = mouse_y - BOARD_TOP + self.top
+        shift = x & 1 if self.controller.get_topology().staggered else 0
+        y = (mouse_x - shift) // CELL_WIDTH + self.left
+
+        if not (0 <= x < self.settings.row and 0 <= y < self.settings.col):
+            return
+
+        previous = self.cursor
+        self.cursor = (x, y)
+        self.draw_cell(*previous)
+
+        if button & curses.BUTTON1_CLICKED:
+            self.play(self.controller.reveal)
+
+        elif button & curses.BUTTON3_CLICKED:
+            self.play(self.controller.cover)
+
+        else:
+            self.draw_cell(x, y)
+
+    def run(self):
+        curses.curs_set(0)
+        curses.mousemask(curses.BUTTON1_CLICKED | curses.BUTTON3_CLICKED)
+        self.screen.keypad(True)
+
+        actions = {
+            ord(" "): lambda: self.play(self.controller.reveal),
+            ord("\n"): lambda: self.play(self.controller.reveal),
+            ord("f"): lambda: self.play(self.controller.cover),
+            ord("c"): lambda: self.play(self.controller.chord),
+            ord("u"): self.undo,
+            ord("r"): self.redo,
+            ord("n"): self.new_game,
+            curses.KEY_MOUSE: self.click,
+            curses.KEY_RESIZE: self.resize,
+        }
+
+        while True:
+            self.screen.refresh()
+            key = self.screen.getch()
+
+            if key in (ord("q"), 27):
+                return
+
+            if key in KEY_MOVES:
+                self.move_cursor(*KEY_MOVES[key])
+
+            elif key in actions:
+                actions[key]()
+
+    def undo(self):
+        if self.controller.undo():
+            self.draw_changes()
+
+    def redo(self):
+        if self.controller.redo():
+            self.draw_changes()
+
+    def resize(self):
+        self.scroll_to_cursor()
+        self.draw_all()
+
+
+def parse_settings(args):
+
+    if args.board:
+        size, mines = args.board.lower().split(":")
+        row, col = (int(value) for value in size.split("x"))
+        total_mine_count = int(mines)
+
+    else:
+        difficulty = Difficulty[args.difficulty]
+        row, col, total_mine_count = difficulty.row_size, difficulty.col_size, difficulty.total_mine_count
+
+    return GameSettings(row, col, total_mine_count, args.topology, args.no_guess, args.seed)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python main.py --terminal",
+                                     description="Play minesweeper in the terminal without Qt.")
+    parser.add_argument("--difficulty", choices=[difficulty.name for difficulty in Difficulty], default="EASY")
+    parser.add_argument("--board", help="custom board as ROWxCOL:MINES (overrides --difficulty)")
+    parser.add_argument("--topology", choices=list(TOPOLOGIES), default="square4")
+    parser.add_argument("--no-guess", action="store_true", help="start on a board that needs no guessing")
+    parser.add_argument("--seed", type=int)
+    args = parser.parse_args(argv)
+
+    settings = parse_settings(args)
+
+    # 잘못된 설정은 화면을 바꾸기 전에 알린다
+    try:
+        Map.validate(settings.row, settings.col, settings.total_mine_count, get_topology(settings.topology),
+                     TerminalGame.SIZE_LIMIT)
+
+    except ValueError as ex:
+        parser.error(str(ex))
+
+    curses.wrapper(lambda screen: TerminalGame(screen, settings).run())
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,275 @@
+from array import array
+from functools import lru_cache
+from itertools import accumulate, compress
+from typing import *
+
+
+class Direction(NamedTuple):
+    dx: int
+    dy_even: int  # 짝수 행에서의 열 변화량
+    dy_odd: int  # 홀수 행에서의 열 변화량 (육각형 보드는 홀수 행이 반 칸 오른쪽으로 밀려 있다)
+
+
+class NeighbourTable:
+    # 칸마다 이웃 칸 인덱스를 한 배열에 이어 붙인 표, 칸 i 의 이웃은 cells[starts[i]:starts[i + 1]]
+    # 보드 밖 이웃은 표를 만들 때 이미 빠지므로 표를 쓰는 쪽에서는 경계 검사를 하지 않는다
+    __slots__ = ("starts", "cells")
+
+    def __init__(self, starts: 'array', cells: 'array'):
+        self.starts = starts
+        self.cells = cells
+
+    def __getitem__(self, index: int):
+        return self.cells[self.starts[index]:self.starts[index + 1]]
+
+    def nbytes(self):
+        return self.starts.itemsize * len(self.starts) + self.cells.itemsize * len(self.cells)
+
+
+class Topology:
+    # 보드의 이웃 관계, 방향 목록 하나로 칸 단위 이웃 표와 평면 단위 이웃 합(생성, 연쇄 드러내기)을 모두 만든다
+
+    def __init__(self, name: str, code: int, directions: Sequence['Direction'], wrap: bool = False):
+        self.name = name
+        self.code = code  # 기록/보드 파일에 쓰는 번호
+        self.directions = tuple(directions)
+        self.wrap = wrap  # 보드의 위아래, 좌우 끝이 이어지는지
+        self.staggered = any(direction.dy_even != direction.dy_odd for direction in self.directions)
+
+        # 행 단위 구간 [left, right) 와 이어지는 위아래 행의 구간 변화량 (dx, 왼쪽 변화량, 오른쪽 변화량), 짝수/홀수 행별
+        self.span_links = tuple(self.build_span_links(parity) for parity in (0, 1))
+
+    def __repr__(self):
+        return f"Topology({self.name})"
+
+    def direction_offsets(self, parity: int):
+        return [(direction.dx, direction.dy_odd if parity else direction.dy_even) for direction in self.directions]
+
+    def build_span_links(self, parity: int):
+        links = []
+
+        for dx in (-1, 1):
+            offsets = [dy for offset_x, dy in self.direction_offsets(parity) if offset_x == dx]
+
+            if offsets:
+                links.append((dx, min(offsets), max(offsets)))
+
+        return tuple(links)
+
+    def validate(self, row: int, col: int):
+
+        # 육각형 배치는 행 번호의 홀짝으로 이웃이 정해지므로 위아래를 이으면 홀수 행 수에서 어긋난다
+        if self.wrap and self.staggered and row % 2:
+            raise ValueError(f"{self.name} boards need an even number of rows.")
+
+    def neighbour_cells(self, x: int, y: int, row: int, col: int):
+        cells = []
+
+        for dx, dy in self.direction_offsets(x & 1):
+            nx, ny = x + dx, y + dy
+
+            if self.wrap:
+                cells.append((nx % row, ny % col))
+
+            elif 0 <= nx < row and 0 <= ny < col:
+                cells.append((nx, ny))
+
+        return cells
+
+    def neighbour_indices(self, index: int, row: int, col: int):
+        # 칸 하나의 이웃을 평면 인덱스로 바로 계산한다, 표를 만들지 않는 큰 보드용
+        x, y = divmod(index, col)
+        return [nx * col + ny for nx, ny in self.neighbour_cells(x, y, row, col)]
+
+    def neighbour_table(self, row: int, col: int):
+        # 칸당 이웃 수만큼의 8바이트 인덱스를 쓰므로 크기가 제한된 보드에서만 만든다 (Map.NEIGHBOUR_TABLE_MAX_CELLS)
+        # 표는 (이웃 관계, 크기) 별로 최근 NEIGHBOUR_TABLE_CACHE_SIZE 개까지 보관해 같은 크기의 보드들이 나눠 쓴다
+        return _neighbour_table(self, row, col)
+
+    def neighbour_sum(self, cells: bytes, row: int, col: int, first_row: int = 0):
+        # 셀 하나를 1바이트로 하는 큰 정수 위에서 방향마다 이웃 칸 값을 옮겨 온 평면을 한 번에 더한다
+        # 칸 값이 0 또는 1 이면 칸당 최대 이웃 수(8) 이므로 바이트 사이의 올림은 생기지 않는다
+        # first_row 는 cells 가 보드의 어느 행부터 잘라 온 것인지로, 육각형 배치의 홀짝을 맞추는 데 쓴다
+        # 위로 옮긴 평면은 보드 뒤로 최대 col + 1 바이트 넘칠 수 있으므로 호출한 쪽에서 잘라 쓴다
+        size = row * col
+        masks = _column_masks(row, col)
+        bitmap = int.from_bytes(cells, "little")
+
+        # 열 방향 이동은 dy 별로 한 번만 만든다
+        shifted_columns = {}
+
+        for direction in self.directions:
+            for dy in (direction.dy_even, direction.dy_odd):
+                if dy not in shifted_columns:
+                    shifted_columns[dy] = self.shift_columns(bitmap, dy, col, masks)
+
+        total = 0
+
+        for direction in self.directions:
+            plane = self.shift_rows(shifted_columns[direction.dy_even], direction.dx, size, col)
+
+            if direction.dy_even != direction.dy_odd:
+                even_rows, odd_rows = _row_parity_masks(row, col, first_row & 1)
+                odd_plane = self.shift_rows(shifted_columns[direction.dy_odd], direction.dx, size, col)
+                plane = (plane & even_rows) | (odd_plane & odd_rows)
+
+            total += plane
+
+        return total
+
+    def shift_columns(self, bitmap: int, dy: int, col: int, masks: 'ColumnMasks'):
+        # 칸 (x, y) 에 (x, y + dy) 의 값을 옮긴다, 행 끝을 넘는 칸은 비우거나(wrap 이면) 같은 행의 반대쪽에서 가져온다
+        if dy == 0:
+            return bitmap
+
+        if dy == 1:
+            shifted = (bitmap & masks.without_first) >> 8
+
+            if self.wrap:
+                shifted |= (bitmap & masks.only_first) << (8 * (col - 1))
+
+            return shifted
+
+        shifted = (bitmap & masks.without_last) << 8
+
+        if self.wrap:
+            shifted |= (bitmap & masks.only_last) >> (8 * (col - 1))
+
+        return shifted
+
+    def shift_rows(self, bitmap: int, dx: int, size: int, col: int):
+        # 칸 (x, y) 에 (x + dx, y) 의 값을 옮긴다
+        if dx == 0:
+            return bitmap
+
+        bits = 8 * size
+        shift = 8 * col
+
+        if self.wrap:
+            shift = shift if dx == 1 else bits - shift
+            return ((bitmap >> shift) | (bitmap << (bits - shift))) & ((1 << bits) - 1)
+
+        return bitmap >> shift if dx == 1 else bitmap << shift
+
+
+class ColumnMasks(NamedTuple):
+    without_first: int  # 첫 열만 0 인 마스크
+    without_last: int
+    only_first: int  # 첫 열만 0xFF 인 마스크
+    only_last: int
+
+
+def _column_masks(row: int, col: int):
+    only_first = bytearray(row * col)
+    only_first[0::col] = b"\xff" * row
+
+    only_last = bytearray(row * col)
+    only_last[col - 1::col] = b"\xff" * row
+
+    full = (1 << (8 * row * col)) - 1
+    only_first = int.from_bytes(only_first, "little")
+    only_last = int.from_bytes(only_last, "little")
+
+    return ColumnMasks(full ^ only_first, full ^ only_last, only_first, only_last)
+
+
+def _row_parity_masks(row: int, col: int, first_parity: int):
+    # (짝수 행 마스크, 홀수 행 마스크), 행의 홀짝은 보드 전체에서의 행 번호 기준
+    even_rows = bytearray(row * col)
+
+    for x in range(first_parity, row, 2):
+        even_rows[x * col:(x + 1) * col] = b"\xff" * col
+
+    even_rows = int.from_bytes(even_rows, "little")
+    return even_rows, ((1 << (8 * row * col)) - 1) ^ even_rows
+
+
+def _shift_plane(plane, fill, dx: int, dy: int, row: int, col: int, wrap: bool):
+    # 칸 (x, y) 에 (x + dx, y + dy) 의 값을 옮긴 평면, 보드 밖은 fill
+    # 칸 인덱스 배열(array)과 유효 표시(bytearray) 모두 자르고 이어 붙이는 연산만으로 옮긴다
+    size = row * col
+
+    if dx:
+        shift = dx * col
+
+        if wrap:
+            plane = plane[shift:] + plane[:shift]
+
+        else:
+            plane = plane[shift:] + fill * shift if dx > 0 else fill * -shift + plane[:shift]
+
+    if dy:
+        shifted = plane[dy:] + plane[:dy]
+
+        # 행 끝을 넘어간 칸은 같은 행의 반대쪽(wrap) 이거나 보드 밖
+        if dy > 0:
+            shifted[col - 1::col] = plane[0::col] if wrap else fill * row
+
+        else:
+            shifted[0::col] = plane[col - 1::col] if wrap else fill * row
+
+        plane = shifted
+
+    return plane[:size]
+
+
+# 보관하는 이웃 표 수, 표 하나는 Map.NEIGHBOUR_TABLE_MAX_CELLS 크기에서 약 4.5MB 이다
+NEIGHBOUR_TABLE_CACHE_SIZE = 8
+
+
+@lru_cache(maxsize=NEIGHBOUR_TABLE_CACHE_SIZE)
+def _neighbour_table(topology: 'Topology', row: int, col: int):
+    # 방향마다 모든 칸의 이웃 인덱스 평면(보드 밖은 -1)과 유효 표시를 통째로 옮겨 만든 뒤 칸별로 엮고 -1 을 뺀다
+    size = row * col
+    width = len(topology.directions)
+    indices = array("q", range(size))
+    ones = bytearray(b"\x01") * size
+    missing = array("q", [-1])
+
+    interleaved = missing * (size * width)
+    valid = bytearray(size * width)
+    counts = 0
+
+    for k, direction in enumerate(topology.directions):
+        neighbours = _shift_plane(indices, missing, direction.dx, direction.dy_even, row, col, topology.wrap)
+        flags = _shift_plane(ones, bytearray(1), direction.dx, direction.dy_even, row, col, topology.wrap)
+
+        # 육각형 배치는 홀수 행만 다른 방향에서 가져온다
+        if direction.dy_odd != direction.dy_even:
+            odd_neighbours = _shift_plane(indices, missing, direction.dx, direction.dy_odd, row, col, topology.wrap)
+            odd_flags = _shift_plane(ones, bytearray(1), direction.dx, direction.dy_odd, row, col, topology.wrap)
+
+            for x in range(1, row, 2):
+                neighbours[x * col:(x + 1) * col] = odd_neighbours[x * col:(x + 1) * col]
+                flags[x * col:(x + 1) * col] = odd_flags[x * col:(x + 1) * col]
+
+        interleaved[k::width] = neighbours
+        valid[k::width] = flags
+        counts += int.from_bytes(flags, "little")
+
+    starts = array("q", accumulate(counts.to_bytes(size, "little"), initial=0))
+    return NeighbourTable(starts, array("q", compress(interleaved, valid)))
+
+
+_SQUARE_DIRECTIONS = (Direction(1, 0, 0), Direction(-1, 0, 0), Direction(0, 1, 1), Direction(0, -1, -1))
+_DIAGONAL_DIRECTIONS = (Direction(1, 1, 1), Direction(1, -1, -1), Direction(-1, 1, 1), Direction(-1, -1, -1))
+
+# 홀수 행이 반 칸 오른쪽으로 밀린 육각형 배치, 짝수 행은 왼쪽 위/아래, 홀수 행은 오른쪽 위/아래로 이어진다
+_HEX_DIRECTIONS = (Direction(0, 1, 1), Direction(0, -1, -1),
+                   Direction(1, -1, 0), Direction(1, 0, 1), Direction(-1, -1, 0), Direction(-1, 0, 1))
+
+SQUARE4 = Topology("square4", 0, _SQUARE_DIRECTIONS)
+SQUARE8 = Topology("square8", 1, _SQUARE_DIRECTIONS + _DIAGONAL_DIRECTIONS)
+TORUS = Topology("torus", 2, _SQUARE_DIRECTIONS + _DIAGONAL_DIRECTIONS, wrap=True)
+HEX = Topology("hex", 3, _HEX_DIRECTIONS)
+
+TOPOLOGIES = {topology.name: topology for topology in (SQUARE4, SQUARE8, TORUS, HEX)}
+TOPOLOGY_CODES = {topology.code: topology for topology in TOPOLOGIES.values()}
+
+
+def get_topology(name: str):
+
+    if name not in TOPOLOGIES:
+        raise ValueError(f"Unknown topology {name!r}, expected one of {', '.join(TOPOLOGIES)}.")
+
+    return TOPOLOGIES[name]
@@ -0,0 +1,115 @@
+import math
+import random
+
+from itertools import product
+
+import pytest
+
+from minegame.minegame import Game
+from minegame.probability import ComponentResult, MineProbabilityEngine
+from minegame.topology import SQUARE4, SQUARE8
+
+# 브루트포스로 나열할 프런티어 칸 수의 상한
+MAX_FRONTIER = 14
+
+
+def frontier_cells(game: 'Game'):
+    current_map = game.map
+    row, col, topology = current_map.row, current_map.col, current_map.topology
+
+    return sorted({cell for x in range(row) for y in range(col) if current_map.is_revealed(x, y)
+                   for cell in topology.neighbour_cells(x, y, row, col) if not current_map.is_revealed(*cell)})
+
+
+def brute_force_probabilities(game: 'Game'):
+    # 숫자 칸에 닿은 모르는 칸의 배치를 모두 나열하고, 나머지 지뢰는 밖 칸에 C(밖 칸 수, 남은 지뢰) 가지로 놓는다
+    current_map = game.map
+    row, col, topology = current_map.row, current_map.col, current_map.topology
+
+    frontier = frontier_cells(game)
+    position = {cell: i for i, cell in enumerate(frontier)}
+    hidden_count = sum(1 for x in range(row) for y in range(col) if not current_map.is_revealed(x, y))
+    outside = hidden_count - len(frontier)
+
+    constraints = [([position[cell] for cell in topology.neighbour_cells(x, y, row, col) if cell in position],
+                    current_map.near_mine_count(x, y))
+                   for x in range(row) for y in range(col) if current_map.is_revealed(x, y)]
+
+    total = 0
+    outside_mines = 0
+    cell_mines = [0] * len(frontier)
+
+    for assignment in product((0, 1), repeat=len(frontier)):
+
+        if any(sum(assignment[i] for i in cells) != count for cells, count in constraints):
+            continue
+
+        rest = game.total_mine_count - sum(assignment)
+
+        if not 0 <= rest <= outside:
+            continue
+
+        weight = math.comb(outside, rest)
+        total += weight
+        outside_mines += weight * rest
+
+        for i, value in enumerate(assignment):
+            cell_mines[i] += weight * value
+
+    probabilities = {cell: cell_mines[i] / total for cell, i in position.items()}
+    return probabilities, outside_mines / total / outside if outside else None
+
+
+def small_boards(topology, seeds):
+    # 안전 칸을 무작위로 드러내면서 프런티어가 나열할 수 있을 만큼 작은 보드 상태를 하나씩 돌려준다
+    for seed in seeds:
+        rng = random.Random(seed)
+        game = Game.create(6, 6, 7, random.Random(seed), topology)
+
+        for _ in range(12):
+            x, y = rng.randrange(6), rng.randrange(6)
+
+            if game.map.is_mine(x, y) or game.map.is_revealed(x, y):
+                continue
+
+            game.reveal(x, y)
+
+            if game.is_game_end or len(frontier_cells(game)) > MAX_FRONTIER:
+                break
+
+            yield game
+
+
+@pytest.mark.parametrize("topology", [SQUARE4, SQUARE8], ids=lambda topology: topology.name)
+def test_probabilities_match_brute_force(topology):
+    checked = 0
+
+    for game in small_boards(topology, range(60)):
+        expected, expected_outside = brute_force_probabilities(game)
+        result = game.mine_probabilities(time_budget=60.0)
+
+        assert not result.approximate
+
+        for (x, y), probability in expected.items():
+            assert result.probability(x, y) == pytest.approx(probability, abs=1e-9)
+
+        if expected_outside is not None:
+            assert result.outside_probability == pytest.approx(expected_outside, abs=1e-9)
+
+        checked += 1
+
+    assert checked >= 100
+
+
+def test_combine_falls_back_when_the_deadline_has_passed():
+    # 두 칸 중 하나가 지뢰인 성분 두 개
+    components = [ComponentResult([0, 1], {1: 2}, [{1: 1}, {1: 1}]),
+                  ComponentResult([2, 3], {1: 2}, [{1: 1}, {1: 1}])]
+
+    probabilities, _, exact = MineProbabilityEngine.combine(components, 10, 4, deadline=math.inf)
+    assert exact
+    assert probabilities == pytest.approx({0: 0.5, 1: 0.5, 2: 0.5, 3: 0.5})
+
+    probabilities, _, exact = MineProbabilityEngine.combine(components, 10, 4, deadline=-math.inf)
+    assert not exact
+    assert probabilities == pytest.approx({0: 0.5, 1: 0.5, 2: 0.5, 3: 0.5})
@@ -0,0 +1,153 @@
+import io
+import random
+
+from typing import *
+
+import pytest
+
+from minegame.minegame import Action, Game
+from minegame.recording import GameRecorder, GameReplayer, Recording, VERSION, pack_bitmap, unpack_bitmap
+from minegame.topology import HEX, SQUARE8
+
+
+def record(game: 'Game', seed: Optional[int], moves):
+    stream = io.BytesIO()
+    recorder = GameRecorder(game, stream, seed)
+
+    for move, *cell in moves:
+        try:
+            getattr(game, move)(*cell)
+
+        # 커버 수 상한에 걸린 커버는 기록하기 전에 실패하므로 다시 둘 동작에 들어가지 않는다
+        except Exception:
+            pass
+
+    recorder.flush()
+    game.recorder = None
+    return Recording.from_bytes(stream.getvalue())
+
+
+def game_summary(game: 'Game'):
+    return bytes(game.map.board.states), game.find_mine_count, game.covered_block_count, game.game_state
+
+
+def random_moves(rng: 'random.Random', row: int, col: int, count: int):
+    moves = [(rng.choice(["reveal", "reveal", "cover", "chord", "undo", "redo"]), rng.randrange(row),
+              rng.randrange(col)) for _ in range(count)]
+    return [(move,) if move in ("undo", "redo") else (move, x, y) for move, x, y in moves]
+
+
+@pytest.mark.parametrize("size", [0, 1, 7, 8, 9, 100])
+def test_bitmap_round_trip(size):
+    rng = random.Random(size)
+    cells = bytearray(rng.randrange(2) for _ in range(size))
+    packed = pack_bitmap(cells)
+
+    assert len(packed) == (size + 7) // 8
+    assert unpack_bitmap(packed, size) == cells
+
+
+@pytest.mark.parametrize("seeded", [True, False], ids=["seed", "bitmap"])
+@pytest.mark.parametrize("topology", [SQUARE8, HEX], ids=lambda topology: topology.name)
+def test_replay_matches_the_recorded_game(seeded, topology):
+    game = Game.create(10, 12, 18, random.Random(4), topology)
+    recording = record(game, 4 if seeded else None, random_moves(random.Random(9), 10, 12, 80))
+
+    assert (recording.seed is not None) == seeded
+    assert recording.topology is topology
+    assert game_summary(GameReplayer(recording).play()) == game_summary(game)
+
+
+def test_recording_keeps_every_action_kind():
+    game = Game.create(8, 8, 6, random.Random(2))
+    current_map = game.map
+
+    # 주변 지뢰를 모두 커버하면 코드로 나머지 이웃을 드러낼 수 있는 숫자 칸
+    x, y = next((x, y) for x in range(8) for y in range(8)
+                if not current_map.is_mine(x, y) and current_map.near_mine_count(x, y) > 0)
+    mines = [cell for cell in current_map.neighbour_cells(x, y) if current_map.is_mine(*cell)]
+    moves = [("reveal", x, y)] + [("cover", *cell) for cell in mines] + [("chord", x, y), ("undo",), ("redo",)]
+    recording = record(game, 2, moves)
+
+    assert [recording.action(position) for position in range(len(recording.actions))] == \
+           [(Action.REVEAL, x, y)] + [(Action.COVER, *cell) for cell in mines] + \
+           [(Action.CHORD, x, y), (Action.UNDO, 0, 0), (Action.REDO, 0, 0)]
+    assert Recording.from_bytes(recording.to_bytes()).to_bytes() == recording.to_bytes()
+
+
+def test_deferred_game_needs_a_seed():
+    game = Game.create(8, 8, 5, random.Random(2), deferred=True)
+
+    with pytest.raises(ValueError):
+        GameRecorder(game, io.BytesIO())
+
+
+def test_rejects_other_files_and_versions():
+    data = Recording(4, 4, 2, seed=1).to_bytes()
+
+    with pytest.raises(ValueError, match="Not a game recording"):
+        Recording.from_bytes(b"XXXX" + data[4:])
+
+    with pytest.raises(ValueError, match="Unsupported recording version"):
+        Recording.from_bytes(data[:4] + bytes([VERSION - 1]) + data[5:])
+
+
+def test_seek_to_start_replays_deferred_mine_placement():
+    # 지뢰를 놓기 전 스냅샷으로 돌아간 뒤 다시 둔 첫 드러내기도 되돌리기 기록을 비워야 한다
+    game = Game.create(16, 16, 40, random.Random(3), deferred=True)
+    recording = record(game, 3, [("cover", 7, 7), ("reveal", 0, 0), ("undo",), ("undo",)])
+
+    replayer = GameReplayer(recording)
+    expected = game_summary(replayer.play())
+    assert expected == game_summary(game)
+
+    replayer.seek(0)
+    assert game_summary(replayer.play()) == expected
+
+
+def test_seek_matches_straight_replay():
+    rng = random.Random(11)
+    game = Game.create(12, 12, 20, random.Random(11), deferred=True)
+    moves = [(rng.choice(["reveal", "reveal", "cover", "undo", "redo"]), rng.randrange(12), rng.randrange(12))
+             for _ in range(60)]
+    recording = record(game, 11, [(move,) if move in ("undo", "redo") else (move, x, y) for move, x, y in moves])
+
+    replayer = GameReplayer(recording, snapshot_interval=8)
+    expected = game_summary(replayer.play())
+
+    for position in (0, 5, 17, 40, 3, len(replayer)):
+        replayer.seek(position)
+
+    assert game_summary(replayer.play()) == expected
+
+
+def test_seek_forward_from_before_mine_placement_keeps_the_layout():
+    # 첫 드러내기 전으로 간 뒤 놓인 뒤의 스냅샷으로 가도 지뢰 배치가 기록과 같아야 한다
+    game = Game.create(16, 16, 40, random.Random(5), deferred=True)
+    stream = io.BytesIO()
+    recorder = GameRecorder(game, stream, 5)
+
+    for x in range(8):
+        game.cover(x, 15)
+        game.cover(x, 15)
+
+    # 지뢰가 놓인 뒤에는 아직 드러나지 않은 안전 칸만 골라 게임이 끝나지 않게 둔다
+    for _ in range(30):
+        x, y = next((x, y) for x in range(16) for y in range(16)
+                    if not game.map.is_revealed(x, y) and (not game.map.mines_placed or not game.map.is_mine(x, y)))
+        game.reveal(x, y)
+
+    recorder.flush()
+    game.recorder = None
+    recording = Recording.from_bytes(stream.getvalue())
+
+    expected = GameReplayer(recording, snapshot_interval=8)
+    expected.play(30)
+
+    replayer = GameReplayer(recording, snapshot_interval=8)
+    replayer.play()
+    replayer.seek(5)
+    replayer.seek(30)
+
+    assert bytes(replayer.game.map.board.mines) == bytes(expected.game.map.board.mines)
+    assert game_summary(replayer.game) == game_summary(expected.game)
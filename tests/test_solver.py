@@ -0,0 +1,51 @@
+import random
+
+import pytest
+
+from minegame.minegame import Game
+from minegame.solver import ConstraintSolver
+from minegame.topology import HEX, SQUARE4, SQUARE8
+
+
+def play_randomly(game: 'Game', rng: random.Random, moves: int):
+    # 지뢰가 아닌 칸을 무작위로 드러내면서 매 수마다 hint 를 불러 solver 를 조금씩 갱신한다
+    current_map = game.map
+
+    for _ in range(moves):
+
+        if game.is_game_end:
+            return
+
+        x, y = rng.randrange(current_map.row), rng.randrange(current_map.col)
+
+        if not current_map.is_mine(x, y):
+            game.reveal(x, y)
+            yield game.hint()
+
+
+@pytest.mark.parametrize("topology", [SQUARE4, SQUARE8, HEX], ids=lambda topology: topology.name)
+@pytest.mark.parametrize("seed", range(20))
+def test_incremental_hint_matches_fresh_solve(topology, seed):
+    rng = random.Random(seed)
+    game = Game.create(12, 12, 25, random.Random(seed), topology)
+
+    for hint in play_randomly(game, rng, 15):
+        fresh = ConstraintSolver(game.map)
+
+        try:
+            expected = fresh.hint()
+
+        finally:
+            fresh.close()
+
+        assert sorted(hint.safe_cells) == sorted(expected.safe_cells)
+        assert sorted(hint.mine_cells) == sorted(expected.mine_cells)
+
+
+def test_hint_is_sound():
+    rng = random.Random(7)
+    game = Game.create(16, 16, 40, random.Random(7), SQUARE8)
+
+    for hint in play_randomly(game, rng, 30):
+        assert not any(game.map.is_mine(x, y) for x, y in hint.safe_cells)
+        assert all(game.map.is_mine(x, y) for x, y in hint.mine_cells)